@@ -7,8 +7,11 @@ from bs4 import BeautifulSoup
 import traceback
 import pandas as pd
 import time
-import openpyxl
 import requests
+import os
+from functools import lru_cache
+from driver_pool import DriverPool
+from template_fill import WorkbookTemplate, DEFAULT_TEMPLATE_PATH, DEFAULT_OUTPUT_DIR, output_file_name
 
 
 def get_usd_to_inr_rate(url):
@@ -69,31 +72,32 @@ def calculate_total(usd_to_inr, bcd_percent, swc_percent, igst_percent, c4_value
     total = (c4_value * usd_to_inr) * total_rate + b5_value
     return total
 
-# Create a new Excel file writing in values and the computed Total (no formula changes)
+@lru_cache(maxsize=None)
+def get_template(template_path):
+    """Template workbook parsed once per path and reused for every HSN code"""
+    return WorkbookTemplate(template_path)
+
+# Create a new Excel file from the template with the inputs filled in and formula values computed
 def create_new_excel(
         template_path, output_path,
         hsn_code,
         usd_inr, bcd, swc, igst,
         c4_val, b5_val
     ):
-    wb = openpyxl.load_workbook(template_path)
-    ws = wb.active
-
-    # Fill required input cells
-    ws["C1"] = usd_inr
-    ws["B10"] = bcd
-    ws["B11"] = swc
-    ws["B13"] = igst
-    ws["C4"] = c4_val
-    ws["B5"] = b5_val
-
-    # # Put calculated Total in C20 (adjust cell if needed)
-    # ws["C20"] = total_val
-
-    wb.save(output_path)
+    template = get_template(template_path)
+    inputs = {
+        "usd_inr_rate": usd_inr,
+        "fob_price_usd": c4_val,
+        "freight_insurance_percentage": b5_val * 100,
+        "bcd_rate": bcd,
+        "swc_rate": swc,
+        "igst_rate": igst,
+    }
+    with open(output_path, "wb") as handle:
+        handle.write(template.render_workbook(inputs))
     print(f"Saved output Excel: {output_path}")
 
-def scrape_hsn_duty(hsn_code, c4_value, b5_value, usd_to_inr_rate, input_excel_path):
+def setup_chrome_driver():
     chrome_options = Options()
     chrome_options.add_argument("--disable-gpu")
     chrome_options.add_argument("--no-sandbox")
@@ -101,7 +105,16 @@ def scrape_hsn_duty(hsn_code, c4_value, b5_value, usd_to_inr_rate, input_excel_p
     chrome_options.add_argument("--start-maximized")
     # chrome_options.add_argument("--headless")  # uncomment to run headless
 
-    driver = webdriver.Chrome(options=chrome_options)
+    return webdriver.Chrome(options=chrome_options)
+
+# Warm browser sessions reused across scrape_hsn_duty calls
+driver_pool = DriverPool(setup_chrome_driver, max_size=1)
+
+def scrape_hsn_duty(hsn_code, c4_value, b5_value, usd_to_inr_rate, input_excel_path):
+    with driver_pool.session() as driver:
+        _scrape_hsn_duty(driver, hsn_code, c4_value, b5_value, usd_to_inr_rate, input_excel_path)
+
+def _scrape_hsn_duty(driver, hsn_code, c4_value, b5_value, usd_to_inr_rate, input_excel_path):
     wait = WebDriverWait(driver, 25)
 
     try:
@@ -183,15 +196,16 @@ def scrape_hsn_duty(hsn_code, c4_value, b5_value, usd_to_inr_rate, input_excel_p
         # print(f"\nCalculated Total (Python): {total}")
 
         # Create new Excel file with input values and computed total
-        output_excel_path = f"D:\\Github\\AgenticAI\\LangChain\\HSN\\data\\HSN_OUTPUT_FILES\\HSN_{hsn_code}_output.xlsx"
+        os.makedirs(DEFAULT_OUTPUT_DIR, exist_ok=True)
+        output_excel_path = os.path.join(DEFAULT_OUTPUT_DIR, output_file_name(hsn_code))
         create_new_excel(
             input_excel_path,
             output_excel_path,
             hsn_code,
             usd_to_inr_rate,
-            bcd_val+"%",
-            swc_val+"%",
-            igst_val+"%",
+            bcd_val,
+            swc_val,
+            igst_val,
             c4_value,
             b5_value
         )
@@ -200,11 +214,6 @@ def scrape_hsn_duty(hsn_code, c4_value, b5_value, usd_to_inr_rate, input_excel_p
         print("An error occurred:")
         traceback.print_exc()
 
-    finally:
-        print("\nScript finished. Browser will stay open for inspection.")
-        input("Press Enter to exit and close the browser...")
-        driver.quit()
-
 
 if __name__ == "__main__":
     # Example inputs:
@@ -216,6 +225,10 @@ if __name__ == "__main__":
     usd_inr_input = get_usd_to_inr_rate(url)          # USD to INR rate to put in C1
     usd_inr_input += 1.5
     print(usd_inr_input)
-    input_excel_file = "D:\\Github\\AgenticAI\\LangChain\\HSN\\data\\Import Calculator With GST revised with BCD.xlsx"  # Path to your Excel template/reference
+    input_excel_file = DEFAULT_TEMPLATE_PATH  # Path to your Excel template/reference
 
     scrape_hsn_duty(hsn_code, c4_input, b5_input, usd_inr_input, input_excel_file)
+
+    print("\nScript finished. Browser will stay open for inspection.")
+    input("Press Enter to exit and close the browser...")
+    driver_pool.close()
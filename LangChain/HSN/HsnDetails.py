@@ -1,43 +1,185 @@
-from playwright.sync_api import sync_playwright
-from bs4 import BeautifulSoup
+import asyncio
+import atexit
+import threading
+from playwright.async_api import async_playwright, TimeoutError as PlaywrightTimeoutError
+from rate_extraction import validate_hsn_code
 
+# Constants
+SCRAPING_URL = "https://www.old.icegate.gov.in/Webappl/Trade-Guide-on-Imports"
+DEFAULT_MAX_CONCURRENCY = 4
+DEFAULT_TIMEOUT_MS = 30000
+MAX_SCROLLS = 15
+RATE_SPAN_IDS = {
+    "Basic Customs Duty (BCD)": "t_bcd_rate",
+    "Social Welfare Surcharge (SWC)": "t_scd_rate",
+    "IGST Levy": "t_igst_rate",
+}
 
-def fetch_tariff_details(hsn_code: str):
-    with sync_playwright() as p:
-        browser = p.chromium.launch(headless=True)
-        page = browser.new_page()
-
-        # Step 1: Go to ICEGATE import guide
-        page.goto("https://www.old.icegate.gov.in/Webappl/Trade-Guide-on-Imports")
-
-        # Step 2: Fill the HSN code
-        page.fill("input[name='tariff']", hsn_code)
-        page.click("input[type='submit']")
-
-        # Step 3: Wait for the redirection
-        page.wait_for_url("**/Structure-of-Duty-for-selected-Tariff")
-
-        # Step 4: Scrape the duty structure
-        content = page.content()
-        soup = BeautifulSoup(content, "lxml")
-
-        def extract_value(label_text):
-            label = soup.find("td", string=lambda s: s and label_text in s)
-            if label:
-                value_td = label.find_next_sibling("td")
-                return value_td.text.strip() if value_td else "Not found"
-            return "Not found"
-
-        results = {
-            "HSN Code": hsn_code,
-            "Basic Customs Duty (BCD)": extract_value("Basic Customs Duty"),
-            "Social Welfare Surcharge (SWC)": extract_value("Social Welfare Surcharge"),
-            "IGST Levy": extract_value("IGST")
-        }
-
-        browser.close()
+
+class TariffEngine:
+    """
+    Async Playwright engine that serves many HSN lookups from one shared browser
+
+    Every lookup gets its own browser context, so lookups run in parallel without
+    sharing cookies or page state. Waits are event driven (network idle, DOM
+    predicates) instead of fixed sleeps.
+    """
+
+    def __init__(self, url=SCRAPING_URL, max_concurrency=DEFAULT_MAX_CONCURRENCY, headless=True, timeout_ms=DEFAULT_TIMEOUT_MS):
+        self.url = url
+        self.headless = headless
+        self.timeout_ms = timeout_ms
+        self.max_concurrency = max_concurrency
+        self._semaphore = None
+        self._playwright = None
+        self._browser = None
+        self._start_lock = None
+
+    async def start(self):
+        """Launch the shared browser if it is not already running"""
+        if self._start_lock is None:
+            self._start_lock = asyncio.Lock()
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+
+        async with self._start_lock:
+            if self._browser is not None and self._browser.is_connected():
+                return
+            if self._playwright is None:
+                self._playwright = await async_playwright().start()
+            self._browser = await self._playwright.chromium.launch(headless=self.headless)
+
+    async def close(self):
+        """Close the shared browser and stop Playwright"""
+        if self._browser is not None:
+            await self._browser.close()
+            self._browser = None
+        if self._playwright is not None:
+            await self._playwright.stop()
+            self._playwright = None
+
+    async def _find_hsn_row(self, page, hsn_code):
+        row = page.locator(f'div#tmptest1 div.row.rowh[value="{hsn_code}"]')
+        if await row.count():
+            return row.first
+
+        # Rows load lazily as the list scrolls; wait for the list to grow rather than sleeping
+        for _ in range(MAX_SCROLLS):
+            height = await page.eval_on_selector(
+                "div#tmptest1", "el => { el.scrollTop = el.scrollHeight; return el.scrollHeight; }"
+            )
+            try:
+                await page.wait_for_function(
+                    """([code, height]) => {
+                        const list = document.querySelector('div#tmptest1');
+                        return list.querySelector(`div.row.rowh[value="${code}"]`) || list.scrollHeight > height;
+                    }""",
+                    arg=[hsn_code, height],
+                    timeout=self.timeout_ms / 10,
+                )
+            except PlaywrightTimeoutError:
+                break
+            if await row.count():
+                return row.first
+
+        return row.first if await row.count() else None
+
+    async def fetch(self, hsn_code):
+        """Look up one HSN code and return its duty rates as a dict"""
+        hsn_code = validate_hsn_code(hsn_code)
+        await self.start()
+
+        async with self._semaphore:
+            context = await self._browser.new_context()
+            try:
+                page = await context.new_page()
+                page.set_default_timeout(self.timeout_ms)
+
+                await page.goto(self.url, wait_until="networkidle")
+                await page.fill("input[name='cth']", hsn_code)
+                await page.click("#submitbutton")
+                await page.wait_for_selector("div#tmptest1")
+
+                target_row = await self._find_hsn_row(page, hsn_code)
+                if target_row is None:
+                    raise LookupError(f"HSN code {hsn_code} not found in tariff detail list.")
+                await target_row.scroll_into_view_if_needed()
+                await target_row.click()
+
+                try:
+                    await page.wait_for_function(
+                        "ids => ids.every(id => { const el = document.getElementById(id); return el && el.textContent.trim() !== ''; })",
+                        arg=list(RATE_SPAN_IDS.values()),
+                    )
+                except PlaywrightTimeoutError:
+                    pass  # Missing spans fall back to "0" below, as in the Selenium path
+
+                texts = await page.evaluate(
+                    "ids => ids.map(id => { const el = document.getElementById(id); return el ? el.textContent.trim() : ''; })",
+                    list(RATE_SPAN_IDS.values()),
+                )
+            finally:
+                await context.close()
+
+        results = {"HSN Code": hsn_code}
+        for rate_name, text in zip(RATE_SPAN_IDS, texts):
+            results[rate_name] = text or "0"
         return results
 
+    async def fetch_many(self, hsn_codes):
+        """Look up several HSN codes in parallel, returning a result or exception per code"""
+        return await asyncio.gather(*(self.fetch(code) for code in hsn_codes), return_exceptions=True)
+
+
+# Sync bridge: one event loop thread owns the shared engine for the whole process
+_engine = None
+_engine_loop = None
+_engine_lock = threading.Lock()
+
+
+def _shared_engine():
+    """(engine, loop) read together under the lock, so a concurrent shutdown cannot split them"""
+    global _engine, _engine_loop
+    with _engine_lock:
+        if _engine_loop is None:
+            _engine_loop = asyncio.new_event_loop()
+            threading.Thread(target=_engine_loop.run_forever, name="tariff-engine", daemon=True).start()
+            _engine = TariffEngine()
+            atexit.register(shutdown_engine)
+        return _engine, _engine_loop
+
+
+def get_engine_loop():
+    """Return the background event loop running the shared TariffEngine"""
+    return _shared_engine()[1]
+
+
+def get_engine():
+    """Return the shared TariffEngine, starting its event loop thread if needed"""
+    return _shared_engine()[0]
+
+
+def shutdown_engine():
+    """Close the shared browser and stop the background event loop"""
+    global _engine, _engine_loop
+    with _engine_lock:
+        if _engine_loop is None:
+            return
+        asyncio.run_coroutine_threadsafe(_engine.close(), _engine_loop).result(timeout=30)
+        _engine_loop.call_soon_threadsafe(_engine_loop.stop)
+        _engine, _engine_loop = None, None
+
+
+def fetch_tariff_details(hsn_code: str):
+    """Blocking lookup of one HSN code on the shared engine; safe to call from many threads"""
+    engine, loop = _shared_engine()
+    return asyncio.run_coroutine_threadsafe(engine.fetch(hsn_code), loop).result()
+
+
+def fetch_tariff_details_many(hsn_codes):
+    """Blocking parallel lookup of several HSN codes on the shared engine"""
+    engine, loop = _shared_engine()
+    return asyncio.run_coroutine_threadsafe(engine.fetch_many(hsn_codes), loop).result()
+
 
 if __name__ == "__main__":
     hsn_code = "84099949"  # Example: HSN for vehicles
@@ -0,0 +1,113 @@
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+# Constants
+DEFAULT_MAX_WORKERS = 4
+COLUMN_ALIASES = {
+    "hsn_code": ["hsn code", "hsn_code", "hsn", "cth"],
+    "fob_price": ["fob price", "fob_price", "fob", "fob price (usd)", "basic price"],
+    "freight_percentage": ["freight %", "freight_percentage", "freight", "freight & insurance %", "freight percentage"],
+}
+
+
+def load_batch_file(uploaded_file, default_freight_percentage):
+    """Read a CSV/Excel bill of materials into hsn_code / fob_price / freight_percentage columns"""
+    import pandas as pd
+    name = getattr(uploaded_file, "name", str(uploaded_file)).lower()
+    if name.endswith((".xlsx", ".xls")):
+        raw_df = pd.read_excel(uploaded_file, dtype=str)
+    else:
+        raw_df = pd.read_csv(uploaded_file, dtype=str)
+
+    lookup = {str(column).strip().lower(): column for column in raw_df.columns}
+    columns = {}
+    for field, aliases in COLUMN_ALIASES.items():
+        for alias in aliases:
+            if alias in lookup:
+                columns[field] = lookup[alias]
+                break
+
+    missing = [field for field in ("hsn_code", "fob_price") if field not in columns]
+    if missing:
+        raise ValueError(f"Batch file is missing required column(s): {', '.join(missing)}")
+
+    raw_fob = raw_df[columns["fob_price"]].fillna("").str.strip()
+    fob_price = pd.to_numeric(raw_fob, errors="coerce")
+    batch_df = pd.DataFrame({
+        "hsn_code": raw_df[columns["hsn_code"]].fillna("").str.strip(),
+        "fob_price": fob_price,
+        # Unparseable prices fail their row instead of being priced as NaN
+        "error": [
+            "" if price == price else (f"Invalid FOB price '{raw}'" if raw else "Missing FOB price")
+            for raw, price in zip(raw_fob, fob_price)
+        ],
+    })
+    if "freight_percentage" in columns:
+        # Only blank cells get the default; unparseable ones fail their row like FOB prices
+        raw_freight = raw_df[columns["freight_percentage"]].fillna("").str.strip()
+        freight = pd.to_numeric(raw_freight, errors="coerce")
+        batch_df["freight_percentage"] = freight.mask(raw_freight == "", default_freight_percentage)
+        batch_df["error"] = [
+            error or ("" if value == value else f"Invalid freight percentage '{raw}'")
+            for error, raw, value in zip(batch_df["error"], raw_freight, batch_df["freight_percentage"])
+        ]
+    else:
+        batch_df["freight_percentage"] = default_freight_percentage
+
+    return batch_df[batch_df["hsn_code"] != ""].reset_index(drop=True)
+
+
+def failed_row(line_item, error):
+    """Result row for a line item that could not be priced"""
+    # Unparsed numbers are NaN; report them as empty rather than as nan
+    row = {key: (None if value != value else value) for key, value in line_item.items() if key != "error"}
+    row["status"] = f"Failed: {error}"
+    return row
+
+
+def fetch_rates_concurrently(hsn_codes, fetch_fn, max_workers=DEFAULT_MAX_WORKERS):
+    """
+    Fetch rates for each unique HSN code on a thread pool
+
+    Yields (hsn_code, rates, error) as lookups finish, so callers can stream results.
+    A failing code yields its exception instead of aborting the remaining lookups.
+    """
+    unique_codes = list(dict.fromkeys(hsn_codes))
+
+    with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="hsn-batch") as executor:
+        futures = {executor.submit(fetch_fn, code): code for code in unique_codes}
+        for future in as_completed(futures):
+            code = futures[future]
+            try:
+                yield code, future.result(), None
+            except Exception as e:
+                yield code, None, e
+
+
+def run_batch(line_items, fetch_fn, price_fn, max_workers=DEFAULT_MAX_WORKERS):
+    """
+    Price every line item of a batch, yielding result rows as each HSN code resolves
+
+    line_items is a DataFrame from load_batch_file or a list of dicts with the same keys.
+    price_fn(line_item, rates) returns a dict of output columns for one row, where
+    rates is whatever fetch_fn returned; an exception fails that row only.
+    """
+    if hasattr(line_items, "to_dict"):
+        line_items = line_items.to_dict("records")
+    by_code = {}
+    for line_item in line_items:
+        by_code.setdefault(line_item["hsn_code"], []).append(line_item)
+
+    for code, rates, error in fetch_rates_concurrently(by_code.keys(), fetch_fn, max_workers):
+        for line_item in by_code[code]:
+            if line_item.get("error"):
+                yield failed_row(line_item, line_item["error"])
+                continue
+            if error is not None:
+                yield failed_row(line_item, error)
+                continue
+            try:
+                row = price_fn(line_item, rates)
+                row["status"] = "OK"
+            except Exception as e:
+                row = failed_row(line_item, e)
+            yield row
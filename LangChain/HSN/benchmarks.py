@@ -0,0 +1,244 @@
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import time
+import numpy as np
+from hsn_core import calculate_import_cost, calculate_import_cost_vectorized, fetch_hsn_rates, setup_chrome_driver
+from rate_extraction import extract_rates_from_html, extract_rates_with_parser
+from icegate_fixture_server import start_fixture_server, render_result_page, fixture_codes, DETAIL_FRAGMENT, fixture_rates
+from icegate_http import IcegateHttpClient
+from driver_pool import DriverPool
+
+# Constants
+DEFAULT_ROWS = 100_000
+DEFAULT_SCRAPE_RUNS = 5
+DEFAULT_PARSE_RUNS = 200
+DEFAULT_RESULTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "benchmark_results")
+FIXTURE_CHAPTER = "73180000"
+SEED = 42
+
+
+def random_inputs(rows, seed=SEED):
+    """Random SKU/scenario combinations resembling real pricing runs"""
+    rng = np.random.default_rng(seed)
+    return {
+        "fob_price_usd": rng.uniform(1, 5000, rows),
+        "freight_insurance_percentage": rng.uniform(2, 12, rows),
+        "usd_inr_rate": rng.uniform(80, 90, rows),
+        "bcd_rate": rng.choice([0.0, 5.0, 7.5, 10.0, 15.0, 20.0], rows),
+        "swc_rate": rng.choice([0.0, 10.0], rows),
+        "igst_rate": rng.choice([5.0, 12.0, 18.0, 28.0], rows),
+    }
+
+
+def latency_stats(samples):
+    """Summary statistics in seconds for a list of latency samples"""
+    ordered = sorted(samples)
+    return {
+        "runs": len(ordered),
+        "mean": statistics.fmean(ordered),
+        "p50": ordered[len(ordered) // 2],
+        "p95": ordered[min(len(ordered) - 1, round(0.95 * (len(ordered) - 1)))],
+        "min": ordered[0],
+        "max": ordered[-1],
+    }
+
+
+def bench_calculate_import_cost(rows=DEFAULT_ROWS):
+    """Time the scalar loop against the vectorized calculation and check they agree bit for bit"""
+    inputs = random_inputs(rows)
+    columns = list(inputs.values())
+
+    start = time.perf_counter()
+    scalar_results = [
+        calculate_import_cost(*(float(column[i]) for column in columns))
+        for i in range(rows)
+    ]
+    scalar_seconds = time.perf_counter() - start
+
+    # Untimed warm-up: the first call imports pandas, which would swamp the timing
+    calculate_import_cost_vectorized(**{name: column[:1] for name, column in inputs.items()})
+    start = time.perf_counter()
+    vector_df = calculate_import_cost_vectorized(**inputs)
+    vector_seconds = time.perf_counter() - start
+
+    mismatched = [
+        key for key in scalar_results[0]
+        if not np.array_equal(np.array([result[key] for result in scalar_results], dtype=np.float64), vector_df[key].to_numpy())
+    ]
+
+    return {
+        "rows": rows,
+        "scalar_seconds": scalar_seconds,
+        "vectorized_seconds": vector_seconds,
+        "scalar_ops_per_sec": rows / scalar_seconds,
+        "vectorized_ops_per_sec": rows / vector_seconds,
+        "speedup": scalar_seconds / vector_seconds,
+        "mismatched_columns": mismatched,
+    }
+
+
+def result_page_with_rates(rows):
+    """A fully expanded result page (every row loaded, rates filled in) as a browser would serialize it"""
+    code = fixture_codes(FIXTURE_CHAPTER, 1)[0]
+    page = render_result_page(FIXTURE_CHAPTER, rows=rows, page_size=rows)
+    empty_spans = '<span id="t_bcd_rate"></span><span id="t_scd_rate"></span><span id="t_igst_rate"></span>'
+    return page.replace(empty_spans, DETAIL_FRAGMENT.format(**fixture_rates(code))), code
+
+
+def bench_extract_rates(rows=2000, runs=DEFAULT_PARSE_RUNS):
+    """Rate extraction throughput on a large result page: targeted regex path vs full HTML parser"""
+    html_source, code = result_page_with_rates(rows)
+    if extract_rates_from_html(html_source, code) != extract_rates_with_parser(html_source, code):
+        raise AssertionError("Fast and parser-based extraction disagree on the fixture page")
+
+    def throughput(extract_fn, repeats):
+        start = time.perf_counter()
+        for _ in range(repeats):
+            extract_fn(html_source, code)
+        elapsed = time.perf_counter() - start
+        return {"runs": repeats, "seconds_per_parse": elapsed / repeats, "parses_per_sec": repeats / elapsed}
+
+    parser = throughput(extract_rates_with_parser, max(1, runs // 20))
+    fast = throughput(extract_rates_from_html, runs)
+    return {
+        "result_rows": rows,
+        "page_bytes": len(html_source),
+        "parser": parser,
+        "fast": fast,
+        "speedup": parser["seconds_per_parse"] / fast["seconds_per_parse"],
+    }
+
+
+def bench_scrape(name, fetch_fn, codes):
+    """End-to-end latency of fetch_fn over the given HSN codes against the fixture server"""
+    samples = []
+    for code in codes:
+        start = time.perf_counter()
+        rates = fetch_fn(code)
+        samples.append(time.perf_counter() - start)
+        expected = fixture_rates(code)
+        if rates.get("IGST Levy") != expected["igst"]:
+            raise AssertionError(f"{name} returned {rates} for {code}, expected {expected}")
+    return latency_stats(samples)
+
+
+def run_scrape_benchmarks(runs=DEFAULT_SCRAPE_RUNS, rows=400, page_size=50, latency=0.0):
+    """Scrape latency for the HTTP, Selenium and Playwright paths against a local ICEGATE stand-in"""
+    server, url = start_fixture_server(rows=rows, page_size=page_size, latency=latency)
+    codes = fixture_codes(FIXTURE_CHAPTER, rows)
+    # Half the lookups hit the first page, half need the list scrolled to load more rows
+    lookup_codes = [codes[(index * 7) % page_size] if index % 2 == 0 else codes[-1 - index] for index in range(runs)]
+    http_codes = [code for code in lookup_codes if codes.index(code) < page_size] or codes[:1]
+
+    results = {}
+    try:
+        http_client = IcegateHttpClient(url)
+
+        def fetch_http(code):
+            return extract_rates_from_html(http_client.fetch_rates_html(code), code).to_dict()
+
+        results["http"] = bench_scrape("http", fetch_http, http_codes)
+
+        try:
+            pool = DriverPool(setup_chrome_driver, max_size=1)
+            try:
+                results["selenium"] = bench_scrape(
+                    "selenium", lambda code: fetch_hsn_rates(code, driver_pool=pool, url=url), lookup_codes
+                )
+            finally:
+                pool.close()
+        except Exception as e:
+            results["selenium"] = {"error": str(e)}
+
+        try:
+            import HsnDetails
+            HsnDetails.get_engine().url = url
+            results["playwright"] = bench_scrape("playwright", HsnDetails.fetch_tariff_details, lookup_codes)
+            HsnDetails.shutdown_engine()
+        except Exception as e:
+            results["playwright"] = {"error": str(e)}
+    finally:
+        server.shutdown()
+
+    return results
+
+
+def git_revision():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True).stdout.strip()
+    except Exception:
+        return None
+
+
+def compare_results(current, previous, path=()):
+    """Yield (metric path, previous, current, % change) for every numeric metric in both runs"""
+    for key, value in current.items():
+        if key not in previous:
+            continue
+        if isinstance(value, dict) and isinstance(previous[key], dict):
+            yield from compare_results(value, previous[key], path + (key,))
+        elif isinstance(value, (int, float)) and isinstance(previous[key], (int, float)) and previous[key]:
+            yield ".".join(path + (key,)), previous[key], value, (value - previous[key]) / previous[key] * 100
+
+
+def main():
+    parser = argparse.ArgumentParser(description="HSN import calculator benchmarks")
+    parser.add_argument("--rows", type=int, default=DEFAULT_ROWS, help="Rows for the calculation benchmark")
+    parser.add_argument("--scrape-runs", type=int, default=DEFAULT_SCRAPE_RUNS, help="Lookups per scrape backend (0 to skip)")
+    parser.add_argument("--latency", type=float, default=0.0, help="Simulated server latency per response in seconds")
+    parser.add_argument("--output", help="JSON results path (default: benchmark_results/bench_<timestamp>.json)")
+    parser.add_argument("--compare", help="Previous JSON results file to compare against")
+    args = parser.parse_args()
+
+    results = {
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "git_revision": git_revision(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "benchmarks": {},
+    }
+
+    calc = bench_calculate_import_cost(args.rows)
+    results["benchmarks"]["calculate_import_cost"] = calc
+    print(f"calculate_import_cost over {calc['rows']:,} rows")
+    print(f"  scalar loop : {calc['scalar_seconds']:.3f}s ({calc['scalar_ops_per_sec']:,.0f} ops/s)")
+    print(f"  vectorized  : {calc['vectorized_seconds']:.3f}s ({calc['vectorized_ops_per_sec']:,.0f} ops/s)")
+    print(f"  speed-up    : {calc['speedup']:.1f}x")
+    print(f"  bit-for-bit : {'yes' if not calc['mismatched_columns'] else 'NO - ' + ', '.join(calc['mismatched_columns'])}")
+
+    parse = bench_extract_rates()
+    results["benchmarks"]["extract_rates"] = parse
+    print(f"rate extraction on a {parse['result_rows']:,}-row page ({parse['page_bytes']:,} bytes)")
+    print(f"  parser      : {parse['parser']['seconds_per_parse'] * 1000:.2f} ms/parse")
+    print(f"  fast path   : {parse['fast']['seconds_per_parse'] * 1000:.3f} ms/parse")
+    print(f"  speed-up    : {parse['speedup']:.0f}x")
+
+    if args.scrape_runs:
+        scrape = run_scrape_benchmarks(args.scrape_runs, latency=args.latency)
+        results["benchmarks"]["scrape"] = scrape
+        for backend, stats in scrape.items():
+            if "error" in stats:
+                print(f"scrape [{backend}] skipped: {stats['error'].splitlines()[0]}")
+            else:
+                print(f"scrape [{backend}] p50 {stats['p50'] * 1000:,.0f} ms, p95 {stats['p95'] * 1000:,.0f} ms over {stats['runs']} lookups")
+
+    output = args.output or os.path.join(DEFAULT_RESULTS_DIR, f"bench_{time.strftime('%Y%m%d_%H%M%S')}.json")
+    os.makedirs(os.path.dirname(output) or ".", exist_ok=True)
+    with open(output, "w", encoding="utf-8") as handle:
+        json.dump(results, handle, indent=2)
+    print(f"Results written to {output}")
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as handle:
+            previous = json.load(handle)
+        print(f"Compared with {args.compare} ({previous.get('git_revision')}, {previous.get('timestamp')}):")
+        for metric, before, after, change in compare_results(results["benchmarks"], previous.get("benchmarks", {})):
+            print(f"  {metric}: {before:.6g} -> {after:.6g} ({change:+.1f}%)")
+
+
+if __name__ == "__main__":
+    main()
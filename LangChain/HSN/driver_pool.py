@@ -0,0 +1,181 @@
+import threading
+import time
+from contextlib import contextmanager
+from perf_metrics import span, increment
+
+# Constants
+DEFAULT_POOL_SIZE = 3
+DEFAULT_MAX_USES = 25
+DEFAULT_ACQUIRE_TIMEOUT = 120
+
+
+class PoolExhaustedError(Exception):
+    """Raised when no driver session becomes free within the acquire timeout"""
+
+
+class DriverPool:
+    """
+    Bounded pool of warm WebDriver sessions
+
+    Sessions are created lazily by driver_factory up to max_size. Callers that find
+    every session checked out queue on a condition variable until one is returned.
+    A session is recycled after max_uses checkouts or when it fails a health check.
+    """
+
+    def __init__(self, driver_factory, max_size=DEFAULT_POOL_SIZE, max_uses=DEFAULT_MAX_USES, acquire_timeout=DEFAULT_ACQUIRE_TIMEOUT):
+        self.driver_factory = driver_factory
+        self.max_size = max_size
+        self.max_uses = max_uses
+        self.acquire_timeout = acquire_timeout
+
+        self._idle = []
+        self._uses = {}
+        self._active = 0
+        self._closed = False
+        self._condition = threading.Condition()
+        self._stats = {
+            "checkouts": 0,
+            "created": 0,
+            "recycled": 0,
+            "crashed": 0,
+            "waits": 0,
+            "total_wait_seconds": 0.0,
+            "max_wait_seconds": 0.0,
+        }
+
+    def _is_healthy(self, driver):
+        try:
+            driver.current_url
+            return True
+        except Exception:
+            return False
+
+    def _quit(self, driver):
+        # Called without the lock held: quitting a browser can take seconds
+        try:
+            driver.quit()
+        except Exception:
+            pass
+
+    def acquire(self):
+        """Check out a healthy driver, waiting in line if the pool is exhausted"""
+        start = time.monotonic()
+        deadline = start + self.acquire_timeout
+        waited = False
+
+        while True:
+            with self._condition:
+                while True:
+                    if self._closed:
+                        raise RuntimeError("Driver pool is closed.")
+
+                    # Idle drivers and new slots are reserved under the lock, then
+                    # health-checked or started outside it so other callers are not blocked
+                    self._active += 1
+                    if self._idle:
+                        driver = self._idle.pop()
+                        break
+                    if self._active + len(self._idle) <= self.max_size:
+                        driver = None
+                        break
+                    self._active -= 1
+
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        raise PoolExhaustedError(f"No browser session free after {self.acquire_timeout}s.")
+                    waited = True
+                    self._condition.wait(remaining)
+
+            if driver is None:
+                break
+            if self._is_healthy(driver):
+                with self._condition:
+                    self._active -= 1
+                    self._checkout(driver, start, waited)
+                return driver
+
+            with self._condition:
+                self._active -= 1
+                self._stats["crashed"] += 1
+                self._uses.pop(id(driver), None)
+                self._condition.notify()
+            self._quit(driver)
+
+        try:
+            driver = self.driver_factory()
+        except Exception:
+            with self._condition:
+                self._active -= 1
+                self._condition.notify()
+            raise
+
+        increment("driver_created")
+        with self._condition:
+            self._active -= 1
+            self._stats["created"] += 1
+            self._uses[id(driver)] = 0
+            self._checkout(driver, start, waited)
+        return driver
+
+    def _checkout(self, driver, start, waited):
+        wait_seconds = time.monotonic() - start
+        self._active += 1
+        self._uses[id(driver)] = self._uses.get(id(driver), 0) + 1
+        self._stats["checkouts"] += 1
+        self._stats["total_wait_seconds"] += wait_seconds
+        self._stats["max_wait_seconds"] = max(self._stats["max_wait_seconds"], wait_seconds)
+        if waited:
+            self._stats["waits"] += 1
+
+    def release(self, driver, discard=False):
+        """Return a driver to the pool, recycling it if worn out, broken or discarded"""
+        healthy = not discard and self._is_healthy(driver)
+        with self._condition:
+            self._active -= 1
+            worn_out = self._uses.get(id(driver), 0) >= self.max_uses
+            recycle = discard or worn_out or self._closed or not healthy
+            if recycle:
+                # A browser that died without raising is a crash too, not wear
+                self._stats["crashed" if discard or not healthy else "recycled"] += 1
+                self._uses.pop(id(driver), None)
+            else:
+                self._idle.append(driver)
+            self._condition.notify()
+        if recycle:
+            self._quit(driver)
+
+    @contextmanager
+    def session(self):
+        """Context manager that checks a driver out and always checks it back in"""
+        with span("driver checkout"):
+            driver = self.acquire()
+        discard = False
+        try:
+            yield driver
+        except Exception:
+            # Page-level failures keep the session; a dead browser gets replaced
+            discard = not self._is_healthy(driver)
+            raise
+        finally:
+            self.release(driver, discard=discard)
+
+    def metrics(self):
+        """Snapshot of pool counters for display"""
+        with self._condition:
+            stats = dict(self._stats)
+            stats["active_sessions"] = self._active
+            stats["idle_sessions"] = len(self._idle)
+            stats["max_size"] = self.max_size
+            stats["avg_wait_seconds"] = stats["total_wait_seconds"] / stats["checkouts"] if stats["checkouts"] else 0.0
+        return stats
+
+    def close(self):
+        """Quit every idle driver; checked-out drivers are quit when released"""
+        with self._condition:
+            self._closed = True
+            idle, self._idle = self._idle, []
+            for driver in idle:
+                self._uses.pop(id(driver), None)
+            self._condition.notify_all()
+        for driver in idle:
+            self._quit(driver)
@@ -0,0 +1,314 @@
+import re
+import openpyxl
+from openpyxl.utils import column_index_from_string, get_column_letter
+
+# Constants
+TOKEN_PATTERN = re.compile(r"""
+    \s*(?:
+        (?P<number>\d+(?:\.\d*)?(?:[eE][+-]?\d+)?|\.\d+(?:[eE][+-]?\d+)?)
+      | (?P<ref>\$?[A-Za-z]{1,3}\$?\d+(?::\$?[A-Za-z]{1,3}\$?\d+)?)(?![\w(])
+      | (?P<function>[A-Za-z][A-Za-z0-9.]*)\s*\(
+      | (?P<op>[-+*/^%(),])
+    )""", re.VERBOSE)
+BINARY_PRECEDENCE = {"+": 1, "-": 1, "*": 2, "/": 2, "^": 3}
+FUNCTIONS = {
+    "SUM": lambda *args: sum(args),
+    "MIN": min,
+    "MAX": max,
+    "ABS": abs,
+    "ROUND": lambda value, digits=0: round(value, int(digits)),
+}
+
+
+def normalize_ref(ref):
+    """Strip absolute markers: $C$1 -> C1"""
+    return ref.replace("$", "").upper()
+
+
+def expand_range(start, end):
+    """Every cell coordinate in a rectangular range, row by row"""
+    start_col, start_row = re.match(r"([A-Z]+)(\d+)", start).groups()
+    end_col, end_row = re.match(r"([A-Z]+)(\d+)", end).groups()
+    columns = range(column_index_from_string(start_col), column_index_from_string(end_col) + 1)
+    return [f"{get_column_letter(column)}{row}" for row in range(int(start_row), int(end_row) + 1) for column in columns]
+
+
+def tokenize(formula):
+    """Split a formula (without the leading '=') into (kind, text) tokens"""
+    tokens, position = [], 0
+    formula = formula.rstrip()
+    while position < len(formula):
+        match = TOKEN_PATTERN.match(formula, position)
+        if not match:
+            raise Exception(f"Unsupported formula syntax at '{formula[position:]}'")
+        kind = match.lastgroup
+        tokens.append((kind, match.group(kind)))
+        position = match.end()
+    return tokens
+
+
+def parse_formula(formula):
+    """
+    Parse an arithmetic Excel formula into a small tuple AST
+
+    Supports numbers, cell references and ranges, + - * / ^, unary minus,
+    postfix %, parentheses and SUM/MIN/MAX/ABS/ROUND. Anything else raises.
+    """
+    tokens = tokenize(formula.lstrip("="))
+    position = 0
+
+    def peek():
+        return tokens[position] if position < len(tokens) else (None, None)
+
+    def take(expected=None):
+        nonlocal position
+        kind, text = peek()
+        if kind is None or (expected and text != expected):
+            raise Exception(f"Expected '{expected or 'operand'}' in formula '{formula}'")
+        position += 1
+        return kind, text
+
+    def expression(min_precedence=1):
+        left = unary()
+        while True:
+            kind, text = peek()
+            precedence = BINARY_PRECEDENCE.get(text) if kind == "op" else None
+            if precedence is None or precedence < min_precedence:
+                return left
+            take()
+            # ^ is left-associative in Excel, like the other operators
+            left = ("binary", text, left, expression(precedence + 1))
+
+    def unary():
+        kind, text = peek()
+        if kind == "op" and text in "+-":
+            take()
+            operand = unary()
+            return ("negate", operand) if text == "-" else operand
+        return postfix(primary())
+
+    def postfix(node):
+        while peek() == ("op", "%"):
+            take()
+            node = ("percent", node)
+        return node
+
+    def primary():
+        kind, text = take()
+        if kind == "number":
+            return ("number", float(text))
+        if kind == "ref":
+            if ":" in text:
+                start, end = text.split(":")
+                return ("range", expand_range(normalize_ref(start), normalize_ref(end)))
+            return ("ref", normalize_ref(text))
+        if kind == "function":
+            name = text.upper()
+            if name not in FUNCTIONS:
+                raise Exception(f"Unsupported function {name} in formula '{formula}'")
+            args = []
+            if peek() != ("op", ")"):
+                args.append(expression())
+                while peek() == ("op", ","):
+                    take()
+                    args.append(expression())
+            take(")")
+            return ("call", name, args)
+        if (kind, text) == ("op", "("):
+            node = expression()
+            take(")")
+            return node
+        raise Exception(f"Unexpected '{text}' in formula '{formula}'")
+
+    node = expression()
+    if position != len(tokens):
+        raise Exception(f"Unexpected '{peek()[1]}' in formula '{formula}'")
+    return node
+
+
+def node_references(node):
+    """Every cell coordinate an AST node reads"""
+    kind = node[0]
+    if kind == "ref":
+        return [node[1]]
+    if kind == "range":
+        return list(node[1])
+    if kind in ("negate", "percent"):
+        return node_references(node[1])
+    if kind == "binary":
+        return node_references(node[2]) + node_references(node[3])
+    if kind == "call":
+        return [ref for arg in node[2] for ref in node_references(arg)]
+    return []
+
+
+def evaluate_node(node, values):
+    """Evaluate an AST node against a coordinate -> number mapping; blank cells count as 0"""
+    kind = node[0]
+    if kind == "number":
+        return node[1]
+    if kind == "ref":
+        return values.get(node[1]) or 0
+    if kind == "range":
+        return [values.get(coordinate) or 0 for coordinate in node[1]]
+    if kind == "negate":
+        return -evaluate_node(node[1], values)
+    if kind == "percent":
+        return evaluate_node(node[1], values) / 100
+    if kind == "binary":
+        left, right = evaluate_node(node[2], values), evaluate_node(node[3], values)
+        operator = node[1]
+        if operator == "+":
+            return left + right
+        if operator == "-":
+            return left - right
+        if operator == "*":
+            return left * right
+        if operator == "/":
+            return left / right
+        return left ** right
+    if kind == "call":
+        args = []
+        for arg in node[2]:
+            value = evaluate_node(arg, values)
+            args.extend(value if isinstance(value, list) else [value])
+        return FUNCTIONS[node[1]](*args)
+    raise Exception(f"Unknown formula node {kind}")
+
+
+def node_source(node, cell_source):
+    """Python expression for an AST node; cell_source(coordinate) gives the expression for a cell"""
+    kind = node[0]
+    if kind == "number":
+        return repr(node[1])
+    if kind == "ref":
+        return cell_source(node[1])
+    if kind == "range":
+        return "[" + ", ".join(cell_source(coordinate) for coordinate in node[1]) + "]"
+    if kind == "negate":
+        return f"(-{node_source(node[1], cell_source)})"
+    if kind == "percent":
+        return f"({node_source(node[1], cell_source)} / 100)"
+    if kind == "binary":
+        operator = "**" if node[1] == "^" else node[1]
+        return f"({node_source(node[2], cell_source)} {operator} {node_source(node[3], cell_source)})"
+    if kind == "call":
+        args = []
+        for arg in node[2]:
+            # Ranges are spread into the call, as Excel does for SUM(A1:A3)
+            if arg[0] == "range":
+                args.extend(cell_source(coordinate) for coordinate in arg[1])
+            else:
+                args.append(node_source(arg, cell_source))
+        if node[1] == "SUM":
+            # Plain addition keeps SUM vectorizable over NumPy arrays
+            return "(" + " + ".join(args or ["0"]) + ")"
+        return f"FUNCTIONS[{node[1]!r}]({', '.join(args)})"
+    raise Exception(f"Unknown formula node {kind}")
+
+
+class FormulaSheet:
+    """
+    Constants and formulas of one worksheet, parsed once and evaluated in Python
+
+    Formula cells are ordered by their dependencies when the sheet is loaded, so
+    each evaluation is a single pass over the formulas.
+    """
+
+    def __init__(self, cells, title=None):
+        self.title = title
+        self.constants = {}
+        self.formulas = {}
+        for coordinate, value in cells.items():
+            if isinstance(value, str) and value.startswith("="):
+                self.formulas[coordinate] = parse_formula(value)
+            elif isinstance(value, (int, float)) and not isinstance(value, bool):
+                self.constants[coordinate] = value
+        self.order = self._dependency_order()
+
+    @classmethod
+    def from_workbook(cls, path, sheet_name=None):
+        """Load the formulas and numeric constants of a worksheet (the active one by default)"""
+        workbook = openpyxl.load_workbook(path)
+        worksheet = workbook[sheet_name] if sheet_name else workbook.active
+        cells = {
+            cell.coordinate: cell.value
+            for row in worksheet.iter_rows()
+            for cell in row
+            if cell.value is not None
+        }
+        return cls(cells, title=worksheet.title)
+
+    def _dependency_order(self):
+        order, visiting, done = [], set(), set()
+
+        def visit(coordinate):
+            if coordinate in done or coordinate not in self.formulas:
+                return
+            if coordinate in visiting:
+                raise Exception(f"Circular reference through {coordinate}")
+            visiting.add(coordinate)
+            for dependency in node_references(self.formulas[coordinate]):
+                visit(dependency)
+            visiting.discard(coordinate)
+            done.add(coordinate)
+            order.append(coordinate)
+
+        for coordinate in self.formulas:
+            visit(coordinate)
+        return order
+
+    def compile(self, input_cells, output_cells, percent_inputs=(), name="evaluate_sheet"):
+        """
+        Compile the formulas into one Python function of the input cells
+
+        input_cells maps argument names to cells and output_cells maps result keys
+        to cells; arguments in percent_inputs are divided by 100 on the way in.
+        Only formulas the outputs depend on are kept, other cells become literals,
+        and the function works on scalars or NumPy arrays alike.
+        """
+        inputs = {cell: argument for argument, cell in input_cells.items()}
+        needed, stack = set(), list(output_cells.values())
+        while stack:
+            coordinate = stack.pop()
+            if coordinate in self.formulas and coordinate not in needed and coordinate not in inputs:
+                needed.add(coordinate)
+                stack.extend(node_references(self.formulas[coordinate]))
+
+        def cell_source(coordinate):
+            if coordinate in inputs or coordinate in needed:
+                return coordinate
+            return repr(self.constants.get(coordinate, 0))
+
+        lines = [f"def {name}({', '.join(input_cells)}):"]
+        for argument, cell in input_cells.items():
+            lines.append(f"    {cell} = {argument} / 100" if argument in percent_inputs else f"    {cell} = {argument}")
+        for coordinate in self.order:
+            if coordinate in needed:
+                lines.append(f"    {coordinate} = {node_source(self.formulas[coordinate], cell_source)}")
+        lines.append("    return {" + ", ".join(f"{key!r}: {cell_source(cell)}" for key, cell in output_cells.items()) + "}")
+        source = "\n".join(lines)
+
+        namespace = {"FUNCTIONS": FUNCTIONS}
+        exec(compile(source, f"<{self.title or 'sheet'} formulas>", "exec"), namespace)
+        function = namespace[name]
+        function.source = source
+        return function
+
+    def evaluate(self, inputs=None):
+        """Values of every constant and formula cell, with inputs (coordinate -> number) overriding constants"""
+        values = dict(self.constants)
+        values.update(inputs or {})
+        for coordinate in self.order:
+            values[coordinate] = evaluate_node(self.formulas[coordinate], values)
+        return values
+
+
+if __name__ == "__main__":
+    import os
+
+    template_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "Import Calculator With GST revised with BCD.xlsx")
+    sheet = FormulaSheet.from_workbook(template_path)
+    values = sheet.evaluate()
+    for coordinate in sheet.order:
+        print(f"{coordinate}: {values[coordinate]:,.4f}")
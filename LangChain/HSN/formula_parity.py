@@ -0,0 +1,105 @@
+import argparse
+import time
+import numpy as np
+from hsn_core import calculate_import_cost, calculate_import_cost_vectorized
+from template_fill import WorkbookTemplate, DEFAULT_TEMPLATE_PATH
+from benchmarks import random_inputs
+
+# Constants
+DEFAULT_CASES = 10_000
+DEFAULT_RTOL = 1e-9
+CALCULATION_ARGS = ["fob_price_usd", "freight_insurance_percentage", "usd_inr_rate", "bcd_rate", "swc_rate", "igst_rate"]
+
+
+def compare_columns(expected, actual, inputs, rtol=DEFAULT_RTOL):
+    """Mismatch report per result key: bit-for-bit and tolerance mismatch counts plus the worst case"""
+    report = {}
+    for key, actual_values in actual.items():
+        expected_values = np.asarray(expected[key], dtype=np.float64)
+        actual_values = np.broadcast_to(np.asarray(actual_values, dtype=np.float64), expected_values.shape)
+        difference = np.abs(expected_values - actual_values)
+        worst = int(np.argmax(difference))
+        report[key] = {
+            "exact_mismatches": int(np.count_nonzero(expected_values != actual_values)),
+            "tolerance_mismatches": int(np.count_nonzero(~np.isclose(actual_values, expected_values, rtol=rtol, atol=0))),
+            "max_abs_diff": float(difference[worst]),
+            "worst_case": {name: float(inputs[name][worst]) for name in CALCULATION_ARGS},
+            "worst_expected": float(expected_values[worst]),
+            "worst_actual": float(actual_values[worst]),
+        }
+    return report
+
+
+def run_parity_check(cases=DEFAULT_CASES, seed=None, template_path=DEFAULT_TEMPLATE_PATH, rtol=DEFAULT_RTOL):
+    """
+    Run randomized inputs through calculate_import_cost and the compiled Excel template
+
+    Returns (report, timings): the report compares the scalar Python path with the
+    template evaluated per row and with the template compiled over whole arrays.
+    """
+    inputs = random_inputs(cases, seed=seed if seed is not None else int(time.time()))
+    calculate_from_template = WorkbookTemplate(template_path).calculator()
+    timings = {}
+
+    # Step 1: Python reference, one scalar call per case
+    start = time.perf_counter()
+    rows = [calculate_import_cost(*(float(inputs[name][i]) for name in CALCULATION_ARGS)) for i in range(cases)]
+    timings["python_scalar"] = time.perf_counter() - start
+    expected = {key: np.array([row[key] for row in rows], dtype=np.float64) for key in rows[0]}
+
+    # Step 2: Compiled template, one call per case
+    start = time.perf_counter()
+    template_rows = [calculate_from_template(**{name: float(inputs[name][i]) for name in CALCULATION_ARGS}) for i in range(cases)]
+    timings["template_scalar"] = time.perf_counter() - start
+    template_scalar = {key: [row[key] for row in template_rows] for key in template_rows[0]}
+
+    # Step 3: Compiled template over whole arrays, the path for pricing large batches
+    start = time.perf_counter()
+    template_vectorized = calculate_from_template(**inputs)
+    timings["template_vectorized"] = time.perf_counter() - start
+
+    # Untimed warm-up: the first call imports pandas, which would swamp the timing
+    calculate_import_cost_vectorized(**{name: values[:1] for name, values in inputs.items()})
+    start = time.perf_counter()
+    calculate_import_cost_vectorized(**inputs)
+    timings["python_vectorized"] = time.perf_counter() - start
+
+    report = {
+        "template_scalar": compare_columns(expected, template_scalar, inputs, rtol),
+        "template_vectorized": compare_columns(expected, template_vectorized, inputs, rtol),
+    }
+    return report, timings
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Differential test of calculate_import_cost against the Excel template formulas")
+    parser.add_argument("--cases", type=int, default=DEFAULT_CASES)
+    parser.add_argument("--seed", type=int, help="Random seed (default: time-based; printed for reruns)")
+    parser.add_argument("--template", default=DEFAULT_TEMPLATE_PATH)
+    parser.add_argument("--rtol", type=float, default=DEFAULT_RTOL, help="Relative tolerance for the tolerance mismatch count")
+    args = parser.parse_args()
+
+    seed = args.seed if args.seed is not None else int(time.time())
+    report, timings = run_parity_check(args.cases, seed, args.template, args.rtol)
+
+    print(f"{args.cases:,} random cases (seed {seed})")
+    for path, seconds in timings.items():
+        print(f"  {path:20}: {seconds:.4f}s ({args.cases / seconds:,.0f} rows/s)")
+
+    failed = False
+    for key, result in report["template_vectorized"].items():
+        scalar = report["template_scalar"][key]
+        if scalar["exact_mismatches"] != result["exact_mismatches"]:
+            print(f"  {key}: compiled template differs between scalar and array evaluation")
+            failed = True
+        if not result["exact_mismatches"]:
+            print(f"  {key:28} OK (bit for bit)")
+            continue
+        failed = failed or result["tolerance_mismatches"] > 0
+        print(
+            f"  {key:28} MISMATCH {result['exact_mismatches']:,} exact / {result['tolerance_mismatches']:,} beyond rtol, "
+            f"max diff {result['max_abs_diff']:,.6g} (python {result['worst_expected']:,.6f} vs template {result['worst_actual']:,.6f} "
+            f"at {result['worst_case']})"
+        )
+
+    raise SystemExit(1 if failed else 0)
@@ -0,0 +1,156 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass, replace
+import requests
+
+# Constants
+DEFAULT_FX_CACHE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "fx_rate_cache.sqlite3")
+DEFAULT_FX_TTL_SECONDS = 60 * 60
+DEFAULT_PROVIDER_TIMEOUT = 5
+SUPPORTED_CURRENCIES = ["USD", "EUR", "CNY", "JPY"]
+
+
+@dataclass
+class FxQuote:
+    """Exchange rate for base -> quote with where and when it came from"""
+    base: str
+    quote: str
+    rate: float
+    provider: str
+    fetched_at: float
+    stale: bool = False
+
+
+class FixerProvider:
+    """Fixer.io latest rates; the free plan is EUR-based, so pairs are crossed via EUR"""
+    name = "Fixer.io"
+
+    def __init__(self, api_key, timeout=DEFAULT_PROVIDER_TIMEOUT):
+        self.api_key = api_key
+        self.timeout = timeout
+
+    def get_rate(self, base, quote):
+        url = f"http://data.fixer.io/api/latest?access_key={self.api_key}"
+        response = requests.get(url, params={"symbols": f"{base},{quote}"}, timeout=self.timeout)
+        response.raise_for_status()
+        data = response.json()
+
+        if not data.get('success', True):
+            raise Exception(f"API Error: {data.get('error', {}).get('info', 'No info')}")
+
+        rates = data.get('rates', {})
+        rates.setdefault(data.get('base', 'EUR'), 1.0)
+        if rates.get(base) is None or rates.get(quote) is None:
+            raise Exception(f"{base} or {quote} rate missing in API response.")
+
+        return rates[quote] / rates[base]
+
+
+class FrankfurterProvider:
+    """Keyless ECB reference rates from frankfurter.app"""
+    name = "Frankfurter (ECB)"
+
+    def __init__(self, base_url="https://api.frankfurter.app", timeout=DEFAULT_PROVIDER_TIMEOUT):
+        self.base_url = base_url
+        self.timeout = timeout
+
+    def get_rate(self, base, quote):
+        response = requests.get(f"{self.base_url}/latest", params={"from": base, "to": quote}, timeout=self.timeout)
+        response.raise_for_status()
+        rate = response.json().get('rates', {}).get(quote)
+        if rate is None:
+            raise Exception(f"{base}/{quote} rate missing in API response.")
+        return rate
+
+
+class FxRateService:
+    """
+    Exchange rates with an in-process and on-disk cache keyed by currency pair
+
+    Providers are tried in order until one answers. If all fail, the last known
+    good rate is returned marked stale, with the time it was fetched.
+    """
+
+    def __init__(self, providers, cache_path=DEFAULT_FX_CACHE_PATH, ttl_seconds=DEFAULT_FX_TTL_SECONDS, key_lock=None):
+        self.providers = list(providers)
+        self.cache_path = cache_path
+        self.ttl_seconds = ttl_seconds
+        # Optional cross-process lock factory (SharedStore.key_lock) so workers sharing the file fetch once
+        self.key_lock = key_lock
+        self._memory = {}
+        self._lock = threading.Lock()
+
+        os.makedirs(os.path.dirname(cache_path) or ".", exist_ok=True)
+        with self._connect() as conn:
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS fx_rates (
+                    pair TEXT PRIMARY KEY,
+                    quote TEXT NOT NULL
+                )
+                """
+            )
+
+    def _connect(self):
+        return sqlite3.connect(self.cache_path, timeout=30)
+
+    def _load(self, pair, use_memory=True):
+        with self._lock:
+            if use_memory and pair in self._memory:
+                return self._memory[pair]
+        with self._connect() as conn:
+            row = conn.execute("SELECT quote FROM fx_rates WHERE pair = ?", (pair,)).fetchone()
+        if row is None:
+            return None
+        quote = FxQuote(**json.loads(row[0]))
+        with self._lock:
+            self._memory[pair] = quote
+        return quote
+
+    def _store(self, pair, quote):
+        with self._lock:
+            self._memory[pair] = quote
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO fx_rates (pair, quote) VALUES (?, ?)",
+                (pair, json.dumps(quote.__dict__)),
+            )
+
+    def get_rate(self, base="USD", quote="INR", force_refresh=False):
+        """Return an FxQuote for base -> quote, hitting providers only when the cache is stale"""
+        pair = f"{base}/{quote}"
+        cached = self._load(pair)
+        if cached is not None and not force_refresh and time.time() - cached.fetched_at < self.ttl_seconds:
+            return cached
+
+        if self.key_lock is None:
+            return self._fetch(pair, base, quote, cached)
+
+        requested_at = time.time()
+        with self.key_lock(f"fx_rates:{pair}"):
+            # Another worker may have refreshed the pair while this one waited for the lock
+            shared = self._load(pair, use_memory=False)
+            if shared is not None and time.time() - shared.fetched_at < self.ttl_seconds and (not force_refresh or shared.fetched_at >= requested_at):
+                with self._lock:
+                    self._memory[pair] = shared
+                return shared
+            return self._fetch(pair, base, quote, shared or cached)
+
+    def _fetch(self, pair, base, quote, cached):
+        errors = []
+        for provider in self.providers:
+            try:
+                rate = round(provider.get_rate(base, quote), 4)
+            except Exception as e:
+                errors.append(f"{provider.name}: {e}")
+                continue
+            fresh = FxQuote(base, quote, rate, provider.name, time.time())
+            self._store(pair, fresh)
+            return fresh
+
+        if cached is not None:
+            return replace(cached, stale=True)
+        raise Exception(f"No exchange rate available for {pair}. " + "; ".join(errors))
@@ -0,0 +1,708 @@
+import json
+import os
+import sys
+import threading
+import time
+from functools import partial, wraps
+from rate_cache import RateCache, DEFAULT_CACHE_PATH
+from driver_pool import DriverPool
+from tariff_index import TariffIndex, DEFAULT_INDEX_PATH, SCRAPE_SOURCE_PREFIX
+from scrape_jobs import report_progress
+from rate_extraction import extract_rates_from_html, extract_rates_from_driver, all_rates_missing, validate_hsn_code
+from perf_metrics import trace, span, increment
+from shared_store import SharedStore
+# Selenium, Playwright, requests, NumPy, pandas and openpyxl are imported inside the functions
+# that use them, so a lookup served from the tariff index or rate cache starts in milliseconds
+
+# Constants
+USD_INR_BUFFER = 1.5
+DEFAULT_FREIGHT_INSURANCE_PERCENTAGE = 6.0
+SCRAPING_URL = "https://www.old.icegate.gov.in/Webappl/Trade-Guide-on-Imports"
+RATE_CACHE_PATH = os.environ.get("HSN_RATE_CACHE_PATH", DEFAULT_CACHE_PATH)
+RATE_CACHE_TTL_HOURS = float(os.environ.get("HSN_RATE_CACHE_TTL_HOURS", 24 * 7))
+RATE_CACHE_STALE_WHILE_REVALIDATE = os.environ.get("HSN_RATE_CACHE_SWR", "1") == "1"
+DRIVER_POOL_SIZE = int(os.environ.get("HSN_DRIVER_POOL_SIZE", 3))
+DRIVER_POOL_MAX_USES = int(os.environ.get("HSN_DRIVER_POOL_MAX_USES", 25))
+TARIFF_INDEX_PATH = os.environ.get("HSN_TARIFF_INDEX_PATH", DEFAULT_INDEX_PATH)
+SCRAPER_BACKENDS = ["HTTP", "Selenium", "Playwright"]
+# The HTTP replay relies on an unconfirmed detail endpoint, so the browser stays the default until it is verified
+DEFAULT_BACKEND = os.environ.get("HSN_DEFAULT_BACKEND", "Selenium")
+# Empty means fx_rates' default path; resolved lazily so requests is not imported up front
+FX_CACHE_PATH = os.environ.get("HSN_FX_CACHE_PATH", "")
+FX_CACHE_TTL_MINUTES = float(os.environ.get("HSN_FX_CACHE_TTL_MINUTES", 60))
+# Set when several app workers run behind a load balancer; they then share one rate store
+SHARED_STORE_PATH = os.environ.get("HSN_SHARED_STORE_PATH", "")
+OUTPUT_FORMATS = ["json", "csv", "xlsx", "parquet"]
+
+# Scrolls the result list once and resolves with the row once it renders, true if only
+# more rows loaded, or false if the list did not grow within the timeout
+SCROLL_FOR_ROW_JS = """
+const [list, code, timeoutMs, done] = arguments;
+const find = () => list.querySelector('div.row.rowh[value="' + CSS.escape(code) + '"]');
+const height = list.scrollHeight;
+list.scrollTop = height;
+const row = find();
+if (row) return done(row);
+let timer;
+const observer = new MutationObserver(() => {
+    const found = find();
+    if (found || list.scrollHeight > height) {
+        observer.disconnect();
+        clearTimeout(timer);
+        done(found || true);
+    }
+});
+observer.observe(list, {childList: true, subtree: true});
+timer = setTimeout(() => { observer.disconnect(); done(false); }, timeoutMs);
+"""
+
+
+def process_resource(factory):
+    """Create a resource once per process and argument tuple, like st.cache_resource without Streamlit"""
+    instances = {}
+    lock = threading.Lock()
+
+    @wraps(factory)
+    def get(*args):
+        with lock:
+            if args not in instances:
+                instances[args] = factory(*args)
+            return instances[args]
+    return get
+
+
+@process_resource
+def get_shared_store():
+    """Cross-worker rate store and key locks, or None when running as a single worker"""
+    return SharedStore(SHARED_STORE_PATH) if SHARED_STORE_PATH else None
+
+
+@process_resource
+def get_fx_service(api_key=""):
+    """Process-wide FX rate service: Fixer.io first (when a key is given), then ECB rates"""
+    from fx_rates import FxRateService, FixerProvider, FrankfurterProvider, DEFAULT_FX_CACHE_PATH
+    providers = [FixerProvider(api_key)] if api_key else []
+    providers.append(FrankfurterProvider())
+    shared_store = get_shared_store()
+    if shared_store is not None:
+        return FxRateService(providers, shared_store.path, ttl_seconds=FX_CACHE_TTL_MINUTES * 60, key_lock=shared_store.key_lock)
+    return FxRateService(providers, FX_CACHE_PATH or DEFAULT_FX_CACHE_PATH, ttl_seconds=FX_CACHE_TTL_MINUTES * 60)
+
+
+def get_usd_to_inr_rate(api_key, force_refresh=False):
+    """Return the cached or freshly fetched USD to INR FxQuote"""
+    return get_fx_service(api_key).get_rate("USD", "INR", force_refresh=force_refresh)
+
+
+def describe_fx_quote(fx_quote):
+    """One-line description of where and when a rate was fetched"""
+    fetched = time.strftime('%Y-%m-%d %H:%M', time.localtime(fx_quote.fetched_at))
+    if fx_quote.stale:
+        return f"{fx_quote.rate} (last known good from {fx_quote.provider}, fetched {fetched} - providers unavailable)"
+    return f"{fx_quote.rate} ({fx_quote.provider}, fetched {fetched})"
+
+
+def calculate_import_cost(fob_price_usd, freight_insurance_percentage, usd_inr_rate, bcd_rate, swc_rate, igst_rate):
+    """
+    Calculate complete import cost based on the Excel template formulas
+    Replicates the exact logic from PAKO's import calculator Excel template
+    """
+    
+    # Step 1: Calculate Freight & Insurance
+    freight_insurance_amount = fob_price_usd * (freight_insurance_percentage / 100)
+    
+    # Step 2: Calculate CIF Value
+    cif_value_usd = fob_price_usd + freight_insurance_amount
+    
+    # Step 3: Calculate Assessable Value (CIF + 1%)
+    assessable_addition_percentage = 0.01  # 1%
+    assessable_addition_amount = cif_value_usd * assessable_addition_percentage
+    assessable_value_usd = cif_value_usd + assessable_addition_amount
+    
+    # Step 4: Convert to INR (A)
+    assessable_value_inr = assessable_value_usd * usd_inr_rate
+    
+    # Step 5: Calculate BCD (Basic Customs Duty) (B)
+    bcd_amount = assessable_value_inr * (float(bcd_rate) / 100)
+    
+    # Step 6: Calculate Social Welfare Surcharge (SWC) (i)
+    swc_amount = bcd_amount * (float(swc_rate) / 100)
+    
+    # Step 7: Calculate Subtotal (A + B + i)
+    subtotal_before_igst = assessable_value_inr + bcd_amount + swc_amount
+    
+    # Step 8: Calculate IGST (C)
+    igst_amount = subtotal_before_igst * (float(igst_rate) / 100)
+    
+    # Step 9: Calculate Sub Total of Duties (B + i + C)
+    total_duties = bcd_amount + swc_amount + igst_amount
+    
+    # Step 10: Calculate Total Price
+    total_price = assessable_value_inr + total_duties
+    
+    # Step 11: Calculate Clearance/Transportation (5%)
+    clearance_transportation_percentage = 0.05  # 5%
+    clearance_transportation = total_price * clearance_transportation_percentage
+    
+    # Step 12: Calculate Landed Price at Factory
+    landed_price = total_price + clearance_transportation
+    
+    # Step 13: Calculate Final Breakdown (for GST compliance)
+    igst_component_final = landed_price - (landed_price / (1 + (igst_amount / subtotal_before_igst)))
+    basic_price_less_igst_accurate = landed_price - igst_component_final
+    
+    return {
+        'fob_price_usd': fob_price_usd,
+        'freight_insurance_percentage': freight_insurance_percentage,
+        'freight_insurance_amount': freight_insurance_amount,
+        'cif_value_usd': cif_value_usd,
+        'assessable_addition_percentage': assessable_addition_percentage * 100,
+        'assessable_addition_amount': assessable_addition_amount,
+        'assessable_value_usd': assessable_value_usd,
+        'assessable_value_inr': assessable_value_inr,
+        'bcd_rate': bcd_rate,
+        'bcd_amount': bcd_amount,
+        'swc_rate': swc_rate,
+        'swc_amount': swc_amount,
+        'subtotal_before_igst': subtotal_before_igst,
+        'igst_rate': igst_rate,
+        'igst_amount': igst_amount,
+        'total_duties': total_duties,
+        'total_price': total_price,
+        'clearance_transportation_percentage': clearance_transportation_percentage * 100,
+        'clearance_transportation': clearance_transportation,
+        'landed_price': landed_price,
+        'basic_price_less_igst': basic_price_less_igst_accurate,
+        'igst_component_final': igst_component_final,
+        'usd_inr_rate': usd_inr_rate
+    }
+
+
+def calculate_import_cost_vectorized(fob_price_usd, freight_insurance_percentage, usd_inr_rate, bcd_rate, swc_rate, igst_rate):
+    """
+    Vectorized calculate_import_cost over arrays, Series or scalars (broadcast together)
+    Performs the same float64 operations in the same order as the scalar version, so every
+    column matches it bit for bit. Returns a DataFrame with the scalar version's keys as columns.
+    """
+    import numpy as np
+    import pandas as pd
+    inputs = np.broadcast_arrays(
+        *(np.asarray(value, dtype=np.float64) for value in (fob_price_usd, freight_insurance_percentage, usd_inr_rate, bcd_rate, swc_rate, igst_rate))
+    )
+    fob_price_usd, freight_insurance_percentage, usd_inr_rate, bcd_rate, swc_rate, igst_rate = (np.ravel(value) for value in inputs)
+    
+    # Steps 1-4: CIF, assessable value and INR conversion (A)
+    freight_insurance_amount = fob_price_usd * (freight_insurance_percentage / 100)
+    cif_value_usd = fob_price_usd + freight_insurance_amount
+    assessable_addition_percentage = 0.01  # 1%
+    assessable_addition_amount = cif_value_usd * assessable_addition_percentage
+    assessable_value_usd = cif_value_usd + assessable_addition_amount
+    assessable_value_inr = assessable_value_usd * usd_inr_rate
+    
+    # Steps 5-9: BCD (B), SWC (i), IGST (C) and total duties
+    bcd_amount = assessable_value_inr * (bcd_rate / 100)
+    swc_amount = bcd_amount * (swc_rate / 100)
+    subtotal_before_igst = assessable_value_inr + bcd_amount + swc_amount
+    igst_amount = subtotal_before_igst * (igst_rate / 100)
+    total_duties = bcd_amount + swc_amount + igst_amount
+    
+    # Steps 10-12: Total price, clearance and landed price
+    total_price = assessable_value_inr + total_duties
+    clearance_transportation_percentage = 0.05  # 5%
+    clearance_transportation = total_price * clearance_transportation_percentage
+    landed_price = total_price + clearance_transportation
+    
+    # Step 13: Final breakdown (for GST compliance)
+    igst_component_final = landed_price - (landed_price / (1 + (igst_amount / subtotal_before_igst)))
+    basic_price_less_igst_accurate = landed_price - igst_component_final
+    
+    rows = len(fob_price_usd)
+    return pd.DataFrame({
+        'fob_price_usd': fob_price_usd,
+        'freight_insurance_percentage': freight_insurance_percentage,
+        'freight_insurance_amount': freight_insurance_amount,
+        'cif_value_usd': cif_value_usd,
+        'assessable_addition_percentage': np.full(rows, assessable_addition_percentage * 100),
+        'assessable_addition_amount': assessable_addition_amount,
+        'assessable_value_usd': assessable_value_usd,
+        'assessable_value_inr': assessable_value_inr,
+        'bcd_rate': bcd_rate,
+        'bcd_amount': bcd_amount,
+        'swc_rate': swc_rate,
+        'swc_amount': swc_amount,
+        'subtotal_before_igst': subtotal_before_igst,
+        'igst_rate': igst_rate,
+        'igst_amount': igst_amount,
+        'total_duties': total_duties,
+        'total_price': total_price,
+        'clearance_transportation_percentage': np.full(rows, clearance_transportation_percentage * 100),
+        'clearance_transportation': clearance_transportation,
+        'landed_price': landed_price,
+        'basic_price_less_igst': basic_price_less_igst_accurate,
+        'igst_component_final': igst_component_final,
+        'usd_inr_rate': usd_inr_rate
+    })
+
+
+def calculate_sensitivity_grid(fob_price_usd, base_usd_inr_rates, freight_percentages, buffers, bcd_rate, swc_rate, igst_rate):
+    """
+    Evaluate the import cost over every (base FX rate, freight %, buffer) combination
+    for one fetched rate set. Returns one row per grid point in long format.
+    """
+    import numpy as np
+    fx_grid, freight_grid, buffer_grid = np.meshgrid(
+        np.asarray(base_usd_inr_rates, dtype=np.float64),
+        np.asarray(freight_percentages, dtype=np.float64),
+        np.asarray(buffers, dtype=np.float64),
+        indexing="ij"
+    )
+    fx_grid, freight_grid, buffer_grid = fx_grid.ravel(), freight_grid.ravel(), buffer_grid.ravel()
+
+    grid_df = calculate_import_cost_vectorized(
+        fob_price_usd, freight_grid, fx_grid + buffer_grid, bcd_rate, swc_rate, igst_rate
+    )
+    grid_df.insert(0, "base_usd_inr_rate", fx_grid)
+    grid_df.insert(1, "usd_inr_buffer", buffer_grid)
+    return grid_df
+
+
+def wait_for_value(driver, by, element_id, timeout=30):
+    """Wait for element to have non-empty text content"""
+    from selenium.webdriver.support.ui import WebDriverWait
+    wait = WebDriverWait(driver, timeout)
+    wait.until(lambda d: d.find_element(by, element_id).text.strip() != "")
+
+
+def setup_chrome_driver():
+    """Configure and return Chrome WebDriver with optimized options"""
+    from selenium import webdriver
+    from selenium.webdriver.chrome.options import Options
+    chrome_options = Options()
+    chrome_options.add_argument("--headless=new")
+    chrome_options.add_argument("--disable-gpu")
+    chrome_options.add_argument("--no-sandbox")
+    chrome_options.add_argument("--disable-extensions")
+    chrome_options.add_argument("--disable-infobars")
+    chrome_options.add_argument("--disable-dev-shm-usage")
+    chrome_options.add_argument("--window-size=1920,1080")
+    chrome_options.add_argument("--disable-web-security")
+    chrome_options.add_argument("--user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36")
+    
+    return webdriver.Chrome(options=chrome_options)
+
+
+def find_hsn_row(driver, hsn_code, max_scrolls=15, scroll_timeout=5):
+    """Find and return the target HSN row element, scrolling the lazy-loaded list only as needed"""
+    from selenium.webdriver.common.by import By
+    hsn_code = validate_hsn_code(hsn_code)
+    # One attribute selector instead of reading every row's value over the wire
+    rows = driver.find_elements(By.CSS_SELECTOR, f'div#tmptest1 div.row.rowh[value="{hsn_code}"]')
+    if rows:
+        return rows[0]
+
+    scroll_container = driver.find_element(By.CSS_SELECTOR, "div#tmptest1")
+    # Pooled drivers are reused, so the script timeout is put back for the next session
+    previous_timeout = driver.timeouts.script
+    driver.set_script_timeout(scroll_timeout + 5)
+    try:
+        for _ in range(max_scrolls):
+            increment("scroll_iterations")
+            # Scroll once, then let a MutationObserver report as soon as rows arrive instead of sleeping
+            result = driver.execute_async_script(SCROLL_FOR_ROW_JS, scroll_container, hsn_code, int(scroll_timeout * 1000))
+            if result is False:
+                break  # List stopped growing: the code is not in this result set
+            if result is not True:
+                return result
+    finally:
+        driver.set_script_timeout(previous_timeout)
+
+    return None
+
+
+@process_resource
+def get_driver_pool():
+    """Process-wide pool of warm Chrome sessions, created on first use"""
+    return DriverPool(setup_chrome_driver, max_size=DRIVER_POOL_SIZE, max_uses=DRIVER_POOL_MAX_USES)
+
+
+def fetch_hsn_rates(hsn_code, driver_pool=None, url=SCRAPING_URL):
+    """Scrape duty rates for an HSN code from ICEGATE (or a stand-in at url), raising on failure"""
+    from selenium.webdriver.common.by import By
+    from selenium.webdriver.support.ui import WebDriverWait
+    from selenium.webdriver.support import expected_conditions as EC
+    driver_pool = driver_pool or get_driver_pool()
+
+    with driver_pool.session() as driver:
+        wait = WebDriverWait(driver, 25)
+        report_progress("page load")
+        with span("page load"):
+            driver.get(url)
+            time.sleep(2)
+        
+        report_progress("search")
+        with span("search submit"):
+            input_box = wait.until(EC.presence_of_element_located((By.NAME, "cth")))
+            input_box.clear()
+            input_box.send_keys(hsn_code)
+            
+            button = wait.until(EC.element_to_be_clickable((By.ID, "submitbutton")))
+            driver.execute_script("arguments[0].scrollIntoView(true);", button)
+            time.sleep(0.5)
+            
+            try:
+                button.click()
+            except Exception:
+                increment("js_click_fallbacks")
+                driver.execute_script("arguments[0].click();", button)
+            
+            wait.until(EC.presence_of_element_located((By.CSS_SELECTOR, "div#tmptest1")))
+
+        with span("find row"):
+            target_row = find_hsn_row(driver, hsn_code)
+        
+        if not target_row:
+            raise LookupError(f"HSN code {hsn_code} not found in tariff detail list.")
+        report_progress("row found")
+            
+        with span("row click"):
+            driver.execute_script("arguments[0].scrollIntoView(true);", target_row)
+            time.sleep(0.5)
+            
+            try:
+                wait.until(EC.element_to_be_clickable(target_row))
+                target_row.click()
+            except:
+                increment("js_click_fallbacks")
+                driver.execute_script("arguments[0].click();", target_row)
+
+        with span("wait for rates"):
+            rate_elements = ["t_bcd_rate", "t_scd_rate", "t_igst_rate"]
+            for element_id in rate_elements:
+                try:
+                    wait_for_value(driver, By.ID, element_id, 30)
+                except:
+                    increment("rate_wait_timeouts")
+
+            time.sleep(2)
+        
+        with span("read rates"):
+            rate_record = extract_rates_from_driver(driver, hsn_code)
+        report_progress("rates loaded")
+        
+        return rate_record.to_dict()
+
+
+@process_resource
+def get_rate_cache():
+    """Process-wide duty rate cache (shared across app workers in shared mode)"""
+    shared_store = get_shared_store()
+    return RateCache(
+        shared_store.path if shared_store else RATE_CACHE_PATH,
+        ttl_seconds=RATE_CACHE_TTL_HOURS * 60 * 60,
+        stale_while_revalidate=RATE_CACHE_STALE_WHILE_REVALIDATE,
+        key_lock=shared_store.key_lock if shared_store else None
+    )
+
+
+def fetch_hsn_rates_playwright(hsn_code):
+    """Fetch duty rates for an HSN code through the Playwright backend"""
+    from HsnDetails import fetch_tariff_details
+    report_progress("search")
+    with span("playwright fetch"):
+        rates = fetch_tariff_details(hsn_code)
+    report_progress("rates loaded")
+    return rates
+
+
+@process_resource
+def get_http_client():
+    """Process-wide keep-alive HTTP client for the browser-free backend"""
+    from icegate_http import IcegateHttpClient
+    return IcegateHttpClient(SCRAPING_URL)
+
+
+def fetch_hsn_rates_http(hsn_code, http_client, fallback_fn):
+    """
+    Fetch duty rates over plain HTTP, falling back to a browser backend on transport
+    or page-format errors; a code ICEGATE does not list (LookupError) is not retried
+    """
+    from icegate_http import FALLBACK_ERRORS
+    try:
+        report_progress("search")
+        with span("http fetch"):
+            html_source = http_client.fetch_rates_html(hsn_code)
+    except FALLBACK_ERRORS:
+        increment("http_fallbacks")
+        return fallback_fn(hsn_code)
+    report_progress("rates loaded")
+    with span("parse"):
+        return extract_rates_from_html(html_source, hsn_code).to_dict()
+
+
+def get_rates_fetcher(backend=DEFAULT_BACKEND):
+    """Return a thread-safe hsn_code -> rates dict callable for the chosen scraper backend"""
+    if backend == "Playwright":
+        return fetch_hsn_rates_playwright
+    selenium_fetch = partial(fetch_hsn_rates, driver_pool=get_driver_pool())
+    if backend == "HTTP":
+        return partial(fetch_hsn_rates_http, http_client=get_http_client(), fallback_fn=selenium_fetch)
+    return selenium_fetch
+
+
+@process_resource
+def get_tariff_index():
+    """Process-wide offline tariff index"""
+    return TariffIndex(TARIFF_INDEX_PATH)
+
+
+def fetch_rates(hsn_code, force_refresh=False, backend=DEFAULT_BACKEND):
+    """
+    Resolve duty rates for an HSN code as (rates, source), cheapest source first:
+    offline tariff index, then the rate cache, then a live scrape. Live results
+    are written back to the index so repeat lookups stay off the network; the
+    index only answers for them within RATE_CACHE_TTL_HOURS, after which the rate
+    cache's expiry and stale-while-revalidate decide. Raises ValueError for a
+    code that is not 2-10 digits before any lookup.
+    """
+    hsn_code = validate_hsn_code(hsn_code)
+    with trace("duty_rate_lookup", hsn_code=hsn_code, backend=backend, force_refresh=force_refresh) as current:
+        tariff_index = get_tariff_index()
+        if not force_refresh:
+            with span("tariff index"):
+                rates = tariff_index.lookup(hsn_code, max_scrape_age_seconds=RATE_CACHE_TTL_HOURS * 3600)
+            if rates is not None:
+                current.attributes["source"] = "index"
+                return rates, "index"
+
+        backend_fetch = get_rates_fetcher(backend)
+
+        def fetch_and_index(code):
+            rates = backend_fetch(code)
+            if not all_rates_missing(rates):
+                tariff_index.upsert(code, rates, source=f"{SCRAPE_SOURCE_PREFIX}:{backend.lower()}")
+            return rates
+
+        rates, source = get_rate_cache().get_or_fetch(hsn_code, fetch_and_index, force_refresh=force_refresh)
+        current.attributes["source"] = source
+        return rates, source
+
+
+def parse_duty_rates(rates):
+    """Convert scraped rate strings to (bcd, swc, igst, defaults_applied) floats"""
+    def clean(value):
+        return str(value).replace('%', '').strip() if value else ""
+
+    bcd_val = clean(rates.get("Basic Customs Duty (BCD)")) or "0"
+    swc_val = clean(rates.get("Social Welfare Surcharge (SWC)")) or "10"
+    igst_val = clean(rates.get("IGST Levy")) or "12"
+
+    try:
+        return float(bcd_val), float(swc_val), float(igst_val), False
+    except ValueError:
+        return 0.0, 10.0, 12.0, True
+
+
+def calculation_report_sheets(calc_results, hsn_code):
+    """Report sheets for one calculation: the step-by-step breakdown and report information"""
+    from report_export import ReportSheet
+    steps = [
+        ('FOB Price (USD)', 'fob_price_usd', '$'),
+        ('Freight & Insurance Amount', 'freight_insurance_amount', '$'),
+        ('CIF Value (USD)', 'cif_value_usd', '$'),
+        ('Assessable Addition (1%)', 'assessable_addition_amount', '$'),
+        ('Assessable Value (USD)', 'assessable_value_usd', '$'),
+        ('Assessable Value (INR)', 'assessable_value_inr', '₹'),
+        (f'BCD ({calc_results["bcd_rate"]}%)', 'bcd_amount', '₹'),
+        (f'Social Welfare Surcharge ({calc_results["swc_rate"]}%)', 'swc_amount', '₹'),
+        ('Subtotal (before IGST)', 'subtotal_before_igst', '₹'),
+        (f'IGST ({calc_results["igst_rate"]}%)', 'igst_amount', '₹'),
+        ('Total Duties', 'total_duties', '₹'),
+        ('Total Price', 'total_price', '₹'),
+        ('Clearance/Transportation (5%)', 'clearance_transportation', '₹'),
+        ('LANDED PRICE AT FACTORY', 'landed_price', '₹'),
+        ('Basic Price (less IGST)', 'basic_price_less_igst', '₹'),
+        ('IGST Component', 'igst_component_final', '₹'),
+    ]
+    calculation_rows = (
+        (label, calc_results[key], f"{symbol}{calc_results[key]:,.2f}")
+        for label, key, symbol in steps
+    )
+
+    now = time.localtime()
+    information_rows = [
+        ('Company', 'PAKO India'),
+        ('Report Type', 'Import Cost Calculator'),
+        ('HSN Code', hsn_code),
+        ('Generated Date', time.strftime('%Y-%m-%d', now)),
+        ('Generated Time', time.strftime('%H:%M:%S', now)),
+        ('Exchange Rate Used', f"₹{calc_results['usd_inr_rate'] - USD_INR_BUFFER:.4f}"),
+        ('Buffer Applied', f"₹{USD_INR_BUFFER}"),
+        ('Final Exchange Rate', f"₹{calc_results['usd_inr_rate']:.4f}"),
+    ]
+
+    return [
+        ReportSheet('Import Calculation', ['Parameter', 'Value (Numeric)', 'Value (Formatted)'], calculation_rows),
+        ReportSheet('Report Information', ['Report Information', 'Value'], information_rows),
+    ]
+
+
+def price_batch_line_item(line_item, rates, usd_inr_rate):
+    """Run calculate_import_cost for one batch line item and return its result row"""
+    bcd_val, swc_val, igst_val, defaults_applied = parse_duty_rates(rates)
+    calc_results = calculate_import_cost(
+        line_item["fob_price"],
+        line_item["freight_percentage"],
+        usd_inr_rate,
+        bcd_val,
+        swc_val,
+        igst_val
+    )
+    return {
+        "hsn_code": line_item["hsn_code"],
+        "fob_price": line_item["fob_price"],
+        "freight_percentage": line_item["freight_percentage"],
+        "bcd_rate": bcd_val,
+        "swc_rate": swc_val,
+        "igst_rate": igst_val,
+        "assessable_value_inr": calc_results["assessable_value_inr"],
+        "total_duties": calc_results["total_duties"],
+        "landed_price": calc_results["landed_price"],
+        "rates_defaulted": defaults_applied,
+    }
+
+
+def export_report(results, fmt="XLSX", hsn_code=None):
+    """
+    Report bytes in CSV, XLSX or Parquet
+
+    results is either one calculate_import_cost result (with hsn_code) or a list of
+    result rows such as price_batch_line_item returns.
+    """
+    from report_export import ReportSheet, export_report as render_report, records_to_rows, record_columns, column_types
+    if isinstance(results, dict):
+        sheets = calculation_report_sheets(results, hsn_code)
+    else:
+        columns = record_columns(results)
+        types = column_types(columns, records_to_rows(results, columns))
+        sheets = [ReportSheet("Results", columns, records_to_rows(results, columns), types)]
+    return render_report(sheets, fmt)
+
+
+def price_codes(line_items, usd_inr_rate=None, force_refresh=False, backend=DEFAULT_BACKEND, max_workers=4):
+    """
+    Rates, and landed costs when a line item has a fob_price, for many HSN codes
+
+    line_items are dicts with hsn_code and optionally fob_price and freight_percentage.
+    Yields one result row per line item; lookups run concurrently, one per unique code,
+    and a line item that cannot be priced gets a failed row instead of raising.
+    """
+    from batch_lookup import run_batch
+
+    def fetch_fn(code):
+        return fetch_rates(code, force_refresh=force_refresh, backend=backend)
+
+    def price_fn(line_item, result):
+        rates, source = result
+        if line_item.get("fob_price") is None:
+            bcd_val, swc_val, igst_val, defaults_applied = parse_duty_rates(rates)
+            row = {
+                "hsn_code": line_item["hsn_code"],
+                "bcd_rate": bcd_val,
+                "swc_rate": swc_val,
+                "igst_rate": igst_val,
+                "rates_defaulted": defaults_applied,
+            }
+        else:
+            if usd_inr_rate is None:
+                raise ValueError("a USD/INR rate is needed to price a line item with a FOB price")
+            row = price_batch_line_item(
+                {"freight_percentage": DEFAULT_FREIGHT_INSURANCE_PERCENTAGE, **line_item}, rates, usd_inr_rate
+            )
+        row["source"] = source
+        return row
+
+    return run_batch(line_items, fetch_fn, price_fn, max_workers)
+
+
+def read_line_items(file_path, default_fob_price=None, default_freight_percentage=DEFAULT_FREIGHT_INSURANCE_PERCENTAGE):
+    """Line items from a file: a plain list of codes (one per line) or a CSV/Excel bill of materials"""
+    if file_path.lower().endswith((".csv", ".xlsx", ".xls")):
+        from batch_lookup import load_batch_file
+        try:
+            batch_df = load_batch_file(file_path, default_freight_percentage)
+            return [
+                {key: (None if value != value else value) for key, value in record.items()}
+                for record in batch_df.to_dict("records")
+            ]
+        except ValueError:
+            if not file_path.lower().endswith(".csv"):
+                raise
+            # A CSV without a FOB column is treated as a list of codes below
+
+    with open(file_path, encoding="utf-8-sig") as handle:
+        codes = [line.split(",")[0].strip() for line in handle if line.strip()]
+    if codes and not codes[0].isdigit():
+        codes = codes[1:]  # header row
+    return [
+        {"hsn_code": code, "fob_price": default_fob_price, "freight_percentage": default_freight_percentage}
+        for code in codes
+    ]
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description="PAKO import calculator: duty rates and landed cost without the web UI")
+    parser.add_argument("hsn_codes", nargs="*", help="HSN code(s) to look up")
+    parser.add_argument("--file", help="Codes file (one per line) or CSV/Excel bill of materials with HSN Code / FOB Price columns")
+    parser.add_argument("--fob", type=float, help="FOB price in USD; prices the codes instead of only listing their rates")
+    parser.add_argument("--freight", type=float, default=DEFAULT_FREIGHT_INSURANCE_PERCENTAGE, help="Freight & insurance %%")
+    parser.add_argument("--usd-inr", type=float, help="Base USD/INR rate (default: cached or fetched rate)")
+    parser.add_argument("--buffer", type=float, default=USD_INR_BUFFER, help="Company buffer added to the USD/INR rate")
+    parser.add_argument("--fx-api-key", default=os.environ.get("HSN_FIXER_API_KEY", ""), help="Fixer.io key (default: ECB rates)")
+    parser.add_argument("--backend", choices=SCRAPER_BACKENDS, default=DEFAULT_BACKEND)
+    parser.add_argument("--force-refresh", action="store_true", help="Skip the index and cache and scrape live")
+    parser.add_argument("--workers", type=int, default=4, help="Concurrent lookups")
+    parser.add_argument("--format", choices=OUTPUT_FORMATS, default="json")
+    parser.add_argument("--output", help="Output file (default: stdout for json/csv)")
+    args = parser.parse_args()
+    if args.format in ("xlsx", "parquet") and not args.output:
+        parser.error(f"--output is required for {args.format}")
+
+    line_items = [
+        {"hsn_code": code, "fob_price": args.fob, "freight_percentage": args.freight}
+        for code in args.hsn_codes
+    ]
+    if args.file:
+        line_items += read_line_items(args.file, args.fob, args.freight)
+    if not line_items:
+        parser.error("give at least one HSN code or --file")
+
+    usd_inr_rate = None
+    if any(line_item.get("fob_price") is not None for line_item in line_items):
+        base_rate = args.usd_inr if args.usd_inr is not None else get_usd_to_inr_rate(args.fx_api_key).rate
+        usd_inr_rate = base_rate + args.buffer
+
+    rows = list(price_codes(line_items, usd_inr_rate, args.force_refresh, args.backend, args.workers))
+
+    if args.format == "json":
+        data = json.dumps(rows, indent=2, default=str).encode("utf-8")
+    else:
+        data = export_report(rows, {"csv": "CSV", "xlsx": "XLSX", "parquet": "Parquet"}[args.format])
+
+    if args.output:
+        with open(args.output, "wb") as handle:
+            handle.write(data)
+    else:
+        sys.stdout.write(data.decode("utf-8-sig"))
+        if args.format == "json":
+            sys.stdout.write("\n")
+
+    failed = sum(1 for row in rows if row["status"] != "OK")
+    if failed:
+        print(f"{failed} of {len(rows)} lookups failed", file=sys.stderr)
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,185 @@
+import argparse
+import json
+import threading
+import time
+import zlib
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+# Constants
+SEARCH_PATH = "/Webappl/Trade-Guide-on-Imports"
+ROWS_PATH = "/Webappl/Trade-Guide-on-Imports-Rows"
+DETAIL_PATH = "/Webappl/Trade-Guide-on-Imports-Details"
+DEFAULT_ROWS = 400
+DEFAULT_PAGE_SIZE = 50
+BCD_RATES = ["0", "5", "7.5", "10", "15", "20"]
+IGST_RATES = ["5", "12", "18", "28"]
+
+SEARCH_PAGE = """<!DOCTYPE html>
+<html><head><title>Trade Guide on Imports</title></head>
+<body>
+<form id="tradeguide" method="post" action="{search_path}">
+  <input type="hidden" name="formtoken" value="fixture">
+  <label>CTH</label> <input type="text" name="cth" value="">
+  <input type="submit" id="submitbutton" value="Submit">
+</form>
+</body></html>
+"""
+
+RESULT_PAGE = """<!DOCTYPE html>
+<html><head><title>Trade Guide on Imports</title>
+<style>#tmptest1 {{ height: 400px; overflow-y: scroll; }} .rowh {{ height: 24px; cursor: pointer; }}</style>
+</head>
+<body>
+<div id="tmptest1">
+{rows}
+</div>
+<div id="rate_details">
+  <span id="t_bcd_rate"></span><span id="t_scd_rate"></span><span id="t_igst_rate"></span>
+</div>
+<script>
+  const chapter = "{chapter}";
+  let nextPage = 1, loading = false, exhausted = {exhausted};
+  const list = document.getElementById("tmptest1");
+
+  function bindRow(row) {{
+    row.addEventListener("click", () => {{
+      fetch("{detail_path}?cth=" + row.getAttribute("value"), {{headers: {{"X-Requested-With": "XMLHttpRequest"}}}})
+        .then(response => response.text())
+        .then(html => {{ document.getElementById("rate_details").innerHTML = html; }});
+    }});
+  }}
+  list.querySelectorAll("div.row.rowh").forEach(bindRow);
+
+  list.addEventListener("scroll", () => {{
+    if (loading || exhausted || list.scrollTop + list.clientHeight < list.scrollHeight - 5) return;
+    loading = true;
+    fetch("{rows_path}?cth=" + chapter + "&page=" + nextPage)
+      .then(response => response.json())
+      .then(data => {{
+        data.rows.forEach(code => {{
+          const row = document.createElement("div");
+          row.className = "row rowh";
+          row.setAttribute("value", code);
+          row.textContent = code + " - Fixture tariff item";
+          list.appendChild(row);
+          bindRow(row);
+        }});
+        exhausted = data.exhausted;
+        nextPage += 1;
+        loading = false;
+      }});
+  }});
+</script>
+</body></html>
+"""
+
+DETAIL_FRAGMENT = '<span id="t_bcd_rate">{bcd}</span><span id="t_scd_rate">{swc}</span><span id="t_igst_rate">{igst}</span>'
+
+
+def fixture_codes(chapter, rows=DEFAULT_ROWS):
+    """Deterministic 8-digit HSN codes under a chapter/prefix"""
+    prefix = (chapter or "7318")[:4].ljust(4, "0")
+    return [f"{prefix}{index:04d}" for index in range(rows)]
+
+
+def fixture_rates(hsn_code):
+    """Deterministic BCD/SWC/IGST for an HSN code, stable across runs"""
+    checksum = zlib.crc32(hsn_code.encode())
+    return {
+        "bcd": BCD_RATES[checksum % len(BCD_RATES)],
+        "swc": "10",
+        "igst": IGST_RATES[(checksum >> 8) % len(IGST_RATES)],
+    }
+
+
+def render_result_page(chapter, rows=DEFAULT_ROWS, page_size=DEFAULT_PAGE_SIZE):
+    """Result list page whose first page of rows is inline and the rest load on scroll"""
+    codes = fixture_codes(chapter, rows)
+    first_page = "\n".join(
+        f'<div class="row rowh" value="{code}">{code} - Fixture tariff item</div>' for code in codes[:page_size]
+    )
+    return RESULT_PAGE.format(
+        rows=first_page,
+        chapter=chapter,
+        exhausted="true" if len(codes) <= page_size else "false",
+        detail_path=DETAIL_PATH,
+        rows_path=ROWS_PATH,
+    )
+
+
+class IcegateFixtureHandler(BaseHTTPRequestHandler):
+    """Replays the ICEGATE search form, result list and rate AJAX responses"""
+
+    rows = DEFAULT_ROWS
+    page_size = DEFAULT_PAGE_SIZE
+    latency = 0.0
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send(self, body, content_type="text/html; charset=utf-8", status=200):
+        if self.latency:
+            time.sleep(self.latency)
+        payload = body.encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        params = {key: values[0] for key, values in parse_qs(url.query).items()}
+
+        if url.path == SEARCH_PATH:
+            if params.get("cth"):
+                self._send(render_result_page(params["cth"], self.rows, self.page_size))
+            else:
+                self._send(SEARCH_PAGE.format(search_path=SEARCH_PATH))
+        elif url.path == ROWS_PATH:
+            codes = fixture_codes(params.get("cth", ""), self.rows)
+            page = int(params.get("page", 1))
+            chunk = codes[page * self.page_size:(page + 1) * self.page_size]
+            exhausted = (page + 1) * self.page_size >= len(codes)
+            self._send(json.dumps({"rows": chunk, "exhausted": exhausted}), "application/json")
+        elif url.path == DETAIL_PATH:
+            self._send(DETAIL_FRAGMENT.format(**fixture_rates(params.get("cth", ""))))
+        else:
+            self._send("Not found", status=404)
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length", 0))
+        fields = {key: values[0] for key, values in parse_qs(self.rfile.read(length).decode()).items()}
+        if urlparse(self.path).path == SEARCH_PATH:
+            self._send(render_result_page(fields.get("cth", ""), self.rows, self.page_size))
+        else:
+            self._send("Not found", status=404)
+
+
+def start_fixture_server(port=0, rows=DEFAULT_ROWS, page_size=DEFAULT_PAGE_SIZE, latency=0.0):
+    """Start the fixture server on a daemon thread and return (server, search page URL)"""
+    handler = type("ConfiguredFixtureHandler", (IcegateFixtureHandler,), {
+        "rows": rows,
+        "page_size": page_size,
+        "latency": latency,
+    })
+    server = ThreadingHTTPServer(("127.0.0.1", port), handler)
+    threading.Thread(target=server.serve_forever, name="icegate-fixture", daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}{SEARCH_PATH}"
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Local stand-in for the ICEGATE trade guide")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--rows", type=int, default=DEFAULT_ROWS, help="Result rows per chapter")
+    parser.add_argument("--page-size", type=int, default=DEFAULT_PAGE_SIZE, help="Rows loaded per scroll")
+    parser.add_argument("--latency", type=float, default=0.0, help="Seconds of delay added to every response")
+    args = parser.parse_args()
+
+    server, url = start_fixture_server(args.port, args.rows, args.page_size, args.latency)
+    print(f"Serving ICEGATE fixtures at {url} (Ctrl+C to stop)")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
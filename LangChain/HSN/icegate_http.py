@@ -0,0 +1,160 @@
+import os
+import threading
+from urllib.parse import urljoin
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from bs4 import BeautifulSoup
+from rate_extraction import RATE_SPAN_PATTERN, TAG_PATTERN
+from perf_metrics import increment
+
+# Constants
+SCRAPING_URL = "https://www.old.icegate.gov.in/Webappl/Trade-Guide-on-Imports"
+# Endpoint the row click calls to load the rate spans; override if ICEGATE moves it
+RATE_DETAIL_PATH = os.environ.get("HSN_ICEGATE_RATE_PATH", "Trade-Guide-on-Imports-Details")
+RATE_SPAN_IDS = ["t_bcd_rate", "t_scd_rate", "t_igst_rate"]
+DEFAULT_TIMEOUT = (5, 20)
+DEFAULT_RETRIES = 3
+DEFAULT_POOL_SIZE = 10
+USER_AGENT = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36"
+
+
+class IcegateFormatError(Exception):
+    """Raised when an ICEGATE page no longer has the structure this client replays"""
+
+
+def has_rate_spans(html_source):
+    """True if the HTML carries the duty rate spans at all, filled or not"""
+    return RATE_SPAN_PATTERN.search(html_source) is not None
+
+
+def has_rate_values(html_source):
+    """True if the HTML carries non-empty text for every duty rate span"""
+    filled = {
+        match.group(1).lower()
+        for match in RATE_SPAN_PATTERN.finditer(html_source)
+        if TAG_PATTERN.sub("", match.group(2)).strip()
+    }
+    return filled >= set(RATE_SPAN_IDS)
+
+
+class IcegateHttpClient:
+    """
+    Browser-free ICEGATE client that replays the search form submit and the
+    AJAX request behind the tariff row click over keep-alive sessions
+
+    Each thread gets its own session, so concurrent lookups never share cookies
+    or ICEGATE's server-side search state. Only idempotent requests are retried;
+    the search POST is sent once.
+    """
+
+    def __init__(self, base_url=SCRAPING_URL, timeout=DEFAULT_TIMEOUT, retries=DEFAULT_RETRIES, pool_size=DEFAULT_POOL_SIZE):
+        self.base_url = base_url
+        self.timeout = timeout
+        self.retries = retries
+        self.pool_size = pool_size
+        self._local = threading.local()
+        self._sessions = []
+        self._lock = threading.Lock()
+
+    @property
+    def session(self):
+        """The calling thread's session, created on first use"""
+        session = getattr(self._local, "session", None)
+        if session is None:
+            retry = Retry(
+                total=self.retries,
+                backoff_factor=0.5,
+                status_forcelist=[429, 500, 502, 503, 504],
+                allowed_methods=Retry.DEFAULT_ALLOWED_METHODS,
+            )
+            adapter = HTTPAdapter(pool_connections=self.pool_size, pool_maxsize=self.pool_size, max_retries=retry)
+            session = requests.Session()
+            session.headers["User-Agent"] = USER_AGENT
+            session.mount("http://", adapter)
+            session.mount("https://", adapter)
+            self._local.session = session
+            with self._lock:
+                self._sessions.append(session)
+        return session
+
+    def _request(self, method, url, **kwargs):
+        """Send one request on this thread's session, counting urllib3 retries on the current trace"""
+        response = self.session.request(method, url, timeout=self.timeout, **kwargs)
+        retries = getattr(response.raw, "retries", None)
+        if retries is not None and retries.history:
+            increment("http_retries", len(retries.history))
+        return response
+
+    def submit_search(self, hsn_code):
+        """Load the search page and submit its form for an HSN code, returning the result HTML"""
+        response = self._request("GET", self.base_url)
+        response.raise_for_status()
+
+        soup = BeautifulSoup(response.text, "html.parser")
+        search_input = soup.find("input", attrs={"name": "cth"})
+        form = search_input.find_parent("form") if search_input else None
+        if form is None:
+            raise IcegateFormatError("Search form not found on ICEGATE page.")
+
+        # Carry hidden fields (view state, tokens) along with the HSN code
+        fields = {
+            field.get("name"): field.get("value", "")
+            for field in form.find_all("input")
+            if field.get("name") and field.get("type", "text").lower() not in ("submit", "button", "image")
+        }
+        fields["cth"] = hsn_code
+
+        action = urljoin(response.url, form.get("action") or response.url)
+        if form.get("method", "get").lower() == "post":
+            result = self._request("POST", action, data=fields)
+        else:
+            result = self._request("GET", action, params=fields)
+        result.raise_for_status()
+        return result
+
+    def fetch_rate_fragment(self, hsn_code, search_response):
+        """Replay the row-click AJAX request for an HSN code and return the rate HTML"""
+        soup = BeautifulSoup(search_response.text, "html.parser")
+        if soup.select_one("div#tmptest1") is None:
+            raise IcegateFormatError("Tariff detail list not found in ICEGATE search result.")
+        row = soup.select_one(f'div#tmptest1 div.row.rowh[value="{hsn_code}"]')
+        if row is None:
+            # Later rows load on scroll, which only the browser backends can drive
+            raise IcegateFormatError(f"HSN code {hsn_code} not in the first page of the tariff detail list.")
+
+        detail_url = urljoin(search_response.url, row.get("data-url") or RATE_DETAIL_PATH)
+        response = self._request(
+            "GET",
+            detail_url,
+            params={"cth": hsn_code},
+            headers={"X-Requested-With": "XMLHttpRequest", "Referer": search_response.url},
+        )
+        response.raise_for_status()
+        return response.text
+
+    def fetch_rates_html(self, hsn_code):
+        """Return HTML containing the rate spans for an HSN code, raising if they are missing"""
+        search_response = self.submit_search(hsn_code)
+
+        # Some result pages already embed the selected tariff's rates
+        if has_rate_values(search_response.text):
+            return search_response.text
+
+        fragment = self.fetch_rate_fragment(hsn_code, search_response)
+        if not has_rate_spans(fragment):
+            # Not the rate fragment at all: the detail endpoint moved or the guess is wrong
+            raise IcegateFormatError(f"Rate detail response for HSN code {hsn_code} has no rate spans.")
+        if not has_rate_values(fragment):
+            raise LookupError(f"Rate values for HSN code {hsn_code} missing from HTTP response.")
+        return fragment
+
+    def close(self):
+        with self._lock:
+            sessions, self._sessions = self._sessions, []
+        for session in sessions:
+            session.close()
+
+
+# Failures that say nothing about the HSN code, where a browser backend may still succeed
+FALLBACK_ERRORS = (requests.RequestException, IcegateFormatError)
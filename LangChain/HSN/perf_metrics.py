@@ -0,0 +1,154 @@
+import json
+import os
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+
+# Constants
+DEFAULT_METRICS_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "perf_metrics.jsonl")
+METRICS_PATH = os.environ.get("HSN_METRICS_PATH", DEFAULT_METRICS_PATH)
+# The sink is rotated to <path>.1 past this size, so at most two files' worth is kept
+METRICS_MAX_BYTES = int(os.environ.get("HSN_METRICS_MAX_BYTES", 20 * 1024 * 1024))
+TAIL_BLOCK_SIZE = 64 * 1024
+
+_local = threading.local()
+_write_lock = threading.Lock()
+
+
+class Trace:
+    """Timing spans and counters collected for one scrape or calculation"""
+
+    def __init__(self, name, **attributes):
+        self.trace_id = uuid.uuid4().hex[:12]
+        self.name = name
+        self.attributes = attributes
+        self.started_at = time.time()
+        self.spans = []
+        self.counters = {}
+
+    def to_record(self, duration):
+        return {
+            "trace_id": self.trace_id,
+            "name": self.name,
+            "started_at": self.started_at,
+            "duration": duration,
+            "attributes": self.attributes,
+            "spans": self.spans,
+            "counters": self.counters,
+        }
+
+
+@contextmanager
+def trace(name, **attributes):
+    """
+    Collect spans and counters for a unit of work on this thread and append it to the
+    JSONL sink when it ends. Nested traces are folded into the outer one as a span.
+    """
+    parent = getattr(_local, "trace", None)
+    if parent is not None:
+        with span(name):
+            yield parent
+        return
+
+    current = Trace(name, **attributes)
+    _local.trace = current
+    start = time.perf_counter()
+    try:
+        yield current
+    except Exception as e:
+        current.attributes["error"] = type(e).__name__
+        raise
+    finally:
+        _local.trace = None
+        write_record(current.to_record(time.perf_counter() - start))
+
+
+@contextmanager
+def span(stage):
+    """Time a stage of the current trace; a no-op outside a trace"""
+    current = getattr(_local, "trace", None)
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        if current is not None:
+            current.spans.append({"stage": stage, "duration": time.perf_counter() - start})
+
+
+def increment(counter, amount=1):
+    """Bump a counter (scroll iterations, retries, fallbacks) on the current trace"""
+    current = getattr(_local, "trace", None)
+    if current is not None:
+        current.counters[counter] = current.counters.get(counter, 0) + amount
+
+
+def write_record(record, path=None):
+    path = path or METRICS_PATH
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    line = json.dumps(record) + "\n"
+    with _write_lock:
+        if METRICS_MAX_BYTES and os.path.exists(path) and os.path.getsize(path) >= METRICS_MAX_BYTES:
+            os.replace(path, path + ".1")
+        with open(path, "a", encoding="utf-8") as handle:
+            handle.write(line)
+
+
+def tail_lines(path, limit):
+    """Last limit non-empty lines of a file, reading blocks backwards from the end"""
+    if limit <= 0 or not os.path.exists(path):
+        return []
+    with open(path, "rb") as handle:
+        position = handle.seek(0, os.SEEK_END)
+        data = b""
+        while position > 0 and data.count(b"\n") <= limit:
+            size = min(TAIL_BLOCK_SIZE, position)
+            position -= size
+            handle.seek(position)
+            data = handle.read(size) + data
+    lines = data.splitlines()
+    if position > 0:
+        # The first line read may start mid-record
+        lines = lines[1:]
+    return [line.decode("utf-8") for line in lines if line.strip()][-limit:]
+
+
+def load_records(path=None, limit=1000):
+    """Return the most recent trace records from the JSONL sink and, if needed, its rotated file"""
+    path = path or METRICS_PATH
+    lines = tail_lines(path, limit)
+    lines = tail_lines(path + ".1", limit - len(lines)) + lines
+    return [json.loads(line) for line in lines]
+
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    if not ordered:
+        return 0.0
+    index = min(len(ordered) - 1, max(0, round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def summarize_stages(records):
+    """Per (trace, stage) count / p50 / p95 / max in seconds, plus counter totals"""
+    durations = {}
+    counters = {}
+    for record in records:
+        durations.setdefault((record["name"], "total"), []).append(record["duration"])
+        for stage_span in record["spans"]:
+            durations.setdefault((record["name"], stage_span["stage"]), []).append(stage_span["duration"])
+        for counter, value in record["counters"].items():
+            counters[counter] = counters.get(counter, 0) + value
+
+    rows = [
+        {
+            "trace": name,
+            "stage": stage,
+            "count": len(values),
+            "p50": percentile(values, 50),
+            "p95": percentile(values, 95),
+            "max": max(values),
+        }
+        for (name, stage), values in sorted(durations.items())
+    ]
+    return rows, counters
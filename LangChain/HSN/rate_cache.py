@@ -0,0 +1,132 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+from rate_extraction import all_rates_missing
+from perf_metrics import trace
+
+# Constants
+DEFAULT_CACHE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "hsn_rate_cache.sqlite3")
+DEFAULT_TTL_SECONDS = 7 * 24 * 60 * 60
+
+
+class RateCache:
+    """On-disk SQLite cache of scraped duty rates keyed by HSN code"""
+
+    def __init__(self, path=DEFAULT_CACHE_PATH, ttl_seconds=DEFAULT_TTL_SECONDS, stale_while_revalidate=True, key_lock=None):
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        self.stale_while_revalidate = stale_while_revalidate
+        # Optional cross-process lock factory (SharedStore.key_lock) so workers sharing the file fetch once
+        self.key_lock = key_lock
+        self._refreshing = set()
+        self._lock = threading.Lock()
+
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with self._connect() as conn:
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS duty_rates (
+                    hsn_code TEXT PRIMARY KEY,
+                    rates TEXT NOT NULL,
+                    fetched_at REAL NOT NULL
+                )
+                """
+            )
+
+    def _connect(self):
+        # A fresh connection per call keeps the cache safe to share across Streamlit threads
+        return sqlite3.connect(self.path, timeout=30)
+
+    def get(self, hsn_code):
+        """Return (rates, age_seconds, is_stale) for a cached HSN code, or None on a miss"""
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT rates, fetched_at FROM duty_rates WHERE hsn_code = ?", (hsn_code,)
+            ).fetchone()
+        if row is None:
+            return None
+
+        age = time.time() - row[1]
+        return json.loads(row[0]), age, age > self.ttl_seconds
+
+    def put(self, hsn_code, rates):
+        """Store the rates dict for an HSN code, replacing any previous entry; a scrape that read no rates is not stored"""
+        if all_rates_missing(rates):
+            return
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO duty_rates (hsn_code, rates, fetched_at) VALUES (?, ?, ?)",
+                (hsn_code, json.dumps(rates), time.time()),
+            )
+
+    def invalidate(self, hsn_code):
+        """Drop the cached entry for an HSN code"""
+        with self._connect() as conn:
+            conn.execute("DELETE FROM duty_rates WHERE hsn_code = ?", (hsn_code,))
+
+    def get_or_fetch(self, hsn_code, fetch_fn, force_refresh=False):
+        """
+        Return (rates, source) for an HSN code, calling fetch_fn(hsn_code) only when needed
+
+        source is one of "cache", "stale" (expired entry served while a background refresh
+        runs), "shared" (fetched by another worker while this one waited) or "live". fetch_fn must return a rates dict and raise on failure.
+        """
+        cached = None if force_refresh else self.get(hsn_code)
+
+        if cached is not None:
+            rates, _, is_stale = cached
+            if not is_stale:
+                return rates, "cache"
+            if self.stale_while_revalidate:
+                self._revalidate_in_background(hsn_code, fetch_fn)
+                return rates, "stale"
+
+        if self.key_lock is None:
+            rates = fetch_fn(hsn_code)
+            self.put(hsn_code, rates)
+            return rates, "live"
+
+        requested_at = time.time()
+        with self.key_lock(f"duty_rates:{hsn_code}"):
+            # Another worker may have fetched the code while this one waited for the lock
+            cached = self.get(hsn_code)
+            if cached is not None:
+                rates, age, is_stale = cached
+                if not is_stale and (not force_refresh or time.time() - age >= requested_at):
+                    return rates, "shared"
+            rates = fetch_fn(hsn_code)
+            self.put(hsn_code, rates)
+            return rates, "live"
+
+    def _revalidate_in_background(self, hsn_code, fetch_fn):
+        with self._lock:
+            if hsn_code in self._refreshing:
+                return
+            self._refreshing.add(hsn_code)
+
+        def refresh():
+            # Own trace, so spans and counters of background scrapes reach the metrics sink
+            try:
+                with trace("duty_rate_lookup", hsn_code=hsn_code, background=True) as current:
+                    current.attributes["source"] = "revalidate"
+                    self._refresh(hsn_code, fetch_fn)
+            except Exception:
+                # Keep serving the stale entry; the next expired read retries the refresh
+                pass
+            finally:
+                with self._lock:
+                    self._refreshing.discard(hsn_code)
+
+        threading.Thread(target=refresh, name=f"rate-refresh-{hsn_code}", daemon=True).start()
+
+    def _refresh(self, hsn_code, fetch_fn):
+        if self.key_lock is None:
+            self.put(hsn_code, fetch_fn(hsn_code))
+            return
+        # Skip if another worker is already refreshing this code
+        with self.key_lock(f"duty_rates:{hsn_code}", wait_timeout=0):
+            cached = self.get(hsn_code)
+            if cached is None or cached[2]:
+                self.put(hsn_code, fetch_fn(hsn_code))
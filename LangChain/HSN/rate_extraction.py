@@ -0,0 +1,120 @@
+import html
+import re
+from typing import NamedTuple
+
+# Constants
+RATE_SPAN_IDS = {
+    "bcd": "t_bcd_rate",
+    "swc": "t_scd_rate",
+    "igst": "t_igst_rate",
+}
+RATE_LABELS = {
+    "bcd": "Basic Customs Duty (BCD)",
+    "swc": "Social Welfare Surcharge (SWC)",
+    "igst": "IGST Levy",
+}
+MISSING_RATE = "0"
+HSN_CODE_PATTERN = re.compile(r"\d{2,10}")
+
+# One pass over the page for all three spans; the rate text itself never contains markup
+RATE_SPAN_PATTERN = re.compile(
+    r"""<span\b[^>]*?\bid\s*=\s*["']?(t_bcd_rate|t_scd_rate|t_igst_rate)\b["']?[^>]*>(.*?)</span\s*>""",
+    re.IGNORECASE | re.DOTALL,
+)
+TAG_PATTERN = re.compile(r"<[^>]+>")
+
+# Reads every span's text in a single WebDriver round trip
+READ_RATE_SPANS_JS = """
+return arguments[0].map(function (id) {
+    var el = document.getElementById(id);
+    return el ? el.textContent : null;
+});
+"""
+
+
+class RateRecord(NamedTuple):
+    """Scraped duty rates for one HSN code, as the text shown on ICEGATE"""
+    hsn_code: str
+    bcd: str = MISSING_RATE
+    swc: str = MISSING_RATE
+    igst: str = MISSING_RATE
+
+    @classmethod
+    def from_texts(cls, hsn_code, texts):
+        """Build a record from raw span texts keyed bcd/swc/igst; blank rates become MISSING_RATE"""
+        return cls(hsn_code, **{
+            key: (texts.get(key) or "").strip() or MISSING_RATE
+            for key in RATE_SPAN_IDS
+        })
+
+    def to_dict(self):
+        """Rates keyed by the labels used in the UI and caches"""
+        return {
+            "HSN Code": self.hsn_code,
+            RATE_LABELS["bcd"]: self.bcd,
+            RATE_LABELS["swc"]: self.swc,
+            RATE_LABELS["igst"]: self.igst,
+        }
+
+    def to_df(self):
+        """One-row DataFrame for display; pandas is only imported here"""
+        import pandas as pd
+        return pd.DataFrame([self.to_dict()])
+
+
+def validate_hsn_code(hsn_code):
+    """Return the code stripped of whitespace; HSN codes are digits only, so they are safe in CSS selectors"""
+    code = str(hsn_code).strip()
+    if not HSN_CODE_PATTERN.fullmatch(code):
+        raise ValueError(f"Invalid HSN code '{hsn_code}': expected 2-10 digits.")
+    return code
+
+
+def all_rates_missing(rates):
+    """True when no BCD/SWC/IGST value was read, as when every span wait timed out"""
+    return all(
+        (str(rates.get(label) or "").replace("%", "").strip() or MISSING_RATE) == MISSING_RATE
+        for label in RATE_LABELS.values()
+    )
+
+
+def extract_rates_from_driver(driver, hsn_code):
+    """Read the rate spans straight from the live DOM with one execute_script call"""
+    texts = driver.execute_script(READ_RATE_SPANS_JS, list(RATE_SPAN_IDS.values()))
+    return RateRecord.from_texts(hsn_code, dict(zip(RATE_SPAN_IDS, texts)))
+
+
+def extract_rates_from_html(html_source, hsn_code):
+    """Extract the rate spans from HTML with a targeted regex, falling back to a full parser"""
+    ids_to_keys = {span_id: key for key, span_id in RATE_SPAN_IDS.items()}
+    texts = {}
+    for match in RATE_SPAN_PATTERN.finditer(html_source):
+        key = ids_to_keys[match.group(1).lower()]
+        if key not in texts:
+            texts[key] = html.unescape(TAG_PATTERN.sub("", match.group(2)))
+            if len(texts) == len(RATE_SPAN_IDS):
+                break
+
+    # Unusual markup the regex cannot see (e.g. spans built from other tags) goes through a real parser
+    if len(texts) < len(RATE_SPAN_IDS) and any(
+        RATE_SPAN_IDS[key] in html_source for key in RATE_SPAN_IDS if key not in texts
+    ):
+        return extract_rates_with_parser(html_source, hsn_code)
+
+    return RateRecord.from_texts(hsn_code, texts)
+
+
+def extract_rates_with_parser(html_source, hsn_code):
+    """Parser-based extraction: lxml when installed, otherwise BeautifulSoup's html.parser"""
+    from bs4 import BeautifulSoup
+    try:
+        import lxml  # noqa: F401
+        soup = BeautifulSoup(html_source, "lxml")
+    except ImportError:
+        soup = BeautifulSoup(html_source, "html.parser")
+
+    texts = {}
+    for key, span_id in RATE_SPAN_IDS.items():
+        span = soup.find("span", id=span_id)
+        texts[key] = span.text if span else None
+    return RateRecord.from_texts(hsn_code, texts)
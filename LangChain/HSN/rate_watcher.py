@@ -0,0 +1,441 @@
+import argparse
+import math
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from tariff_index import RATE_COLUMNS
+from rate_extraction import all_rates_missing
+
+# Constants
+DEFAULT_WATCH_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "hsn_rate_watch.sqlite3")
+DEFAULT_STALE_AFTER_HOURS = 24 * 7
+DEFAULT_MAX_WORKERS = 3
+DEFAULT_REQUESTS_PER_MINUTE = 30
+LOOKUP_TRACE_NAME = "duty_rate_lookup"
+USAGE_IMPORT_RECORDS = 100_000
+
+
+class RateLimiter:
+    """Spaces calls at least 60 / requests_per_minute seconds apart across all threads"""
+
+    def __init__(self, requests_per_minute=DEFAULT_REQUESTS_PER_MINUTE):
+        self.interval = 60.0 / requests_per_minute if requests_per_minute else 0.0
+        self._next_slot = 0.0
+        self._lock = threading.Lock()
+
+    def wait(self):
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_slot)
+            self._next_slot = slot + self.interval
+        if slot > now:
+            time.sleep(slot - now)
+
+
+def normalize_rate(value):
+    """Rate text as stored in history: '10 %' -> '10', blank -> None"""
+    if value is None:
+        return None
+    text = str(value).replace("%", "").strip()
+    return text or None
+
+
+def rate_values(rates):
+    """(bcd, swc, igst) from a scraped or indexed rates dict"""
+    return tuple(normalize_rate(rates.get(column)) for column in RATE_COLUMNS.values())
+
+
+def default_fetch(hsn_code, backend=None):
+    """Live lookup through hsn_core, bypassing the index and cache; also refreshes both"""
+    from hsn_core import fetch_rates, DEFAULT_BACKEND
+    rates, _ = fetch_rates(hsn_code, force_refresh=True, backend=backend or DEFAULT_BACKEND)
+    return rates
+
+
+class RateWatcher:
+    """
+    Watchlist of commonly used HSN codes with a versioned BCD/SWC/IGST history
+
+    A refresh run picks the codes that are due, most used and most stale first,
+    re-fetches them on a thread pool under a shared rate limit and appends a new
+    history version only when a rate actually changed. Every run is checkpointed
+    per code, so an interrupted run resumes with the codes it had not finished.
+    """
+
+    def __init__(self, path=DEFAULT_WATCH_PATH, tariff_index=None):
+        self.path = path
+        self.tariff_index = tariff_index
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(
+                """
+                CREATE TABLE IF NOT EXISTS watchlist (
+                    hsn_code TEXT PRIMARY KEY,
+                    lookups INTEGER NOT NULL DEFAULT 0,
+                    last_used REAL,
+                    last_checked REAL,
+                    last_changed REAL,
+                    added_at REAL NOT NULL
+                ) WITHOUT ROWID;
+                CREATE TABLE IF NOT EXISTS rate_history (
+                    hsn_code TEXT NOT NULL,
+                    version INTEGER NOT NULL,
+                    bcd TEXT,
+                    swc TEXT,
+                    igst TEXT,
+                    source TEXT NOT NULL,
+                    observed_at REAL NOT NULL,
+                    PRIMARY KEY (hsn_code, version)
+                ) WITHOUT ROWID;
+                CREATE TABLE IF NOT EXISTS refresh_runs (
+                    run_id TEXT PRIMARY KEY,
+                    started_at REAL NOT NULL,
+                    finished_at REAL
+                );
+                CREATE TABLE IF NOT EXISTS refresh_items (
+                    run_id TEXT NOT NULL,
+                    position INTEGER NOT NULL,
+                    hsn_code TEXT NOT NULL,
+                    status TEXT NOT NULL DEFAULT 'pending',
+                    changed INTEGER NOT NULL DEFAULT 0,
+                    error TEXT,
+                    PRIMARY KEY (run_id, position)
+                ) WITHOUT ROWID;
+                """
+            )
+
+    def _connect(self):
+        return sqlite3.connect(self.path, timeout=30)
+
+    # Step 1: Watchlist and usage
+
+    def add(self, hsn_codes):
+        """Add codes to the watchlist; codes already watched are left unchanged"""
+        now = time.time()
+        with self._connect() as conn:
+            conn.executemany(
+                "INSERT OR IGNORE INTO watchlist (hsn_code, added_at) VALUES (?, ?)",
+                [(code, now) for code in dict.fromkeys(hsn_codes)],
+            )
+
+    def record_usage(self, usage):
+        """Add lookup counts ({hsn_code: (count, last_used)}), watching new codes"""
+        now = time.time()
+        with self._connect() as conn:
+            conn.executemany(
+                """
+                INSERT INTO watchlist (hsn_code, lookups, last_used, added_at) VALUES (?, ?, ?, ?)
+                ON CONFLICT(hsn_code) DO UPDATE SET
+                    lookups = lookups + excluded.lookups,
+                    last_used = MAX(COALESCE(last_used, 0), excluded.last_used)
+                """,
+                [(code, count, last_used, now) for code, (count, last_used) in usage.items()],
+            )
+
+    def import_usage_from_metrics(self, records, since=None):
+        """
+        Count duty-rate lookups per code in perf_metrics trace records
+
+        Only records that started after since are counted, so importing the same
+        metrics file on every run does not double-count. Forced refreshes, which
+        include the watcher's own fetches, and background revalidations are not
+        demand and are skipped.
+        Returns the code count.
+        """
+        usage = {}
+        for record in records:
+            attributes = record.get("attributes", {})
+            code = attributes.get("hsn_code")
+            if record.get("name") != LOOKUP_TRACE_NAME or not code or attributes.get("force_refresh") or attributes.get("background"):
+                continue
+            if since and record["started_at"] <= since:
+                continue
+            count, last_used = usage.get(code, (0, 0))
+            usage[code] = (count + 1, max(last_used, record["started_at"]))
+        self.record_usage(usage)
+        return len(usage)
+
+    def last_usage_import(self):
+        """Latest last_used on the watchlist, the since value for the next metrics import"""
+        with self._connect() as conn:
+            return conn.execute("SELECT MAX(last_used) FROM watchlist").fetchone()[0]
+
+    def due_codes(self, stale_after_hours=DEFAULT_STALE_AFTER_HOURS, limit=None):
+        """
+        Watched codes not checked within stale_after_hours, highest priority first
+
+        Priority is hours since the last check scaled by log usage, so a busy code
+        is refreshed before a rarely used one of the same age; never-checked codes
+        come first, busiest first.
+        """
+        now = time.time()
+        cutoff = now - stale_after_hours * 3600
+        with self._connect() as conn:
+            rows = conn.execute(
+                "SELECT hsn_code, lookups, last_checked FROM watchlist WHERE last_checked IS NULL OR last_checked < ?",
+                (cutoff,),
+            ).fetchall()
+
+        def priority(row):
+            _, lookups, last_checked = row
+            usage_weight = 1 + math.log1p(lookups)
+            if last_checked is None:
+                return (1, usage_weight)
+            return (0, (now - last_checked) / 3600 * usage_weight)
+
+        codes = [row[0] for row in sorted(rows, key=priority, reverse=True)]
+        return codes[:limit] if limit else codes
+
+    # Step 2: Versioned history
+
+    def latest_version(self, hsn_code, conn=None):
+        """(version, (bcd, swc, igst)) of the newest history entry, or None"""
+        if conn is None:
+            with self._connect() as conn:
+                return self.latest_version(hsn_code, conn)
+        row = conn.execute(
+            "SELECT version, bcd, swc, igst FROM rate_history WHERE hsn_code = ? ORDER BY version DESC LIMIT 1",
+            (hsn_code,),
+        ).fetchone()
+        return (row[0], tuple(row[1:])) if row else None
+
+    def history(self, hsn_code):
+        """Every recorded version of a code, oldest first"""
+        with self._connect() as conn:
+            rows = conn.execute(
+                "SELECT version, bcd, swc, igst, source, observed_at FROM rate_history WHERE hsn_code = ? ORDER BY version",
+                (hsn_code,),
+            ).fetchall()
+        return [
+            {"version": version, "bcd": bcd, "swc": swc, "igst": igst, "source": source, "observed_at": observed_at}
+            for version, bcd, swc, igst, source, observed_at in rows
+        ]
+
+    def record_rates(self, hsn_code, values, source, baseline=None):
+        """
+        Store freshly fetched (bcd, swc, igst) for a code; returns True if they changed
+
+        With no history yet, baseline (the rates served before the refresh, e.g.
+        from the tariff index) becomes version 1 so the first refresh can already
+        detect a change.
+        """
+        now = time.time()
+        with self._connect() as conn:
+            latest = self.latest_version(hsn_code, conn)
+            if latest is None and baseline is not None:
+                conn.execute(
+                    "INSERT INTO rate_history VALUES (?, 1, ?, ?, ?, 'baseline', ?)",
+                    (hsn_code, *baseline, now),
+                )
+                latest = (1, baseline)
+
+            changed = latest is not None and latest[1] != values
+            if latest is None or changed:
+                version = latest[0] + 1 if latest else 1
+                conn.execute("INSERT INTO rate_history VALUES (?, ?, ?, ?, ?, ?, ?)", (hsn_code, version, *values, source, now))
+
+            conn.execute(
+                """
+                INSERT INTO watchlist (hsn_code, last_checked, last_changed, added_at) VALUES (?, ?, ?, ?)
+                ON CONFLICT(hsn_code) DO UPDATE SET
+                    last_checked = excluded.last_checked,
+                    last_changed = COALESCE(excluded.last_changed, last_changed)
+                """,
+                (hsn_code, now, now if changed else None, now),
+            )
+        return changed
+
+    def changed_codes(self, since):
+        """Codes whose rates changed after since, with their previous and current versions"""
+        with self._connect() as conn:
+            codes = [row[0] for row in conn.execute(
+                "SELECT hsn_code FROM watchlist WHERE last_changed > ? ORDER BY last_changed DESC", (since,)
+            ).fetchall()]
+        changes = []
+        for code in codes:
+            versions = self.history(code)
+            changes.append({"hsn_code": code, "previous": versions[-2] if len(versions) > 1 else None, "current": versions[-1]})
+        return changes
+
+    # Step 3: Checkpointed refresh runs
+
+    def start_run(self, hsn_codes):
+        """Create a checkpointed run over hsn_codes and return its id"""
+        run_id = uuid.uuid4().hex[:12]
+        with self._connect() as conn:
+            conn.execute("INSERT INTO refresh_runs (run_id, started_at) VALUES (?, ?)", (run_id, time.time()))
+            conn.executemany(
+                "INSERT INTO refresh_items (run_id, position, hsn_code) VALUES (?, ?, ?)",
+                [(run_id, position, code) for position, code in enumerate(hsn_codes)],
+            )
+        return run_id
+
+    def unfinished_run(self):
+        """Id of the most recent run that did not finish, or None"""
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT run_id FROM refresh_runs WHERE finished_at IS NULL ORDER BY started_at DESC LIMIT 1"
+            ).fetchone()
+        return row[0] if row else None
+
+    def pending_items(self, run_id):
+        with self._connect() as conn:
+            return [row[0] for row in conn.execute(
+                "SELECT hsn_code FROM refresh_items WHERE run_id = ? AND status = 'pending' ORDER BY position", (run_id,)
+            ).fetchall()]
+
+    def _checkpoint(self, run_id, hsn_code, status, changed=False, error=None):
+        with self._connect() as conn:
+            conn.execute(
+                "UPDATE refresh_items SET status = ?, changed = ?, error = ? WHERE run_id = ? AND hsn_code = ?",
+                (status, int(changed), error, run_id, hsn_code),
+            )
+
+    def run_summary(self, run_id):
+        """Item counts by status plus the changed codes of a run"""
+        with self._connect() as conn:
+            counts = dict(conn.execute(
+                "SELECT status, COUNT(*) FROM refresh_items WHERE run_id = ? GROUP BY status", (run_id,)
+            ).fetchall())
+            changed = [row[0] for row in conn.execute(
+                "SELECT hsn_code FROM refresh_items WHERE run_id = ? AND changed = 1 ORDER BY position", (run_id,)
+            ).fetchall()]
+            failed = conn.execute(
+                "SELECT hsn_code, error FROM refresh_items WHERE run_id = ? AND status = 'failed' ORDER BY position", (run_id,)
+            ).fetchall()
+        return {"run_id": run_id, "counts": counts, "changed": changed, "failed": failed}
+
+    def refresh(self, run_id, fetch_fn=default_fetch, max_workers=DEFAULT_MAX_WORKERS,
+                requests_per_minute=DEFAULT_REQUESTS_PER_MINUTE, on_result=None):
+        """
+        Fetch every pending code of a run and record its rates
+
+        fetch_fn(hsn_code) returns a rates dict. Each code is checkpointed as soon
+        as it finishes, so calling refresh again with the same run_id (after a
+        crash or Ctrl+C) only fetches what is still pending.
+        """
+        if self.tariff_index is None:
+            from hsn_core import get_tariff_index
+            self.tariff_index = get_tariff_index()
+        tariff_index = self.tariff_index
+        limiter = RateLimiter(requests_per_minute)
+
+        def refresh_code(code):
+            if self.latest_version(code) is None:
+                indexed = tariff_index.lookup(code)
+                baseline = rate_values(indexed) if indexed else None
+            else:
+                baseline = None
+            limiter.wait()
+            rates = fetch_fn(code)
+            if all_rates_missing(rates):
+                # Every rate wait timed out; recording it would look like a rate change
+                raise Exception(f"No rates read for HSN code {code}")
+            return self.record_rates(code, rate_values(rates), source="refresh", baseline=baseline)
+
+        pending = self.pending_items(run_id)
+        with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="rate-watch") as executor:
+            futures = {executor.submit(refresh_code, code): code for code in pending}
+            try:
+                for future in as_completed(futures):
+                    code = futures[future]
+                    try:
+                        changed = future.result()
+                        self._checkpoint(run_id, code, "done", changed)
+                    except Exception as e:
+                        changed = False
+                        self._checkpoint(run_id, code, "failed", error=str(e))
+                    if on_result:
+                        on_result(code, changed)
+            except KeyboardInterrupt:
+                # Leave unfinished codes pending for the next resume
+                for future in futures:
+                    future.cancel()
+                raise
+
+        with self._connect() as conn:
+            conn.execute("UPDATE refresh_runs SET finished_at = ? WHERE run_id = ?", (time.time(), run_id))
+        return self.run_summary(run_id)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Refresh stale HSN duty rates and flag codes whose rates changed")
+    parser.add_argument("--watch-db", default=os.environ.get("HSN_RATE_WATCH_PATH", DEFAULT_WATCH_PATH))
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    add_parser = commands.add_parser("add", help="Watch HSN codes (arguments or a file with one code per line)")
+    add_parser.add_argument("hsn_codes", nargs="*")
+    add_parser.add_argument("--file")
+
+    commands.add_parser("import-usage", help="Count lookups per code from the perf metrics log")
+
+    run_parser = commands.add_parser("run", help="Refresh due codes, resuming an interrupted run first")
+    run_parser.add_argument("--stale-after-hours", type=float, default=DEFAULT_STALE_AFTER_HOURS)
+    run_parser.add_argument("--limit", type=int, help="Refresh at most this many codes")
+    run_parser.add_argument("--workers", type=int, default=DEFAULT_MAX_WORKERS)
+    run_parser.add_argument("--requests-per-minute", type=float, default=DEFAULT_REQUESTS_PER_MINUTE)
+    run_parser.add_argument("--backend", choices=["HTTP", "Selenium", "Playwright"], help="Defaults to hsn_core.DEFAULT_BACKEND")
+    run_parser.add_argument("--new-run", action="store_true", help="Abandon an interrupted run instead of resuming it")
+
+    changes_parser = commands.add_parser("changes", help="Codes whose rates changed recently")
+    changes_parser.add_argument("--days", type=float, default=7)
+
+    history_parser = commands.add_parser("history", help="Rate history of one HSN code")
+    history_parser.add_argument("hsn_code")
+
+    args = parser.parse_args()
+    watcher = RateWatcher(args.watch_db)
+
+    if args.command == "add":
+        codes = list(args.hsn_codes)
+        if args.file:
+            with open(args.file, encoding="utf-8-sig") as handle:
+                codes += ["".join(line.split()) for line in handle if line.strip()]
+        watcher.add(codes)
+        print(f"Watching {len(set(codes))} code(s).")
+    elif args.command == "import-usage":
+        from perf_metrics import load_records
+        count = watcher.import_usage_from_metrics(load_records(limit=USAGE_IMPORT_RECORDS), since=watcher.last_usage_import())
+        print(f"Updated usage for {count} code(s).")
+    elif args.command == "run":
+        run_id = None if args.new_run else watcher.unfinished_run()
+        if run_id:
+            print(f"Resuming run {run_id} with {len(watcher.pending_items(run_id))} code(s) pending.")
+        else:
+            codes = watcher.due_codes(args.stale_after_hours, args.limit)
+            if not codes:
+                print("No codes are due for a refresh.")
+                return
+            run_id = watcher.start_run(codes)
+            print(f"Run {run_id}: refreshing {len(codes)} code(s).")
+
+        def report(code, changed):
+            if changed:
+                print(f"  CHANGED {code}")
+
+        def fetch_fn(code):
+            return default_fetch(code, backend=args.backend)
+
+        summary = watcher.refresh(run_id, fetch_fn, args.workers, args.requests_per_minute, on_result=report)
+        print(f"Done: {summary['counts']}, {len(summary['changed'])} changed.")
+        for code, error in summary["failed"]:
+            print(f"  FAILED {code}: {error}")
+    elif args.command == "changes":
+        for change in watcher.changed_codes(time.time() - args.days * 86400):
+            previous, current = change["previous"] or {}, change["current"]
+            print(
+                f"{change['hsn_code']}: BCD {previous.get('bcd')} -> {current['bcd']}, "
+                f"SWC {previous.get('swc')} -> {current['swc']}, IGST {previous.get('igst')} -> {current['igst']}"
+            )
+    else:
+        for version in watcher.history(args.hsn_code):
+            observed = time.strftime("%Y-%m-%d %H:%M", time.localtime(version["observed_at"]))
+            print(f"v{version['version']} {observed} BCD {version['bcd']} SWC {version['swc']} IGST {version['igst']} ({version['source']})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,185 @@
+import csv
+import io
+import itertools
+import math
+import numbers
+from openpyxl import Workbook
+from openpyxl.utils import get_column_letter
+
+# Constants
+REPORT_FORMATS = {
+    "CSV": ("csv", "text/csv"),
+    "XLSX": ("xlsx", "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"),
+    "Parquet": ("parquet", "application/vnd.apache.parquet"),
+}
+WIDTH_SAMPLE_ROWS = 500
+MAX_COLUMN_WIDTH = 50
+PARQUET_CHUNK_ROWS = 10_000
+
+
+class ReportSheet:
+    """
+    One tabular section of a report: a name, its column headers and an iterable of row tuples
+
+    Rows can be a generator, so a report is produced while it is written instead
+    of being materialized as DataFrames first. types optionally maps columns to
+    bool, float or str for typed formats; see column_types.
+    """
+
+    def __init__(self, name, columns, rows, types=None):
+        self.name = name
+        self.columns = list(columns)
+        self.rows = rows
+        self.types = dict(types or {})
+
+
+def records_to_rows(records, columns):
+    """Row tuples from dict records, with None for columns a record does not have"""
+    return (tuple(record.get(column) for column in columns) for record in records)
+
+
+def record_columns(records):
+    """Union of record keys in first-seen order"""
+    return list(dict.fromkeys(key for record in records for key in record))
+
+
+def is_missing(value):
+    return value is None or (isinstance(value, float) and math.isnan(value))
+
+
+def value_type(value):
+    """bool, float (any real number) or str, the types a typed report column can hold"""
+    if isinstance(value, bool):
+        return bool
+    if isinstance(value, numbers.Real):
+        return float
+    return str
+
+
+def column_types(columns, rows):
+    """Column -> bool/float/str across rows; str when values disagree, None when a column is always empty"""
+    types = dict.fromkeys(columns)
+    for row in rows:
+        for column, value in zip(columns, row):
+            if is_missing(value):
+                continue
+            kind = value_type(value)
+            types[column] = kind if types[column] in (None, kind) else str
+    return types
+
+
+def column_widths(columns, rows):
+    """Column widths from the headers and a sample of rows, capped at MAX_COLUMN_WIDTH"""
+    widths = [len(str(column)) for column in columns]
+    for row in rows:
+        for index, value in enumerate(row):
+            if value is not None:
+                widths[index] = max(widths[index], len(str(value)))
+    return [min(width + 2, MAX_COLUMN_WIDTH) for width in widths]
+
+
+def write_csv(sheet, output):
+    """Stream a sheet to a text file object as CSV"""
+    writer = csv.writer(output)
+    writer.writerow(sheet.columns)
+    writer.writerows(sheet.rows)
+
+
+def write_xlsx(sheets, output):
+    """Stream sheets into an openpyxl write-only workbook, sizing columns from a leading sample"""
+    workbook = Workbook(write_only=True)
+    for sheet in sheets:
+        worksheet = workbook.create_sheet(sheet.name)
+
+        # Write-only sheets need widths before the first row, so size from a peeked sample
+        rows = iter(sheet.rows)
+        sample = list(itertools.islice(rows, WIDTH_SAMPLE_ROWS))
+        for index, width in enumerate(column_widths(sheet.columns, sample), start=1):
+            worksheet.column_dimensions[get_column_letter(index)].width = width
+
+        worksheet.append(sheet.columns)
+        for row in itertools.chain(sample, rows):
+            worksheet.append(row)
+    workbook.save(output)
+
+
+def write_parquet(sheet, output, chunk_rows=PARQUET_CHUNK_ROWS):
+    """Stream a sheet to Parquet one row group per chunk; needs pyarrow"""
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError:
+        raise Exception("Parquet export needs pyarrow: pip install pyarrow")
+
+    arrow_types = {bool: pa.bool_(), float: pa.float64(), str: pa.string()}
+
+    # Declared types win; other columns are typed from the first chunk, and columns
+    # that are empty there become strings. Every chunk is coerced to the schema, so
+    # a later chunk cannot disagree with it.
+    rows = iter(sheet.rows)
+    first = list(itertools.islice(rows, chunk_rows))
+    inferred = column_types(sheet.columns, first)
+    types = {column: sheet.types.get(column) or inferred[column] or str for column in sheet.columns}
+    schema = pa.schema([(column, arrow_types[types[column]]) for column in sheet.columns])
+
+    def coerce(value, kind):
+        if is_missing(value):
+            return None
+        return value if value_type(value) is kind else kind(value)
+
+    def chunk_table(chunk):
+        values = list(zip(*chunk)) if chunk else [()] * len(sheet.columns)
+        return pa.table({
+            column: [coerce(value, types[column]) for value in column_values]
+            for column, column_values in zip(sheet.columns, values)
+        }, schema=schema)
+
+    with pq.ParquetWriter(output, schema) as writer:
+        writer.write_table(chunk_table(first))
+        for chunk in iter(lambda: list(itertools.islice(rows, chunk_rows)), []):
+            writer.write_table(chunk_table(chunk))
+
+
+def export_report(sheets, fmt="XLSX"):
+    """Render report sheets as bytes; CSV and Parquet hold the first sheet only"""
+    if fmt not in REPORT_FORMATS:
+        raise Exception(f"Unsupported report format: {fmt}")
+
+    output = io.BytesIO()
+    if fmt == "CSV":
+        text = io.TextIOWrapper(output, encoding="utf-8-sig", newline="")
+        write_csv(sheets[0], text)
+        text.flush()
+        text.detach()
+    elif fmt == "XLSX":
+        write_xlsx(sheets, output)
+    else:
+        write_parquet(sheets[0], output)
+    return output.getvalue()
+
+
+def report_file_name(stem, fmt):
+    """File name for a report stem in the given format"""
+    return f"{stem}.{REPORT_FORMATS[fmt][0]}"
+
+
+def report_mime_type(fmt):
+    return REPORT_FORMATS[fmt][1]
+
+
+if __name__ == "__main__":
+    import time
+    import tracemalloc
+
+    # Peak memory should stay flat as the row count grows
+    for rows in (10_000, 100_000):
+        for fmt in REPORT_FORMATS:
+            records = ({"hsn_code": f"7318{i % 10000:04d}", "fob_price": i * 1.5, "status": "OK"} for i in range(rows))
+            sheet = ReportSheet("Batch Results", ["hsn_code", "fob_price", "status"], records_to_rows(records, ["hsn_code", "fob_price", "status"]))
+            tracemalloc.start()
+            start = time.perf_counter()
+            data = export_report([sheet], fmt)
+            elapsed = time.perf_counter() - start
+            peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+            print(f"{fmt:8} {rows:>7,} rows: {len(data) / 1e6:6.2f} MB file, {peak / 1e6:6.2f} MB peak Python memory, {elapsed:.2f}s")
@@ -0,0 +1,106 @@
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+
+# Constants
+DEFAULT_MAX_WORKERS = 3
+JOB_RETENTION_SECONDS = 60 * 60
+PROGRESS_STAGES = ["queued", "page load", "search", "row found", "rates loaded", "done"]
+
+_current_job = threading.local()
+
+
+@dataclass
+class ScrapeJob:
+    """State of one background duty-rate lookup"""
+    job_id: str
+    hsn_code: str
+    backend: str
+    status: str = "queued"
+    stage: str = "queued"
+    stage_times: dict = field(default_factory=dict)
+    result: dict = None
+    source: str = None
+    error: str = None
+    submitted_at: float = field(default_factory=time.time)
+    finished_at: float = None
+
+    @property
+    def finished(self):
+        return self.status in ("done", "failed")
+
+    @property
+    def progress(self):
+        """Fraction of PROGRESS_STAGES reached, for progress bars"""
+        return PROGRESS_STAGES.index(self.stage) / (len(PROGRESS_STAGES) - 1) if self.stage in PROGRESS_STAGES else 0.0
+
+
+def report_progress(stage):
+    """Record a progress stage for the job running on this thread; a no-op outside jobs"""
+    job = getattr(_current_job, "job", None)
+    if job is not None:
+        job.stage = stage
+        job.stage_times[stage] = time.time()
+
+
+class ScrapeJobQueue:
+    """
+    Runs duty-rate lookups on a thread pool and tracks them by job id
+
+    Submitting an HSN code that already has a job in flight returns the existing
+    job id, so concurrent users asking for the same code share one scrape. A
+    forced refresh only joins another forced refresh, while a plain lookup also
+    joins a forced one, since its result is at least as fresh.
+    """
+
+    def __init__(self, run_fn, max_workers=DEFAULT_MAX_WORKERS):
+        self.run_fn = run_fn
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="scrape-job")
+        self._jobs = {}
+        self._in_flight = {}
+        self._lock = threading.Lock()
+
+    def submit(self, hsn_code, backend, force_refresh=False):
+        """Queue a lookup and return its job id, reusing an identical in-flight job"""
+        key = (hsn_code, backend, force_refresh)
+        with self._lock:
+            self._purge_expired()
+            for joinable in [key] if force_refresh else [key, (hsn_code, backend, True)]:
+                if joinable in self._in_flight:
+                    return self._in_flight[joinable]
+
+            job = ScrapeJob(job_id=uuid.uuid4().hex[:12], hsn_code=hsn_code, backend=backend)
+            job.stage_times["queued"] = job.submitted_at
+            self._jobs[job.job_id] = job
+            self._in_flight[key] = job.job_id
+
+        self._executor.submit(self._run, job, key, force_refresh)
+        return job.job_id
+
+    def _run(self, job, key, force_refresh):
+        _current_job.job = job
+        job.status = "running"
+        try:
+            job.result, job.source = self.run_fn(job.hsn_code, job.backend, force_refresh)
+            job.status = "done"
+            report_progress("done")
+        except Exception as e:
+            job.error = str(e)
+            job.status = "failed"
+        finally:
+            job.finished_at = time.time()
+            _current_job.job = None
+            with self._lock:
+                self._in_flight.pop(key, None)
+
+    def get(self, job_id):
+        """Return the job for an id, or None if it is unknown or expired"""
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def _purge_expired(self):
+        cutoff = time.time() - JOB_RETENTION_SECONDS
+        for job_id in [job_id for job_id, job in self._jobs.items() if job.finished and job.finished_at < cutoff]:
+            del self._jobs[job_id]
@@ -0,0 +1,116 @@
+import os
+import socket
+import sqlite3
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+
+# Constants
+DEFAULT_SHARED_STORE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "hsn_shared_store.sqlite3")
+DEFAULT_LEASE_SECONDS = 180
+DEFAULT_LOCK_WAIT_SECONDS = 240
+LOCK_POLL_SECONDS = 0.1
+
+
+class LockTimeoutError(Exception):
+    """Raised when a key lock held by another worker is not released within the wait timeout"""
+
+
+class SharedStore:
+    """
+    SQLite file in WAL mode shared by every app worker process on a machine
+
+    The duty rate cache and FX rate service keep their tables in this file, so a
+    rate fetched by one worker is served to all of them. key_lock() gives a
+    cross-process lock per key, so only one worker fetches a given key at a
+    time. Locks are leases: a worker that dies while holding one blocks the key
+    for at most lease_seconds.
+    """
+
+    def __init__(self, path=DEFAULT_SHARED_STORE_PATH, lease_seconds=DEFAULT_LEASE_SECONDS, wait_timeout=DEFAULT_LOCK_WAIT_SECONDS):
+        self.path = path
+        self.lease_seconds = lease_seconds
+        self.wait_timeout = wait_timeout
+
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with self._connect() as conn:
+            # WAL lets readers in every worker proceed while one worker writes; the mode sticks to the file
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS key_locks (
+                    name TEXT PRIMARY KEY,
+                    owner TEXT NOT NULL,
+                    expires_at REAL NOT NULL
+                )
+                """
+            )
+
+    def _connect(self):
+        return sqlite3.connect(self.path, timeout=30)
+
+    def _try_acquire(self, name, owner, lease_seconds):
+        now = time.time()
+        with self._connect() as conn:
+            cursor = conn.execute(
+                """
+                INSERT INTO key_locks (name, owner, expires_at) VALUES (?, ?, ?)
+                ON CONFLICT(name) DO UPDATE SET owner = excluded.owner, expires_at = excluded.expires_at
+                WHERE key_locks.expires_at < ?
+                """,
+                (name, owner, now + lease_seconds, now),
+            )
+            return cursor.rowcount == 1
+
+    def _release(self, name, owner):
+        with self._connect() as conn:
+            conn.execute("DELETE FROM key_locks WHERE name = ? AND owner = ?", (name, owner))
+
+    @contextmanager
+    def key_lock(self, name, wait_timeout=None, lease_seconds=None):
+        """
+        Hold the lock for a key across all worker processes
+
+        Waits up to wait_timeout seconds (the store default when None; 0 means try
+        once) and raises LockTimeoutError if the key stays locked.
+        """
+        wait_timeout = self.wait_timeout if wait_timeout is None else wait_timeout
+        lease_seconds = lease_seconds or self.lease_seconds
+        owner = f"{socket.gethostname()}:{os.getpid()}:{threading.get_ident()}:{uuid.uuid4().hex}"
+
+        deadline = time.monotonic() + wait_timeout
+        while not self._try_acquire(name, owner, lease_seconds):
+            if time.monotonic() >= deadline:
+                raise LockTimeoutError(f"Timed out waiting for another worker to finish {name}")
+            time.sleep(LOCK_POLL_SECONDS)
+
+        try:
+            yield
+        finally:
+            self._release(name, owner)
+
+    def held_locks(self):
+        """Keys currently locked as (name, owner, seconds until lease expiry)"""
+        now = time.time()
+        with self._connect() as conn:
+            rows = conn.execute("SELECT name, owner, expires_at FROM key_locks WHERE expires_at >= ?", (now,)).fetchall()
+        return [(name, owner, expires_at - now) for name, owner, expires_at in rows]
+
+
+def _simulate_worker(store_path, codes, fetch_seconds, results):
+    # Runs in a child process of tests/test_shared_store.py: every worker asks for the same codes at the same time
+    from rate_cache import RateCache
+
+    store = SharedStore(store_path)
+    cache = RateCache(store_path, key_lock=store.key_lock)
+
+    def slow_fetch(code):
+        time.sleep(fetch_seconds)
+        results.put(("fetch", os.getpid(), code))
+        return {"HSN Code": code, "IGST Levy": "18"}
+
+    for code in codes:
+        _, source = cache.get_or_fetch(code, slow_fetch)
+        results.put(("lookup", os.getpid(), source))
+
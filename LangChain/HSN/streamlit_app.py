@@ -1,359 +1,67 @@
 import streamlit as st
-import requests
-from selenium import webdriver
-from selenium.webdriver.chrome.options import Options
-from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-from bs4 import BeautifulSoup
-import traceback
 import pandas as pd
+import numpy as np
+import altair as alt
 import time
-import io
-from PIL import Image
-import openpyxl
+from contextlib import nullcontext
+from functools import partial
+from batch_lookup import load_batch_file, run_batch, DEFAULT_MAX_WORKERS
+from scrape_jobs import ScrapeJobQueue
+from perf_metrics import trace, load_records, summarize_stages
+from report_export import ReportSheet, REPORT_FORMATS, export_report, records_to_rows, record_columns, column_types, report_file_name, report_mime_type
+from fx_rates import SUPPORTED_CURRENCIES
+from hsn_core import (
+    USD_INR_BUFFER, DEFAULT_FREIGHT_INSURANCE_PERCENTAGE, RATE_CACHE_TTL_HOURS, DRIVER_POOL_SIZE, SCRAPER_BACKENDS, DEFAULT_BACKEND, SHARED_STORE_PATH, FX_CACHE_TTL_MINUTES,
+    get_fx_service, get_usd_to_inr_rate, describe_fx_quote,
+    calculate_import_cost, calculate_sensitivity_grid,
+    get_driver_pool, get_tariff_index,
+    fetch_rates, parse_duty_rates, calculation_report_sheets, price_batch_line_item,
+)
 
 # Constants
 DEFAULT_HSN_CODE = "73182100"
 DEFAULT_FOB_PRICE = 350.0
-DEFAULT_FREIGHT_INSURANCE_PERCENTAGE = 6.0
 DEFAULT_USD_INR_RATE = 75.5
-USD_INR_BUFFER = 1.5
-SCRAPING_URL = "https://www.old.icegate.gov.in/Webappl/Trade-Guide-on-Imports"
+JOB_POLL_SECONDS = 1.0
 
-def get_usd_to_inr_rate(api_key):
-    """Fetch USD to INR exchange rate from Fixer.io API"""
-    url = f"http://data.fixer.io/api/latest?access_key={api_key}"
-    try:
-        response = requests.get(url, timeout=10)
-        response.raise_for_status()
-        data = response.json()
-        
-        if not data.get('success', True):
-            raise Exception(f"API Error: {data.get('error', {}).get('info', 'No info')}")
-        
-        rates = data.get('rates', {})
-        usd_rate = rates.get('USD')
-        inr_rate = rates.get('INR')
-        
-        if usd_rate is None or inr_rate is None:
-            raise Exception("USD or INR rate missing in API response.")
-        
-        return round(inr_rate / usd_rate, 4)
-    except requests.RequestException as e:
-        raise Exception(f"Network error: {str(e)}")
-
-def calculate_import_cost(fob_price_usd, freight_insurance_percentage, usd_inr_rate, bcd_rate, swc_rate, igst_rate):
-    """
-    Calculate complete import cost based on the Excel template formulas
-    Replicates the exact logic from PAKO's import calculator Excel template
-    """
-    
-    # Step 1: Calculate Freight & Insurance
-    freight_insurance_amount = fob_price_usd * (freight_insurance_percentage / 100)
-    
-    # Step 2: Calculate CIF Value
-    cif_value_usd = fob_price_usd + freight_insurance_amount
-    
-    # Step 3: Calculate Assessable Value (CIF + 1%)
-    assessable_addition_percentage = 0.01  # 1%
-    assessable_addition_amount = cif_value_usd * assessable_addition_percentage
-    assessable_value_usd = cif_value_usd + assessable_addition_amount
-    
-    # Step 4: Convert to INR (A)
-    assessable_value_inr = assessable_value_usd * usd_inr_rate
-    
-    # Step 5: Calculate BCD (Basic Customs Duty) (B)
-    bcd_amount = assessable_value_inr * (float(bcd_rate) / 100)
-    
-    # Step 6: Calculate Social Welfare Surcharge (SWC) (i)
-    swc_amount = bcd_amount * (float(swc_rate) / 100)
-    
-    # Step 7: Calculate Subtotal (A + B + i)
-    subtotal_before_igst = assessable_value_inr + bcd_amount + swc_amount
-    
-    # Step 8: Calculate IGST (C)
-    igst_amount = subtotal_before_igst * (float(igst_rate) / 100)
-    
-    # Step 9: Calculate Sub Total of Duties (B + i + C)
-    total_duties = bcd_amount + swc_amount + igst_amount
-    
-    # Step 10: Calculate Total Price
-    total_price = assessable_value_inr + total_duties
-    
-    # Step 11: Calculate Clearance/Transportation (5%)
-    clearance_transportation_percentage = 0.05  # 5%
-    clearance_transportation = total_price * clearance_transportation_percentage
-    
-    # Step 12: Calculate Landed Price at Factory
-    landed_price = total_price + clearance_transportation
-    
-    # Step 13: Calculate Final Breakdown (for GST compliance)
-    igst_component_final = landed_price - (landed_price / (1 + (igst_amount / subtotal_before_igst)))
-    basic_price_less_igst_accurate = landed_price - igst_component_final
-    
-    return {
-        'fob_price_usd': fob_price_usd,
-        'freight_insurance_percentage': freight_insurance_percentage,
-        'freight_insurance_amount': freight_insurance_amount,
-        'cif_value_usd': cif_value_usd,
-        'assessable_addition_percentage': assessable_addition_percentage * 100,
-        'assessable_addition_amount': assessable_addition_amount,
-        'assessable_value_usd': assessable_value_usd,
-        'assessable_value_inr': assessable_value_inr,
-        'bcd_rate': bcd_rate,
-        'bcd_amount': bcd_amount,
-        'swc_rate': swc_rate,
-        'swc_amount': swc_amount,
-        'subtotal_before_igst': subtotal_before_igst,
-        'igst_rate': igst_rate,
-        'igst_amount': igst_amount,
-        'total_duties': total_duties,
-        'total_price': total_price,
-        'clearance_transportation_percentage': clearance_transportation_percentage * 100,
-        'clearance_transportation': clearance_transportation,
-        'landed_price': landed_price,
-        'basic_price_less_igst': basic_price_less_igst_accurate,
-        'igst_component_final': igst_component_final,
-        'usd_inr_rate': usd_inr_rate
-    }
+@st.cache_resource
+def get_job_queue():
+    """Process-wide background job queue; identical in-flight lookups share one job"""
+    def run_job(hsn_code, backend, force_refresh):
+        return fetch_rates(hsn_code, force_refresh=force_refresh, backend=backend)
+    return ScrapeJobQueue(run_job, max_workers=DRIVER_POOL_SIZE)
 
-def extract_rates_to_df(html_source, hsn_code):
-    """Extract duty rates from HTML and return as DataFrame"""
-    soup = BeautifulSoup(html_source, "html.parser")
-    rate_mapping = {
-        "Basic Customs Duty (BCD)": "t_bcd_rate",
-        "Social Welfare Surcharge (SWC)": "t_scd_rate",
-        "IGST Levy": "t_igst_rate",
-    }
-    
-    data = {"HSN Code": hsn_code}
-    for rate_name, span_id in rate_mapping.items():
-        span = soup.find("span", id=span_id)
-        data[rate_name] = span.text.strip() if span and span.text.strip() else "0"
-    
-    return pd.DataFrame([data])
-
-def wait_for_value(driver, by, element_id, timeout=30):
-    """Wait for element to have non-empty text content"""
-    wait = WebDriverWait(driver, timeout)
-    wait.until(lambda d: d.find_element(by, element_id).text.strip() != "")
-
-def setup_chrome_driver():
-    """Configure and return Chrome WebDriver with optimized options"""
-    chrome_options = Options()
-    chrome_options.add_argument("--headless=new")
-    chrome_options.add_argument("--disable-gpu")
-    chrome_options.add_argument("--no-sandbox")
-    chrome_options.add_argument("--disable-extensions")
-    chrome_options.add_argument("--disable-infobars")
-    chrome_options.add_argument("--disable-dev-shm-usage")
-    chrome_options.add_argument("--window-size=1920,1080")
-    chrome_options.add_argument("--disable-web-security")
-    chrome_options.add_argument("--user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36")
-    
-    return webdriver.Chrome(options=chrome_options)
-
-def find_hsn_row(driver, hsn_code, max_scrolls=15):
-    """Find and return the target HSN row element"""
-    def find_target_row():
-        divs = driver.find_elements(By.CSS_SELECTOR, "div.row.rowh")
-        for d in divs:
-            if d.get_attribute("value") == hsn_code:
-                return d
-        return None
-
-    scroll_container = driver.find_element(By.CSS_SELECTOR, "div#tmptest1")
-    target_row = find_target_row()
-    
-    if not target_row:
-        last_height = -1
-        for _ in range(max_scrolls):
-            driver.execute_script("arguments[0].scrollTop = arguments[0].scrollHeight", scroll_container)
-            time.sleep(1)
-            new_height = driver.execute_script("return arguments[0].scrollHeight", scroll_container)
-            if new_height == last_height:
-                break
-            last_height = new_height
-            target_row = find_target_row()
-            if target_row:
-                break
-    
-    return target_row
+def describe_rate_source(source):
+    """Status message for where a set of duty rates came from"""
+    return {
+        "index": "Duty rates served from the offline tariff index",
+        "cache": "Duty rates served from local cache",
+        "shared": "Duty rates fetched moments ago by another app worker",
+        "stale": "Duty rates served from local cache (expired, refreshing in background)",
+    }.get(source, "Current duty rates successfully retrieved")
 
-def scrape_hsn_duty(hsn_code):
-    """Main scraping function to extract HSN duty rates"""
-    driver = setup_chrome_driver()
-    wait = WebDriverWait(driver, 25)
+def offer_report_download(name, fingerprint, sheets_fn, file_stem):
+    """Format picker and prepare button; the report is only built when someone asks for it"""
+    fmt = st.radio("Report format:", list(REPORT_FORMATS), horizontal=True, key=f"{name}_report_format")
 
-    try:
-        driver.get(SCRAPING_URL)
-        time.sleep(2)
-        
-        input_box = wait.until(EC.presence_of_element_located((By.NAME, "cth")))
-        input_box.clear()
-        input_box.send_keys(hsn_code)
-        
-        button = wait.until(EC.element_to_be_clickable((By.ID, "submitbutton")))
-        driver.execute_script("arguments[0].scrollIntoView(true);", button)
-        time.sleep(0.5)
-        
-        try:
-            button.click()
-        except Exception:
-            driver.execute_script("arguments[0].click();", button)
-        
-        wait.until(EC.presence_of_element_located((By.CSS_SELECTOR, "div#tmptest1")))
-
-        target_row = find_hsn_row(driver, hsn_code)
-        
-        if not target_row:
-            st.error(f"HSN code {hsn_code} not found in tariff detail list.")
-            return None
-            
-        driver.execute_script("arguments[0].scrollIntoView(true);", target_row)
-        time.sleep(0.5)
-        
+    # Keep only the latest prepared file per report so reruns do not pile up bytes
+    prepared = st.session_state.setdefault("prepared_reports", {})
+    if st.button(f"Prepare {fmt} Report", key=f"{name}_report_prepare"):
         try:
-            wait.until(EC.element_to_be_clickable(target_row))
-            target_row.click()
-        except:
-            driver.execute_script("arguments[0].click();", target_row)
+            with trace("report_export", report=name, format=fmt):
+                prepared[name] = (fingerprint, fmt, export_report(sheets_fn(), fmt))
+        except Exception as e:
+            st.error(f"Could not build {fmt} report: {e}")
 
-        rate_elements = ["t_bcd_rate", "t_scd_rate", "t_igst_rate"]
-        for element_id in rate_elements:
-            try:
-                wait_for_value(driver, By.ID, element_id, 30)
-            except:
-                pass
-
-        time.sleep(2)
-        
-        html_source = driver.page_source
-        df_rates = extract_rates_to_df(html_source, hsn_code)
-        
-        return df_rates
-
-    except Exception as e:
-        st.error(f"An error occurred during scraping: {e}")
-        st.error(traceback.format_exc())
-        return None
-    finally:
-        driver.quit()
-
-def create_excel_download(calc_results, hsn_code):
-    """Create Excel file for download with comprehensive data"""
-    
-    # Create summary data
-    summary_data = {
-        'Parameter': [
-            'FOB Price (USD)',
-            'Freight & Insurance Amount',
-            'CIF Value (USD)', 
-            'Assessable Addition (1%)',
-            'Assessable Value (USD)',
-            'Assessable Value (INR)',
-            f'BCD ({calc_results["bcd_rate"]}%)',
-            f'Social Welfare Surcharge ({calc_results["swc_rate"]}%)',
-            'Subtotal (before IGST)',
-            f'IGST ({calc_results["igst_rate"]}%)',
-            'Total Duties',
-            'Total Price',
-            'Clearance/Transportation (5%)',
-            'LANDED PRICE AT FACTORY',
-            'Basic Price (less IGST)',
-            'IGST Component'
-        ],
-        'Value (Numeric)': [
-            calc_results['fob_price_usd'],
-            calc_results['freight_insurance_amount'],
-            calc_results['cif_value_usd'],
-            calc_results['assessable_addition_amount'],
-            calc_results['assessable_value_usd'],
-            calc_results['assessable_value_inr'],
-            calc_results['bcd_amount'],
-            calc_results['swc_amount'],
-            calc_results['subtotal_before_igst'],
-            calc_results['igst_amount'],
-            calc_results['total_duties'],
-            calc_results['total_price'],
-            calc_results['clearance_transportation'],
-            calc_results['landed_price'],
-            calc_results['basic_price_less_igst'],
-            calc_results['igst_component_final']
-        ],
-        'Value (Formatted)': [
-            f"${calc_results['fob_price_usd']:,.2f}",
-            f"${calc_results['freight_insurance_amount']:,.2f}",
-            f"${calc_results['cif_value_usd']:,.2f}",
-            f"${calc_results['assessable_addition_amount']:,.2f}",
-            f"${calc_results['assessable_value_usd']:,.2f}",
-            f"₹{calc_results['assessable_value_inr']:,.2f}",
-            f"₹{calc_results['bcd_amount']:,.2f}",
-            f"₹{calc_results['swc_amount']:,.2f}",
-            f"₹{calc_results['subtotal_before_igst']:,.2f}",
-            f"₹{calc_results['igst_amount']:,.2f}",
-            f"₹{calc_results['total_duties']:,.2f}",
-            f"₹{calc_results['total_price']:,.2f}",
-            f"₹{calc_results['clearance_transportation']:,.2f}",
-            f"₹{calc_results['landed_price']:,.2f}",
-            f"₹{calc_results['basic_price_less_igst']:,.2f}",
-            f"₹{calc_results['igst_component_final']:,.2f}"
-        ]
-    }
-    
-    # Create metadata
-    metadata = {
-        'Report Information': [
-            'Company',
-            'Report Type', 
-            'HSN Code',
-            'Generated Date',
-            'Generated Time',
-            'Exchange Rate Used',
-            'Buffer Applied',
-            'Final Exchange Rate'
-        ],
-        'Value': [
-            'PAKO India',
-            'Import Cost Calculator',
-            hsn_code,
-            pd.Timestamp.now().strftime('%Y-%m-%d'),
-            pd.Timestamp.now().strftime('%H:%M:%S'),
-            f"₹{calc_results['usd_inr_rate'] - USD_INR_BUFFER:.4f}",
-            f"₹{USD_INR_BUFFER}",
-            f"₹{calc_results['usd_inr_rate']:.4f}"
-        ]
-    }
-    
-    # Create Excel file in memory
-    output = io.BytesIO()
-    with pd.ExcelWriter(output, engine='openpyxl') as writer:
-        # Main calculation sheet
-        pd.DataFrame(summary_data).to_excel(writer, sheet_name='Import Calculation', index=False)
-        
-        # Metadata sheet
-        pd.DataFrame(metadata).to_excel(writer, sheet_name='Report Information', index=False)
-        
-        # Format the Excel file
-        workbook = writer.book
-        worksheet = workbook['Import Calculation']
-        
-        # Auto-adjust column widths
-        for column in worksheet.columns:
-            max_length = 0
-            column_letter = column[0].column_letter
-            for cell in column:
-                try:
-                    if len(str(cell.value)) > max_length:
-                        max_length = len(str(cell.value))
-                except:
-                    pass
-            adjusted_width = min(max_length + 2, 50)
-            worksheet.column_dimensions[column_letter].width = adjusted_width
-    
-    output.seek(0)
-    return output.getvalue()
+    cached = prepared.get(name)
+    if cached and cached[:2] == (fingerprint, fmt):
+        st.download_button(
+            label=f"Download {fmt} Report",
+            data=cached[2],
+            file_name=report_file_name(file_stem, fmt),
+            mime=report_mime_type(fmt),
+            key=f"{name}_report_download"
+        )
 
 def display_calculation_results(calc_results, hsn_code):
     """Display all calculation results in organized sections"""
@@ -435,67 +143,174 @@ def display_calculation_results(calc_results, hsn_code):
     
     # Download options
     st.markdown("### Download Report")
-    col1, col2 = st.columns(2)
-    
-    # Create summary data for CSV
-    summary_data = {
-        'Step': [
-            '1. FOB Price (USD)',
-            '2. Freight & Insurance',
-            '3. CIF Value (USD)', 
-            '4. Assessable Addition (1%)',
-            '5. Assessable Value (USD)',
-            '6. Assessable Value (INR)',
-            f'7. BCD ({calc_results["bcd_rate"]}%)',
-            f'8. Social Welfare Surcharge ({calc_results["swc_rate"]}%)',
-            '9. Subtotal (before IGST)',
-            f'10. IGST ({calc_results["igst_rate"]}%)',
-            '11. Total Duties',
-            '12. Total Price',
-            '13. Clearance/Transportation (5%)',
-            '14. LANDED PRICE AT FACTORY',
-            '15. Basic Price (less IGST)',
-            '16. IGST Component'
-        ],
-        'Value': [
-            f"${calc_results['fob_price_usd']:,.2f}",
-            f"${calc_results['freight_insurance_amount']:,.2f}",
-            f"${calc_results['cif_value_usd']:,.2f}",
-            f"${calc_results['assessable_addition_amount']:,.2f}",
-            f"${calc_results['assessable_value_usd']:,.2f}",
-            f"₹{calc_results['assessable_value_inr']:,.2f}",
-            f"₹{calc_results['bcd_amount']:,.2f}",
-            f"₹{calc_results['swc_amount']:,.2f}",
-            f"₹{calc_results['subtotal_before_igst']:,.2f}",
-            f"₹{calc_results['igst_amount']:,.2f}",
-            f"₹{calc_results['total_duties']:,.2f}",
-            f"₹{calc_results['total_price']:,.2f}",
-            f"₹{calc_results['clearance_transportation']:,.2f}",
-            f"₹{calc_results['landed_price']:,.2f}",
-            f"₹{calc_results['basic_price_less_igst']:,.2f}",
-            f"₹{calc_results['igst_component_final']:,.2f}"
-        ]
-    }
-    
-    summary_df = pd.DataFrame(summary_data)
-    
+    offer_report_download(
+        "calculation",
+        (hsn_code, tuple(calc_results.values())),
+        partial(calculation_report_sheets, calc_results, hsn_code),
+        f"pako_import_calculation_{hsn_code}_{int(time.time())}"
+    )
+
+def display_sensitivity_analysis(fob_price, base_usd_inr_rate, freight_percentage):
+    """What-if grid over FX rate, freight % and buffer for the last fetched duty rates"""
+    last_rates = st.session_state.get("last_rates")
+    if not last_rates:
+        return
+
+    st.markdown("---")
+    st.subheader(f"What-If Sensitivity Analysis (HSN {last_rates['hsn_code']})")
+    st.caption(
+        f"Reuses the fetched rates BCD {last_rates['bcd_rate']}% / SWC {last_rates['swc_rate']}% / "
+        f"IGST {last_rates['igst_rate']}% - no new lookups are made."
+    )
+
+    col1, col2, col3 = st.columns(3)
     with col1:
-        csv_data = summary_df.to_csv(index=False)
-        st.download_button(
-            label="Download CSV Report",
-            data=csv_data,
-            file_name=f"pako_import_calculation_{hsn_code}_{int(time.time())}.csv",
-            mime="text/csv"
-        )
-    
+        fx_spread = st.number_input("USD/INR range (±):", value=3.0, min_value=0.0, format="%.2f")
+        fx_steps = st.number_input("USD/INR steps:", value=25, min_value=1, max_value=500)
     with col2:
-        excel_data = create_excel_download(calc_results, hsn_code)
-        st.download_button(
-            label="Download Excel Report",
-            data=excel_data,
-            file_name=f"pako_import_calculation_{hsn_code}_{int(time.time())}.xlsx",
-            mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+        freight_range = st.slider(
+            "Freight & Insurance % range:", 0.0, 30.0,
+            (min(4.0, freight_percentage), min(max(10.0, freight_percentage), 30.0)),
+            step=0.5
         )
+        freight_steps = st.number_input("Freight steps:", value=25, min_value=1, max_value=500)
+    with col3:
+        buffer_range = st.slider("USD/INR buffer range:", 0.0, 5.0, (0.0, USD_INR_BUFFER * 2), step=0.25)
+        buffer_steps = st.number_input("Buffer steps:", value=5, min_value=1, max_value=50)
+
+    fx_values = np.linspace(base_usd_inr_rate - fx_spread, base_usd_inr_rate + fx_spread, int(fx_steps))
+    freight_values = np.linspace(freight_range[0], freight_range[1], int(freight_steps))
+    buffer_values = np.linspace(buffer_range[0], buffer_range[1], int(buffer_steps))
+
+    start = time.perf_counter()
+    grid_df = calculate_sensitivity_grid(
+        fob_price,
+        fx_values,
+        freight_values,
+        buffer_values,
+        last_rates["bcd_rate"],
+        last_rates["swc_rate"],
+        last_rates["igst_rate"]
+    )
+    elapsed_ms = (time.perf_counter() - start) * 1000
+    st.caption(f"Evaluated {len(grid_df):,} scenarios in {elapsed_ms:.1f} ms")
+
+    buffer_options = [round(float(value), 4) for value in buffer_values]
+    buffer_choice = st.select_slider(
+        "Buffer shown in heatmap:",
+        options=buffer_options,
+        value=min(buffer_options, key=lambda value: abs(value - USD_INR_BUFFER))
+    )
+    heatmap_df = grid_df[np.isclose(grid_df["usd_inr_buffer"], buffer_choice)]
+
+    heatmap = alt.Chart(heatmap_df).mark_rect().encode(
+        x=alt.X("freight_insurance_percentage:O", title="Freight & Insurance %", axis=alt.Axis(format=".1f")),
+        y=alt.Y("base_usd_inr_rate:O", title="Base USD/INR Rate", sort="descending", axis=alt.Axis(format=".2f")),
+        color=alt.Color("landed_price:Q", title="Landed Price (₹)", scale=alt.Scale(scheme="blues")),
+        tooltip=[
+            alt.Tooltip("base_usd_inr_rate:Q", title="Base USD/INR", format=".4f"),
+            alt.Tooltip("usd_inr_buffer:Q", title="Buffer", format=".2f"),
+            alt.Tooltip("freight_insurance_percentage:Q", title="Freight %", format=".2f"),
+            alt.Tooltip("landed_price:Q", title="Landed Price (₹)", format=",.2f"),
+        ]
+    )
+    st.altair_chart(heatmap, use_container_width=True)
+
+    st.download_button(
+        label="Download Sensitivity Grid (CSV)",
+        data=grid_df.to_csv(index=False),
+        file_name=f"pako_sensitivity_{last_rates['hsn_code']}_{int(time.time())}.csv",
+        mime="text/csv"
+    )
+
+def display_performance_panel():
+    """Per-stage p50/p95 timings and counters from the local metrics sink"""
+    records = load_records()
+    if not records:
+        st.info("No timings recorded yet. Run a lookup to collect stage timings.")
+        return
+
+    stage_rows, counters = summarize_stages(records)
+    stage_df = pd.DataFrame(stage_rows)
+    for column in ("p50", "p95", "max"):
+        stage_df[column] = (stage_df[column] * 1000).round(1)
+    stage_df = stage_df.rename(columns={"p50": "p50 (ms)", "p95": "p95 (ms)", "max": "max (ms)"})
+    st.markdown(f"**Stage timings across the last {len(records)} runs**")
+    st.dataframe(stage_df, use_container_width=True, hide_index=True)
+
+    if counters:
+        st.markdown("**Counters**")
+        st.dataframe(pd.DataFrame([counters]), use_container_width=True, hide_index=True)
+
+    lookups = [record for record in records if record["name"] == "duty_rate_lookup"]
+    if lookups:
+        last = lookups[-1]
+        st.markdown(
+            f"**Last lookup:** HSN {last['attributes'].get('hsn_code')} via {last['attributes'].get('backend')} "
+            f"({last['attributes'].get('source', 'failed')}) in {last['duration'] * 1000:,.0f} ms"
+        )
+        if last["spans"]:
+            st.bar_chart(pd.DataFrame(last["spans"]).groupby("stage", sort=False)["duration"].sum() * 1000)
+
+def display_batch_lookup(usd_inr_rate, force_refresh, backend):
+    """Upload a bill of materials and price every line item with concurrent rate lookups"""
+    st.markdown("Upload a CSV or Excel file with columns **HSN Code**, **FOB Price** and optionally **Freight %**.")
+    uploaded_file = st.file_uploader("Bill of Materials:", type=["csv", "xlsx", "xls"])
+    max_workers = st.slider("Concurrent lookups:", min_value=1, max_value=16, value=DEFAULT_MAX_WORKERS)
+
+    if uploaded_file is None or not st.button("RUN BATCH CALCULATION", use_container_width=True):
+        return
+
+    try:
+        batch_df = load_batch_file(uploaded_file, DEFAULT_FREIGHT_INSURANCE_PERCENTAGE)
+    except Exception as e:
+        st.error(f"Could not read batch file: {e}")
+        return
+
+    unique_codes = batch_df["hsn_code"].nunique()
+    st.info(f"{len(batch_df)} line items, {unique_codes} unique HSN codes")
+
+    def fetch_fn(code):
+        return fetch_rates(code, force_refresh=force_refresh, backend=backend)[0]
+
+    def price_fn(line_item, rates):
+        return price_batch_line_item(line_item, rates, usd_inr_rate)
+
+    progress = st.progress(0.0)
+    table = st.empty()
+    rows = []
+    for row in run_batch(batch_df, fetch_fn, price_fn, max_workers=max_workers):
+        rows.append(row)
+        progress.progress(len(rows) / len(batch_df))
+        table.dataframe(pd.DataFrame(rows), use_container_width=True)
+    progress.empty()
+    table.empty()
+
+    # Results live in session state so preparing a download does not re-run the batch
+    st.session_state.batch_results = {"rows": rows, "finished_at": int(time.time())}
+
+def display_batch_results():
+    """Results table and on-demand export for the last batch run"""
+    batch_results = st.session_state.get("batch_results")
+    if not batch_results:
+        return
+
+    rows = batch_results["rows"]
+    st.dataframe(pd.DataFrame(rows), use_container_width=True)
+
+    failed = sum(1 for row in rows if row["status"] != "OK")
+    if failed:
+        st.warning(f"{failed} of {len(rows)} line items could not be priced.")
+    else:
+        st.success(f"All {len(rows)} line items priced.")
+
+    columns = record_columns(rows)
+    offer_report_download(
+        "batch",
+        batch_results["finished_at"],
+        lambda: [ReportSheet("Batch Results", columns, records_to_rows(rows, columns), column_types(columns, records_to_rows(rows, columns)))],
+        f"pako_batch_import_calculation_{batch_results['finished_at']}"
+    )
 
 def main():
     # Page configuration
@@ -563,19 +378,36 @@ def main():
         hsn_code = st.text_input("HSN Code:", value=DEFAULT_HSN_CODE)
         fob_price = st.number_input("Basic Price per Piece (USD FOB):", value=DEFAULT_FOB_PRICE, format="%.2f", min_value=0.01)
         freight_percentage = st.number_input("Freight & Insurance Percentage:", value=DEFAULT_FREIGHT_INSURANCE_PERCENTAGE, format="%.2f", min_value=0.0, max_value=100.0)
+        force_refresh = st.checkbox("Force refresh duty rates", help="Ignore cached rates and fetch live from ICEGATE")
+        backend = st.selectbox("Scraper Backend:", SCRAPER_BACKENDS, index=SCRAPER_BACKENDS.index(DEFAULT_BACKEND), help="HTTP skips the browser and falls back to Selenium when it cannot read the rates")
     
     with col2:
         st.markdown("### Exchange Rate Configuration")
-        api_key = st.text_input("Fixer.io API Key (Optional):", type="password", help="Leave blank to enter rate manually")
+        api_key = st.text_input("Fixer.io API Key (Optional):", type="password", help="Leave blank to use free ECB reference rates or enter the rate manually")
         
-        if api_key and st.button("Fetch Current Exchange Rate"):
+        if st.button("Fetch Current Exchange Rate"):
             try:
                 with st.spinner("Fetching live exchange rate..."):
-                    fetched_rate = get_usd_to_inr_rate(api_key)
-                    st.session_state.usd_inr_rate = fetched_rate
-                    st.success(f"Live rate fetched: {fetched_rate}")
+                    fx_quote = get_usd_to_inr_rate(api_key, force_refresh=st.session_state.get('fx_force_refresh', False))
+                    st.session_state.usd_inr_rate = fx_quote.rate
+                    if fx_quote.stale:
+                        st.warning(f"Rate: {describe_fx_quote(fx_quote)}")
+                    else:
+                        st.success(f"Rate: {describe_fx_quote(fx_quote)}")
             except Exception as e:
                 st.error(f"Error fetching rate: {e}")
+        st.checkbox("Bypass exchange rate cache", key="fx_force_refresh", help=f"Rates are cached for {FX_CACHE_TTL_MINUTES:g} minutes")
+        
+        with st.expander("Other Import Currencies"):
+            if st.button("Fetch EUR / CNY / JPY Rates"):
+                for currency in SUPPORTED_CURRENCIES:
+                    if currency == "USD":
+                        continue
+                    try:
+                        fx_quote = get_fx_service(api_key).get_rate(currency, "INR")
+                        st.write(f"**{currency} to INR:** {describe_fx_quote(fx_quote)}")
+                    except Exception as e:
+                        st.write(f"**{currency} to INR:** unavailable ({e})")
         
         usd_inr_input = st.number_input(
             "USD to INR Rate:", 
@@ -594,46 +426,66 @@ def main():
             st.error("Please enter a valid HSN code.")
             return
 
-        # Step 1: Fetch duty rates
-        with st.spinner("Fetching current duty rates from government database..."):
-            df_rates = scrape_hsn_duty(hsn_code)
-            
-        if df_rates is not None:
-            st.success("Current duty rates successfully retrieved")
-            
-            # Display duty rates
-            st.markdown("## Current Government Duty Rates")
-            st.dataframe(df_rates, use_container_width=True)
-
-            # Process duty rates
-            bcd_val = df_rates.at[0, "Basic Customs Duty (BCD)"].replace('%', '').strip() if df_rates.at[0, "Basic Customs Duty (BCD)"] else "0"
-            swc_val = df_rates.at[0, "Social Welfare Surcharge (SWC)"].replace('%', '').strip() if df_rates.at[0, "Social Welfare Surcharge (SWC)"] else "10"
-            igst_val = df_rates.at[0, "IGST Levy"].replace('%', '').strip() if df_rates.at[0, "IGST Levy"] else "12"
-
-            # Validate and convert rates
-            try:
-                bcd_val = float(bcd_val) if bcd_val else 0.0
-                swc_val = float(swc_val) if swc_val else 10.0
-                igst_val = float(igst_val) if igst_val else 12.0
-            except ValueError:
-                st.warning("Some duty rates could not be parsed. Default values applied.")
-                bcd_val = 0.0
-                swc_val = 10.0  
-                igst_val = 12.0
-
-            # Step 2: Calculate import cost
-            with st.spinner("Performing import cost calculations..."):
-                calc_results = calculate_import_cost(
-                    fob_price,
-                    freight_percentage,
-                    final_rate,
-                    bcd_val,
-                    swc_val,
-                    igst_val
-                )
-            
-            # Step 3: Display results
-            display_calculation_results(calc_results, hsn_code)
+        # Step 1: Queue the duty rate lookup; the job id survives reruns and page refreshes
+        job_id = get_job_queue().submit(hsn_code, backend, force_refresh=force_refresh)
+        st.session_state.scrape_job_id = job_id
+        st.query_params["job"] = job_id
+
+    job_id = st.session_state.get("scrape_job_id") or st.query_params.get("job")
+    job = get_job_queue().get(job_id) if job_id else None
+    if job_id and job is None:
+        st.session_state.pop("scrape_job_id", None)
+        st.query_params.pop("job", None)
+    poll_job = job is not None and not job.finished
+
+    if poll_job:
+        st.progress(job.progress, text=f"Fetching duty rates for HSN {job.hsn_code} from government database: {job.stage}...")
+    elif job is not None and job.status == "failed":
+        st.error(f"Could not fetch duty rates for HSN {job.hsn_code}: {job.error}")
+    elif job is not None:
+        df_rates = pd.DataFrame([job.result])
+        st.success(describe_rate_source(job.source))
+        
+        # Display duty rates
+        st.markdown("## Current Government Duty Rates")
+        st.dataframe(df_rates, use_container_width=True)
+
+        # Process and validate duty rates
+        bcd_val, swc_val, igst_val, defaults_applied = parse_duty_rates(job.result)
+        if defaults_applied:
+            st.warning("Some duty rates could not be parsed. Default values applied.")
+
+        # Step 2: Calculate import cost; reruns recompute it but only the first is traced
+        traced_jobs = st.session_state.setdefault("traced_calculation_jobs", set())
+        with trace("import_cost_calculation", hsn_code=job.hsn_code) if job.job_id not in traced_jobs else nullcontext():
+            calc_results = calculate_import_cost(
+                fob_price,
+                freight_percentage,
+                final_rate,
+                bcd_val,
+                swc_val,
+                igst_val
+            )
+        traced_jobs.add(job.job_id)
+        
+        # Keep the fetched rates so what-if runs never trigger another lookup
+        st.session_state.last_rates = {
+            "hsn_code": job.hsn_code,
+            "bcd_rate": bcd_val,
+            "swc_rate": swc_val,
+            "igst_rate": igst_val
+        }
+
+        # Step 3: Display results
+        display_calculation_results(calc_results, job.hsn_code)
+
+    # What-if analysis on the last fetched rates
+    display_sensitivity_analysis(fob_price, usd_inr_input, freight_percentage)
+
+    # Batch lookup
+    with st.expander("Batch Lookup (Bill of Materials Upload)"):
+        display_batch_lookup(final_rate, force_refresh, backend)
+        display_batch_results()
 
     # Company Guidelines
     with st.expander("PAKO Company Guidelines"):
@@ -651,16 +503,51 @@ def main():
 
     # Technical Information
     with st.expander("System Information"):
-        st.markdown("""
+        st.markdown(f"""
         **Technical Details:**
         
         - **Data Source:** Live duty rates from Indian Customs (ICEGate)
         - **Calculation Method:** Replicates PAKO Excel template formulas exactly
         - **Compliance:** GST-compliant breakdown provided
         - **Export Options:** CSV and Excel formats available
-        - **Update Frequency:** Real-time duty rate fetching
+        - **Update Frequency:** Duty rates cached locally for {RATE_CACHE_TTL_HOURS:g} hours, use "Force refresh" for a live fetch
+        - **Rate Store:** {"Shared across app workers (" + SHARED_STORE_PATH + ")" if SHARED_STORE_PATH else "Local to this app process"}
         """)
     
+    # Offline tariff index
+    with st.expander("Offline Tariff Index"):
+        tariff_index = get_tariff_index()
+        indexed_codes, indexed_chapters = tariff_index.stats()
+        st.caption(f"{indexed_codes} HSN codes across {indexed_chapters} chapters. Bulk-load a schedule with `python tariff_index.py load <file>`.")
+        prefix = st.text_input("Search by chapter or HSN prefix:", key="tariff_prefix")
+        if prefix:
+            matches = tariff_index.prefix_query(prefix.strip())
+            if matches:
+                st.dataframe(pd.DataFrame(matches), use_container_width=True)
+            else:
+                st.info(f"No indexed HSN codes start with {prefix}.")
+
+    # Performance breakdown
+    with st.expander("Performance"):
+        display_performance_panel()
+
+    # Browser session pool
+    with st.expander("Browser Session Pool"):
+        pool_metrics = get_driver_pool().metrics()
+        col1, col2, col3, col4 = st.columns(4)
+        with col1:
+            st.metric("Active Sessions", f"{pool_metrics['active_sessions']} / {pool_metrics['max_size']}")
+        with col2:
+            st.metric("Idle Sessions", pool_metrics['idle_sessions'])
+        with col3:
+            st.metric("Avg Wait", f"{pool_metrics['avg_wait_seconds']:.2f}s")
+        with col4:
+            st.metric("Max Wait", f"{pool_metrics['max_wait_seconds']:.2f}s")
+        st.caption(
+            f"Checkouts: {pool_metrics['checkouts']} | Queued: {pool_metrics['waits']} | "
+            f"Created: {pool_metrics['created']} | Recycled: {pool_metrics['recycled']} | Crashed: {pool_metrics['crashed']}"
+        )
+    
     # Footer
     st.markdown("""
     <div class="footer">
@@ -671,6 +558,11 @@ def main():
     </div>
     """, unsafe_allow_html=True)
 
+    # Poll the background lookup after the rest of the page has rendered
+    if poll_job:
+        time.sleep(JOB_POLL_SECONDS)
+        st.rerun()
+
 if __name__ == "__main__":
     # Initialize session state
     if 'usd_inr_rate' not in st.session_state:
@@ -0,0 +1,199 @@
+import argparse
+import csv
+import os
+import sqlite3
+import time
+
+# Constants
+DEFAULT_INDEX_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "hsn_tariff_index.sqlite3")
+RATE_COLUMNS = {
+    "bcd": "Basic Customs Duty (BCD)",
+    "swc": "Social Welfare Surcharge (SWC)",
+    "igst": "IGST Levy",
+}
+COLUMN_ALIASES = {
+    "hsn_code": ["hsn code", "hsn_code", "hsn", "cth", "tariff item"],
+    "bcd": ["bcd", "basic customs duty (bcd)", "basic customs duty", "bcd rate"],
+    "swc": ["swc", "social welfare surcharge (swc)", "social welfare surcharge", "swc rate"],
+    "igst": ["igst", "igst levy", "igst rate"],
+}
+BULK_BATCH_SIZE = 5000
+# Rows written back from live lookups carry this source prefix, e.g. "scrape:selenium"
+SCRAPE_SOURCE_PREFIX = "scrape"
+
+
+class TariffIndex:
+    """
+    Local HSN -> BCD/SWC/IGST index stored in SQLite
+
+    Rows live in a WITHOUT ROWID table clustered on the HSN code, so exact
+    lookups and chapter/prefix range scans both read one contiguous b-tree range.
+    """
+
+    def __init__(self, path=DEFAULT_INDEX_PATH):
+        self.path = path
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with self._connect() as conn:
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS tariff (
+                    hsn_code TEXT PRIMARY KEY,
+                    bcd TEXT,
+                    swc TEXT,
+                    igst TEXT,
+                    source TEXT NOT NULL,
+                    updated_at REAL NOT NULL
+                ) WITHOUT ROWID
+                """
+            )
+
+    def _connect(self):
+        return sqlite3.connect(self.path, timeout=30)
+
+    def _to_rates(self, row):
+        hsn_code, bcd, swc, igst, source, updated_at = row
+        return {
+            "HSN Code": hsn_code,
+            RATE_COLUMNS["bcd"]: bcd,
+            RATE_COLUMNS["swc"]: swc,
+            RATE_COLUMNS["igst"]: igst,
+            "Source": source,
+            "Updated": time.strftime("%Y-%m-%d", time.localtime(updated_at)),
+        }
+
+    def lookup(self, hsn_code, max_scrape_age_seconds=None):
+        """
+        Return the rates dict for an exact HSN code, or None if it is not indexed
+
+        With max_scrape_age_seconds set, rows written back from a live scrape
+        older than that are treated as missing; bulk-loaded rows always match.
+        """
+        query, params = "SELECT * FROM tariff WHERE hsn_code = ?", [hsn_code]
+        if max_scrape_age_seconds is not None:
+            query += " AND (source NOT LIKE ? OR updated_at >= ?)"
+            params += [f"{SCRAPE_SOURCE_PREFIX}%", time.time() - max_scrape_age_seconds]
+        with self._connect() as conn:
+            row = conn.execute(query, params).fetchone()
+        return self._to_rates(row) if row else None
+
+    def prefix_query(self, prefix, limit=500):
+        """Return rates for every HSN code starting with prefix (e.g. a 2-digit chapter)"""
+        # Range scan on the primary key; "~" sorts after every digit
+        with self._connect() as conn:
+            rows = conn.execute(
+                "SELECT * FROM tariff WHERE hsn_code >= ? AND hsn_code < ? ORDER BY hsn_code LIMIT ?",
+                (prefix, prefix + "~", limit),
+            ).fetchall()
+        return [self._to_rates(row) for row in rows]
+
+    def upsert(self, hsn_code, rates, source="scrape"):
+        """Insert or refresh one HSN code from a scraped rates dict"""
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO tariff VALUES (?, ?, ?, ?, ?, ?)",
+                (
+                    hsn_code,
+                    rates.get(RATE_COLUMNS["bcd"]),
+                    rates.get(RATE_COLUMNS["swc"]),
+                    rates.get(RATE_COLUMNS["igst"]),
+                    source,
+                    time.time(),
+                ),
+            )
+
+    def bulk_load(self, file_path, source=None):
+        """Load a CSV/Excel tariff schedule of HSN -> BCD/SWC/IGST, returning the row count"""
+        source = source or os.path.basename(file_path)
+        now = time.time()
+
+        def records():
+            for row in read_schedule(file_path):
+                yield (row["hsn_code"], row["bcd"], row["swc"], row["igst"], source, now)
+
+        count = 0
+        with self._connect() as conn:
+            batch = []
+            for record in records():
+                batch.append(record)
+                if len(batch) >= BULK_BATCH_SIZE:
+                    conn.executemany("INSERT OR REPLACE INTO tariff VALUES (?, ?, ?, ?, ?, ?)", batch)
+                    count += len(batch)
+                    batch = []
+            if batch:
+                conn.executemany("INSERT OR REPLACE INTO tariff VALUES (?, ?, ?, ?, ?, ?)", batch)
+                count += len(batch)
+        return count
+
+    def stats(self):
+        """Return (indexed code count, chapter count)"""
+        with self._connect() as conn:
+            return conn.execute("SELECT COUNT(*), COUNT(DISTINCT substr(hsn_code, 1, 2)) FROM tariff").fetchone()
+
+
+def read_schedule(file_path):
+    """Yield normalized hsn_code/bcd/swc/igst rows from a CSV or Excel tariff schedule"""
+    if file_path.lower().endswith((".xlsx", ".xls")):
+        import pandas as pd
+        yield from normalize_schedule_rows(pd.read_excel(file_path, dtype=str).fillna("").to_dict("records"))
+    else:
+        with open(file_path, newline="", encoding="utf-8-sig") as handle:
+            yield from normalize_schedule_rows(csv.DictReader(handle))
+
+
+def normalize_schedule_rows(rows):
+    """Map schedule rows with arbitrary column headers onto hsn_code/bcd/swc/igst"""
+    columns = None
+    for row in rows:
+        if columns is None:
+            lookup = {str(column).strip().lower(): column for column in row}
+            columns = {}
+            for field, aliases in COLUMN_ALIASES.items():
+                columns[field] = next((lookup[alias] for alias in aliases if alias in lookup), None)
+            if columns["hsn_code"] is None:
+                raise ValueError("Tariff schedule has no HSN code column.")
+
+        hsn_code = "".join(str(row[columns["hsn_code"]]).split())
+        if not hsn_code:
+            continue
+        yield {
+            "hsn_code": hsn_code,
+            **{
+                field: str(row[columns[field]]).replace("%", "").strip() if columns[field] else None
+                for field in RATE_COLUMNS
+            },
+        }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build and query the offline HSN tariff index")
+    parser.add_argument("--index", default=DEFAULT_INDEX_PATH, help="Path to the SQLite index file")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    load_parser = commands.add_parser("load", help="Bulk-load a CSV/Excel tariff schedule")
+    load_parser.add_argument("file")
+    load_parser.add_argument("--source", help="Label stored with every loaded row")
+
+    lookup_parser = commands.add_parser("lookup", help="Look up one HSN code")
+    lookup_parser.add_argument("hsn_code")
+
+    prefix_parser = commands.add_parser("prefix", help="List HSN codes under a chapter/prefix")
+    prefix_parser.add_argument("prefix")
+    prefix_parser.add_argument("--limit", type=int, default=500)
+
+    args = parser.parse_args()
+    index = TariffIndex(args.index)
+
+    if args.command == "load":
+        start = time.perf_counter()
+        count = index.bulk_load(args.file, args.source)
+        print(f"Loaded {count} tariff rows in {time.perf_counter() - start:.2f}s")
+    elif args.command == "lookup":
+        rates = index.lookup(args.hsn_code)
+        print(rates if rates else f"HSN code {args.hsn_code} not in index.")
+    else:
+        for rates in index.prefix_query(args.prefix, args.limit):
+            print(rates)
+
+
+if __name__ == "__main__":
+    main()
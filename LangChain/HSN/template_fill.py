@@ -0,0 +1,259 @@
+import argparse
+import io
+import json
+import os
+import re
+import zipfile
+from concurrent.futures import ThreadPoolExecutor
+from xml.sax.saxutils import quoteattr
+from formula_engine import FormulaSheet
+
+# Constants
+DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data")
+DEFAULT_TEMPLATE_PATH = os.path.join(DATA_DIR, "Import Calculator With GST revised with BCD.xlsx")
+DEFAULT_OUTPUT_DIR = os.path.join(DATA_DIR, "HSN_OUTPUT_FILES")
+DEFAULT_MAX_WORKERS = 4
+# Input field -> template cell; field names follow calculate_import_cost's arguments
+DEFAULT_CELL_MAP = {
+    "usd_inr_rate": "C1",
+    "fob_price_usd": "C4",
+    "freight_insurance_percentage": "B5",
+    "bcd_rate": "B10",
+    "swc_rate": "B11",
+    "igst_rate": "B13",
+}
+# The template holds these as fractions (0.15), the app as percentages (15)
+DEFAULT_PERCENT_FIELDS = {"freight_insurance_percentage", "bcd_rate", "swc_rate", "igst_rate"}
+# calculate_import_cost result key -> template cell holding the same quantity
+DEFAULT_OUTPUT_MAP = {
+    "freight_insurance_amount": "C5",
+    "cif_value_usd": "C6",
+    "assessable_addition_amount": "C7",
+    "assessable_value_usd": "C8",
+    "assessable_value_inr": "C9",
+    "bcd_amount": "C10",
+    "swc_amount": "C11",
+    "subtotal_before_igst": "C12",
+    "igst_amount": "C13",
+    "total_duties": "C14",
+    "total_price": "C15",
+    "clearance_transportation": "C16",
+    "landed_price": "C17",
+    "basic_price_less_igst": "C18",
+    "igst_component_final": "C19",
+}
+SHEET_PATH = "xl/worksheets/sheet1.xml"
+CELL_PATTERN = re.compile(r'<c r="([A-Z]+\d+)"([^>]*?)(?:/>|>(.*?)</c>)', re.DOTALL)
+FORMULA_TAG_PATTERN = re.compile(r"<f\b[^>]*?(?:/>|>.*?</f>)", re.DOTALL)
+TYPE_ATTR_PATTERN = re.compile(r'\s+t="[^"]*"')
+INVALID_SHEET_CHARS = re.compile(r"[\[\]:*?/\\]")
+INVALID_FILE_CHARS = re.compile(r"[^\w.-]")
+WORKSHEET_CONTENT_TYPE = "application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"
+WORKSHEET_REL_TYPE = "http://schemas.openxmlformats.org/officeDocument/2006/relationships/worksheet"
+
+
+def sheet_title(title, used):
+    """Excel-safe, unique sheet title (31 chars, no []:*?/\\)"""
+    base = INVALID_SHEET_CHARS.sub("_", str(title))[:31] or "Sheet"
+    candidate, suffix = base, 2
+    while candidate.lower() in used:
+        candidate = f"{base[:31 - len(str(suffix)) - 1]}_{suffix}"
+        suffix += 1
+    used.add(candidate.lower())
+    return candidate
+
+
+def output_file_name(hsn_code):
+    """Per-code workbook name, as HSN_Bot has always named them"""
+    return f"HSN_{INVALID_FILE_CHARS.sub('_', hsn_code)}_output.xlsx"
+
+
+class WorkbookTemplate:
+    """
+    Import calculator template parsed once and stamped out as filled workbooks
+
+    The template's package parts are kept in memory and only the worksheet XML is
+    rewritten per fill, so styles, widths, merged cells and formulas are kept as
+    the template has them. Formula cells get their values from the Python formula
+    engine, so output files show results even before Excel recalculates.
+    """
+
+    def __init__(self, path=DEFAULT_TEMPLATE_PATH, cell_map=None, percent_fields=None):
+        self.path = path
+        self.cell_map = dict(cell_map or DEFAULT_CELL_MAP)
+        self.percent_fields = set(DEFAULT_PERCENT_FIELDS if percent_fields is None else percent_fields)
+
+        with zipfile.ZipFile(path) as package:
+            self.parts = {info.filename: package.read(info) for info in package.infolist()}
+        self.sheet = FormulaSheet.from_workbook(path)
+        self.sheet_xml = self.parts[SHEET_PATH].decode("utf-8")
+
+        template_cells = {match.group(1) for match in CELL_PATTERN.finditer(self.sheet_xml)}
+        missing = [f"{field} -> {cell}" for field, cell in self.cell_map.items() if cell not in template_cells]
+        if missing:
+            raise Exception(f"Cell map points at cells missing from the template: {', '.join(missing)}")
+
+    def cell_inputs(self, inputs):
+        """Translate input fields to template cell values, scaling percentages to fractions"""
+        cells = {}
+        for field, cell in self.cell_map.items():
+            if field not in inputs:
+                continue
+            value = float(str(inputs[field] or 0).replace("%", "").strip() or 0)
+            cells[cell] = value / 100 if field in self.percent_fields else value
+        return cells
+
+    def evaluate(self, inputs):
+        """All template cell values for the given input fields"""
+        return self.sheet.evaluate(self.cell_inputs(inputs))
+
+    def calculator(self, output_map=None):
+        """
+        The template's formulas compiled into a calculate_import_cost-style function
+
+        Takes the cell map's fields as arguments (scalars or NumPy arrays) and returns
+        a dict keyed like calculate_import_cost's results.
+        """
+        return self.sheet.compile(
+            self.cell_map,
+            output_map or DEFAULT_OUTPUT_MAP,
+            percent_inputs=self.percent_fields,
+            name="calculate_from_template",
+        )
+
+    def _filled_sheet_xml(self, inputs):
+        cell_inputs = self.cell_inputs(inputs)
+        values = self.sheet.evaluate(cell_inputs)
+        changed = set(cell_inputs) | set(self.sheet.formulas)
+
+        def fill_cell(match):
+            coordinate, attributes, body = match.groups()
+            if coordinate not in changed:
+                return match.group(0)
+            formula = FORMULA_TAG_PATTERN.search(body or "")
+            attributes = TYPE_ATTR_PATTERN.sub("", attributes)
+            return f'<c r="{coordinate}"{attributes}>{formula.group(0) if formula else ""}<v>{values[coordinate]!r}</v></c>'
+
+        return CELL_PATTERN.sub(fill_cell, self.sheet_xml)
+
+    def _workbook_xml(self):
+        # Cached values come from Python; still have Excel recalculate when the file is opened
+        workbook_xml = self.parts["xl/workbook.xml"].decode("utf-8")
+        if "fullCalcOnLoad" not in workbook_xml:
+            workbook_xml = re.sub(r"<calcPr\b", '<calcPr fullCalcOnLoad="1"', workbook_xml, count=1)
+        return workbook_xml
+
+    def _package(self, replaced):
+        output = io.BytesIO()
+        with zipfile.ZipFile(output, "w", zipfile.ZIP_DEFLATED) as package:
+            for name, data in self.parts.items():
+                if name in replaced and replaced[name] is None:
+                    continue
+                package.writestr(name, replaced.get(name, data))
+            for name, data in replaced.items():
+                if name not in self.parts and data is not None:
+                    package.writestr(name, data)
+        return output.getvalue()
+
+    def render_workbook(self, inputs):
+        """One filled workbook as .xlsx bytes"""
+        return self._package({
+            SHEET_PATH: self._filled_sheet_xml(inputs),
+            "xl/workbook.xml": self._workbook_xml(),
+        })
+
+    def render_sheets(self, sheets, max_workers=DEFAULT_MAX_WORKERS):
+        """One workbook with a filled copy of the template sheet per (title, inputs) pair"""
+        used_titles = set()
+        titles = [sheet_title(title, used_titles) for title, _ in sheets]
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            sheet_xmls = list(executor.map(lambda item: self._filled_sheet_xml(item[1]), sheets))
+
+        replaced = {"xl/calcChain.xml": None}  # Excel rebuilds the chain for the new sheets
+        sheet_entries, relationships, overrides = [], [], []
+        for index, (title, sheet_xml) in enumerate(zip(titles, sheet_xmls), start=1):
+            if index > 1:
+                # Copies share the template's styles and strings but not its printer settings part
+                sheet_xml = sheet_xml.replace('tabSelected="1"', 'tabSelected="0"')
+                sheet_xml = re.sub(r'(<pageSetup\b[^>]*?)\s+r:id="[^"]*"', r"\1", sheet_xml)
+                overrides.append(f'<Override PartName="/xl/worksheets/sheet{index}.xml" ContentType="{WORKSHEET_CONTENT_TYPE}"/>')
+                relationships.append(f'<Relationship Id="rIdSheet{index}" Type="{WORKSHEET_REL_TYPE}" Target="worksheets/sheet{index}.xml"/>')
+            relationship_id = "rId1" if index == 1 else f"rIdSheet{index}"
+            sheet_entries.append(f'<sheet name={quoteattr(title)} sheetId="{index}" r:id="{relationship_id}"/>')
+            replaced[f"xl/worksheets/sheet{index}.xml"] = sheet_xml
+
+        workbook_xml = re.sub(r"<sheets>.*?</sheets>", lambda _: f"<sheets>{''.join(sheet_entries)}</sheets>", self._workbook_xml(), flags=re.DOTALL)
+        replaced["xl/workbook.xml"] = workbook_xml
+
+        rels = self.parts["xl/_rels/workbook.xml.rels"].decode("utf-8")
+        rels = re.sub(r'<Relationship\b[^>]*Target="calcChain\.xml"[^>]*/>', "", rels)
+        replaced["xl/_rels/workbook.xml.rels"] = rels.replace("</Relationships>", "".join(relationships) + "</Relationships>")
+
+        content_types = self.parts["[Content_Types].xml"].decode("utf-8")
+        content_types = re.sub(r'<Override PartName="/xl/calcChain\.xml"[^>]*/>', "", content_types)
+        replaced["[Content_Types].xml"] = content_types.replace("</Types>", "".join(overrides) + "</Types>")
+
+        return self._package(replaced)
+
+    def write_workbooks(self, items, output_dir=DEFAULT_OUTPUT_DIR, max_workers=DEFAULT_MAX_WORKERS):
+        """Write one filled workbook per (file name, inputs) pair in parallel; returns the written paths"""
+        os.makedirs(output_dir, exist_ok=True)
+
+        def write(item):
+            file_name, inputs = item
+            path = os.path.join(output_dir, file_name)
+            with open(path, "wb") as handle:
+                handle.write(self.render_workbook(inputs))
+            return path
+
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            return list(executor.map(write, items))
+
+
+def load_cell_map(path):
+    """Cell map from a JSON file: {"cells": {field: cell}, "percent_fields": [...]} or just {field: cell}"""
+    with open(path, encoding="utf-8") as handle:
+        config = json.load(handle)
+    if "cells" in config:
+        return config["cells"], config.get("percent_fields")
+    return config, None
+
+
+def read_fill_items(path, usd_inr_rate):
+    """Line items from a CSV/Excel file with hsn_code and calculate_import_cost input columns"""
+    import pandas as pd
+    frame = pd.read_csv(path, dtype={"hsn_code": str}) if path.lower().endswith(".csv") else pd.read_excel(path, dtype={"hsn_code": str})
+    items = []
+    for record in frame.to_dict("records"):
+        record.setdefault("usd_inr_rate", usd_inr_rate)
+        items.append((str(record["hsn_code"]).strip(), record))
+    return items
+
+
+if __name__ == "__main__":
+    import time
+
+    parser = argparse.ArgumentParser(description="Fill the import calculator template for many HSN codes")
+    parser.add_argument("items", help="CSV/Excel with hsn_code, fob_price_usd, freight_insurance_percentage, bcd_rate, swc_rate, igst_rate")
+    parser.add_argument("--usd-inr", type=float, help="Exchange rate for rows without a usd_inr_rate column")
+    parser.add_argument("--template", default=DEFAULT_TEMPLATE_PATH)
+    parser.add_argument("--cell-map", help="JSON file mapping input fields to template cells")
+    parser.add_argument("--output-dir", default=DEFAULT_OUTPUT_DIR)
+    parser.add_argument("--single-workbook", help="Write one workbook with a sheet per HSN code to this path instead")
+    parser.add_argument("--workers", type=int, default=DEFAULT_MAX_WORKERS)
+    args = parser.parse_args()
+
+    cell_map, percent_fields = load_cell_map(args.cell_map) if args.cell_map else (None, None)
+    template = WorkbookTemplate(args.template, cell_map, percent_fields)
+    items = read_fill_items(args.items, args.usd_inr)
+
+    start = time.perf_counter()
+    if args.single_workbook:
+        with open(args.single_workbook, "wb") as handle:
+            handle.write(template.render_sheets(items, max_workers=args.workers))
+        print(f"Wrote {len(items)} sheets to {args.single_workbook} in {time.perf_counter() - start:.2f}s")
+    else:
+        paths = template.write_workbooks(
+            [(output_file_name(code), inputs) for code, inputs in items], args.output_dir, max_workers=args.workers
+        )
+        print(f"Wrote {len(paths)} workbooks to {args.output_dir} in {time.perf_counter() - start:.2f}s")
@@ -0,0 +1,16 @@
+import os
+import sys
+import pytest
+
+# The HSN modules import each other as top-level modules, as when run from LangChain/HSN
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import perf_metrics  # noqa: E402
+
+
+@pytest.fixture(autouse=True)
+def metrics_path(tmp_path, monkeypatch):
+    """Keep traces written during tests out of the app's data directory"""
+    path = str(tmp_path / "perf_metrics.jsonl")
+    monkeypatch.setattr(perf_metrics, "METRICS_PATH", path)
+    return path
@@ -0,0 +1,54 @@
+import pytest
+from batch_lookup import load_batch_file, run_batch
+
+RATES = {"Basic Customs Duty (BCD)": "10", "Social Welfare Surcharge (SWC)": "10", "IGST Levy": "18"}
+
+
+@pytest.fixture
+def batch_file(tmp_path):
+    path = tmp_path / "bom.csv"
+    path.write_text(
+        "HSN Code,FOB Price,Freight %\n"
+        "73182100,350,\n"
+        "73182100,350,abc\n"
+        '73182100,350,"8,5"\n'
+        "73182100,350,8\n"
+        "73182100,,8\n"
+        "73182100,xyz,abc\n"
+    )
+    return str(path)
+
+
+def test_blank_freight_gets_default_and_bad_values_fail(batch_file):
+    batch_df = load_batch_file(batch_file, 6.0)
+    assert list(batch_df["error"]) == [
+        "",
+        "Invalid freight percentage 'abc'",
+        "Invalid freight percentage '8,5'",
+        "",
+        "Missing FOB price",
+        "Invalid FOB price 'xyz'",
+    ]
+    assert batch_df["freight_percentage"][0] == 6.0
+    assert batch_df["freight_percentage"][3] == 8.0
+
+
+def test_rows_with_errors_fail_without_pricing(batch_file):
+    batch_df = load_batch_file(batch_file, 6.0)
+    priced = []
+
+    def price_fn(line_item, rates):
+        priced.append(line_item["freight_percentage"])
+        return {"hsn_code": line_item["hsn_code"], "freight_percentage": line_item["freight_percentage"]}
+
+    rows = list(run_batch(batch_df, lambda code: (RATES, "index"), price_fn))
+    assert sorted(priced) == [6.0, 8.0]
+    assert [row["status"] for row in rows].count("OK") == 2
+    failed = [row for row in rows if row["status"] != "OK"]
+    assert {row["status"] for row in failed} == {
+        "Failed: Invalid freight percentage 'abc'",
+        "Failed: Invalid freight percentage '8,5'",
+        "Failed: Missing FOB price",
+        "Failed: Invalid FOB price 'xyz'",
+    }
+    assert all(row["freight_percentage"] is None or row["freight_percentage"] == 8.0 for row in failed)
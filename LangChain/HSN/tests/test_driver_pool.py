@@ -0,0 +1,147 @@
+import itertools
+import threading
+import time
+import pytest
+from driver_pool import DriverPool, PoolExhaustedError
+
+
+class FakeDriver:
+    """WebDriver stand-in whose health check can fail or be slow"""
+
+    def __init__(self, driver_id, check_seconds=0.0):
+        self.driver_id = driver_id
+        self.check_seconds = check_seconds
+        self.alive = True
+        self.quit_calls = 0
+
+    @property
+    def current_url(self):
+        time.sleep(self.check_seconds)
+        if not self.alive:
+            raise Exception("browser gone")
+        return "about:blank"
+
+    def quit(self):
+        self.quit_calls += 1
+
+
+class FakeFactory:
+    def __init__(self, check_seconds=0.0):
+        self.check_seconds = check_seconds
+        self.created = []
+        self._ids = itertools.count(1)
+
+    def __call__(self):
+        driver = FakeDriver(next(self._ids), self.check_seconds)
+        self.created.append(driver)
+        return driver
+
+
+def test_idle_driver_is_reused():
+    factory = FakeFactory()
+    pool = DriverPool(factory, max_size=2)
+    with pool.session() as first:
+        pass
+    with pool.session() as second:
+        pass
+    assert first is second
+    assert pool.metrics()["created"] == 1
+    assert pool.metrics()["checkouts"] == 2
+
+
+def test_driver_is_recycled_after_max_uses():
+    factory = FakeFactory()
+    pool = DriverPool(factory, max_size=1, max_uses=2)
+    drivers = []
+    for _ in range(3):
+        with pool.session() as driver:
+            drivers.append(driver)
+    assert drivers[0] is drivers[1] is not drivers[2]
+    assert drivers[0].quit_calls == 1
+    assert pool.metrics()["recycled"] == 1
+
+
+def test_dead_idle_driver_is_replaced_on_acquire():
+    factory = FakeFactory()
+    pool = DriverPool(factory, max_size=1)
+    with pool.session() as driver:
+        pass
+    driver.alive = False
+    with pool.session() as replacement:
+        assert replacement is not driver
+    assert driver.quit_calls == 1
+    assert pool.metrics()["crashed"] == 1
+
+
+def test_driver_that_died_silently_counts_as_crashed():
+    pool = DriverPool(FakeFactory(), max_size=1)
+    driver = pool.acquire()
+    driver.alive = False
+    pool.release(driver)
+    metrics = pool.metrics()
+    assert (metrics["crashed"], metrics["recycled"], metrics["idle_sessions"]) == (1, 0, 0)
+
+
+def test_failed_session_with_dead_browser_is_discarded():
+    pool = DriverPool(FakeFactory(), max_size=1)
+    with pytest.raises(ValueError):
+        with pool.session() as driver:
+            driver.alive = False
+            raise ValueError("page failed")
+    assert pool.metrics()["crashed"] == 1
+    assert pool.metrics()["idle_sessions"] == 0
+
+
+def test_exhausted_pool_queues_until_release():
+    pool = DriverPool(FakeFactory(), max_size=1, acquire_timeout=5)
+    driver = pool.acquire()
+    acquired = []
+    waiter = threading.Thread(target=lambda: acquired.append(pool.acquire()))
+    waiter.start()
+    time.sleep(0.1)
+    assert acquired == []
+    pool.release(driver)
+    waiter.join(5)
+    assert acquired == [driver]
+    assert pool.metrics()["waits"] == 1
+
+
+def test_exhausted_pool_times_out():
+    pool = DriverPool(FakeFactory(), max_size=1, acquire_timeout=0.1)
+    pool.acquire()
+    with pytest.raises(PoolExhaustedError):
+        pool.acquire()
+    assert pool.metrics()["active_sessions"] == 1
+
+
+def test_health_checks_run_outside_the_lock():
+    factory = FakeFactory(check_seconds=0.3)
+    pool = DriverPool(factory, max_size=3)
+    drivers = [pool.acquire() for _ in range(3)]
+    for driver in drivers:
+        driver.check_seconds = 0.0
+        pool.release(driver)
+        driver.check_seconds = 0.3
+
+    start = time.monotonic()
+    threads = [threading.Thread(target=pool.acquire) for _ in range(3)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(5)
+    # Three 0.3s checks in parallel, not one after another under the lock
+    assert time.monotonic() - start < 0.8
+    assert pool.metrics()["active_sessions"] == 3
+
+
+def test_close_quits_idle_drivers_and_rejects_acquire():
+    pool = DriverPool(FakeFactory(), max_size=2)
+    idle = pool.acquire()
+    busy = pool.acquire()
+    pool.release(idle)
+    pool.close()
+    assert idle.quit_calls == 1
+    pool.release(busy)
+    assert busy.quit_calls == 1
+    with pytest.raises(RuntimeError):
+        pool.acquire()
@@ -0,0 +1,75 @@
+import time
+import pytest
+import hsn_core
+from rate_cache import RateCache
+from tariff_index import TariffIndex
+
+RATES = {"Basic Customs Duty (BCD)": "10", "Social Welfare Surcharge (SWC)": "10", "IGST Levy": "18"}
+MISSING = {"Basic Customs Duty (BCD)": "0", "Social Welfare Surcharge (SWC)": "0", "IGST Levy": "0"}
+
+
+@pytest.fixture
+def stores(tmp_path, monkeypatch):
+    tariff_index = TariffIndex(str(tmp_path / "index.sqlite3"))
+    rate_cache = RateCache(str(tmp_path / "cache.sqlite3"), stale_while_revalidate=False)
+    fetched = []
+
+    def fake_fetch(hsn_code):
+        fetched.append(hsn_code)
+        return dict(scraped_rates)
+
+    scraped_rates = dict(RATES)
+    monkeypatch.setattr(hsn_core, "get_tariff_index", lambda: tariff_index)
+    monkeypatch.setattr(hsn_core, "get_rate_cache", lambda: rate_cache)
+    monkeypatch.setattr(hsn_core, "get_rates_fetcher", lambda backend: fake_fetch)
+    return tariff_index, rate_cache, fetched, scraped_rates
+
+
+def age_index_row(tariff_index, hsn_code, hours):
+    with tariff_index._connect() as conn:
+        conn.execute("UPDATE tariff SET updated_at = ? WHERE hsn_code = ?", (time.time() - hours * 3600, hsn_code))
+
+
+def test_bulk_loaded_rows_are_served_from_index(stores):
+    tariff_index, _, fetched, _ = stores
+    tariff_index.upsert("73182100", RATES, source="schedule.csv")
+    age_index_row(tariff_index, "73182100", hsn_core.RATE_CACHE_TTL_HOURS * 2)
+    _, source = hsn_core.fetch_rates("73182100")
+    assert source == "index"
+    assert fetched == []
+
+
+def test_recent_scrape_is_served_from_index(stores):
+    _, _, fetched, _ = stores
+    assert hsn_core.fetch_rates("73182100")[1] == "live"
+    assert hsn_core.fetch_rates("73182100")[1] == "index"
+    assert fetched == ["73182100"]
+
+
+def test_expired_scrape_falls_through_to_rate_cache(stores):
+    tariff_index, rate_cache, fetched, _ = stores
+    hsn_core.fetch_rates("73182100")
+    age_index_row(tariff_index, "73182100", hsn_core.RATE_CACHE_TTL_HOURS + 1)
+    assert hsn_core.fetch_rates("73182100")[1] == "cache"
+
+    rate_cache.invalidate("73182100")
+    assert hsn_core.fetch_rates("73182100")[1] == "live"
+    assert fetched == ["73182100", "73182100"]
+
+
+def test_scrape_without_rates_is_not_indexed(stores):
+    tariff_index, _, fetched, scraped_rates = stores
+    scraped_rates.update(MISSING)
+    hsn_core.fetch_rates("73182100")
+    assert tariff_index.lookup("73182100") is None
+    hsn_core.fetch_rates("73182100")
+    assert fetched == ["73182100", "73182100"]
+
+
+def test_invalid_code_is_rejected_before_any_lookup(stores):
+    _, _, fetched, _ = stores
+    with pytest.raises(ValueError):
+        hsn_core.fetch_rates('7318"] div')
+    assert fetched == []
+    assert hsn_core.fetch_rates(" 73182100 ")[1] == "live"
+    assert fetched == ["73182100"]
@@ -0,0 +1,41 @@
+from types import SimpleNamespace
+import pytest
+from hsn_core import find_hsn_row
+
+
+class FakeDriver:
+    """Driver whose result list never holds the code and whose scroll script answers from results"""
+
+    def __init__(self, results):
+        self.results = list(results)
+        self.timeouts = SimpleNamespace(script=30)
+
+    def find_elements(self, by, selector):
+        return []
+
+    def find_element(self, by, selector):
+        return object()
+
+    def set_script_timeout(self, seconds):
+        self.timeouts.script = seconds
+
+    def execute_async_script(self, script, *args):
+        result = self.results.pop(0)
+        if isinstance(result, Exception):
+            raise result
+        return result
+
+
+@pytest.mark.parametrize("results", [[True, False], [True, "row"], [TimeoutError("script timeout")]])
+def test_script_timeout_is_restored(results):
+    driver = FakeDriver(results)
+    try:
+        find_hsn_row(driver, "73182100", scroll_timeout=2)
+    except TimeoutError:
+        pass
+    assert driver.timeouts.script == 30
+
+
+def test_code_that_would_break_the_selector_is_rejected():
+    with pytest.raises(ValueError):
+        find_hsn_row(FakeDriver([]), '7318"], div')
@@ -0,0 +1,81 @@
+import pytest
+import fx_rates
+from fx_rates import FxRateService
+
+
+class FakeProvider:
+    """FX provider answering a fixed rate, or raising while failing is set"""
+
+    def __init__(self, name, rate, failing=False):
+        self.name = name
+        self.rate = rate
+        self.failing = failing
+        self.calls = 0
+
+    def get_rate(self, base, quote):
+        self.calls += 1
+        if self.failing:
+            raise Exception(f"{self.name} unavailable")
+        return self.rate
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1_000_000.0]
+    monkeypatch.setattr(fx_rates.time, "time", lambda: now[0])
+    return now
+
+
+def make_service(tmp_path, providers, ttl_seconds=3600):
+    return FxRateService(providers, cache_path=str(tmp_path / "fx.sqlite3"), ttl_seconds=ttl_seconds)
+
+
+def test_falls_back_to_next_provider(tmp_path, clock):
+    primary = FakeProvider("primary", 83.0, failing=True)
+    secondary = FakeProvider("secondary", 83.25)
+    quote = make_service(tmp_path, [primary, secondary]).get_rate("USD", "INR")
+    assert (quote.rate, quote.provider, quote.stale) == (83.25, "secondary", False)
+    assert primary.calls == 1
+
+
+def test_cached_until_ttl_expires(tmp_path, clock):
+    provider = FakeProvider("primary", 83.0)
+    service = make_service(tmp_path, [provider], ttl_seconds=60)
+    service.get_rate("USD", "INR")
+    clock[0] += 59
+    service.get_rate("USD", "INR")
+    assert provider.calls == 1
+
+    provider.rate = 84.0
+    clock[0] += 2
+    assert service.get_rate("USD", "INR").rate == 84.0
+    assert provider.calls == 2
+
+
+def test_cache_is_shared_through_the_file(tmp_path, clock):
+    provider = FakeProvider("primary", 83.0)
+    make_service(tmp_path, [provider]).get_rate("USD", "INR")
+    quote = make_service(tmp_path, [provider]).get_rate("USD", "INR")
+    assert quote.rate == 83.0
+    assert provider.calls == 1
+
+
+def test_serves_last_known_good_marked_stale(tmp_path, clock):
+    provider = FakeProvider("primary", 83.0)
+    service = make_service(tmp_path, [provider], ttl_seconds=60)
+    fetched_at = service.get_rate("USD", "INR").fetched_at
+
+    provider.failing = True
+    clock[0] += 120
+    quote = service.get_rate("USD", "INR")
+    assert (quote.rate, quote.provider, quote.fetched_at, quote.stale) == (83.0, "primary", fetched_at, True)
+    # The stale flag is not persisted, so a later recovery is served as fresh
+    provider.failing = False
+    provider.rate = 84.0
+    assert service.get_rate("USD", "INR").stale is False
+
+
+def test_raises_without_any_rate(tmp_path, clock):
+    service = make_service(tmp_path, [FakeProvider("primary", 0, failing=True), FakeProvider("secondary", 0, failing=True)])
+    with pytest.raises(Exception, match="primary unavailable; secondary: secondary unavailable"):
+        service.get_rate("USD", "INR")
@@ -0,0 +1,119 @@
+import threading
+import pytest
+from icegate_fixture_server import IcegateFixtureHandler, start_fixture_server, fixture_codes, fixture_rates
+from icegate_http import IcegateHttpClient
+from hsn_core import fetch_hsn_rates_http
+from perf_metrics import trace
+
+
+class EmptyRatesHandler(IcegateFixtureHandler):
+    """Fixture whose detail fragment has the rate spans but no values, as for a code without rates"""
+
+    def do_GET(self):
+        if self.path.startswith("/Webappl/Trade-Guide-on-Imports-Details"):
+            self._send('<span id="t_bcd_rate"></span><span id="t_scd_rate"></span><span id="t_igst_rate"></span>')
+        else:
+            super().do_GET()
+
+
+class FlakyDetailHandler(IcegateFixtureHandler):
+    """Fixture whose first rate detail request answers 503, like a briefly overloaded server"""
+
+    failures = {"left": 1}
+
+    def do_GET(self):
+        if self.path.startswith("/Webappl/Trade-Guide-on-Imports-Details") and self.failures["left"]:
+            self.failures["left"] -= 1
+            self._send("Busy", status=503)
+        else:
+            super().do_GET()
+
+
+@pytest.fixture
+def fixture_server():
+    server, url = start_fixture_server(rows=20, page_size=10)
+    yield server, url
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def client(fixture_server):
+    _, url = fixture_server
+    http_client = IcegateHttpClient(url, timeout=(2, 5), retries=0)
+    yield http_client
+    http_client.close()
+
+
+def fail_fallback(hsn_code):
+    raise AssertionError(f"unexpected browser fallback for {hsn_code}")
+
+
+def test_reads_rates_from_fixture(client):
+    hsn_code = fixture_codes("7318")[3]
+    rates = fetch_hsn_rates_http(hsn_code, client, fail_fallback)
+    expected = fixture_rates(hsn_code)
+    assert rates["Basic Customs Duty (BCD)"] == expected["bcd"]
+    assert rates["Social Welfare Surcharge (SWC)"] == expected["swc"]
+    assert rates["IGST Levy"] == expected["igst"]
+
+
+def test_missing_rate_values_do_not_fall_back(fixture_server, client):
+    server, _ = fixture_server
+    server.RequestHandlerClass = type("EmptyRates", (EmptyRatesHandler,), {"rows": 20, "page_size": 10})
+    with pytest.raises(LookupError):
+        fetch_hsn_rates_http(fixture_codes("7318")[3], client, fail_fallback)
+
+
+def test_row_beyond_first_page_falls_back(client):
+    fallbacks = []
+    hsn_code = fixture_codes("7318", rows=20)[15]
+    assert fetch_hsn_rates_http(hsn_code, client, lambda code: fallbacks.append(code) or {}) == {}
+    assert fallbacks == [hsn_code]
+
+
+def test_unknown_detail_endpoint_falls_back(fixture_server, monkeypatch):
+    _, url = fixture_server
+    monkeypatch.setattr("icegate_http.RATE_DETAIL_PATH", "no-such-endpoint")
+    http_client = IcegateHttpClient(url, timeout=(2, 5), retries=0)
+    fallbacks = []
+    hsn_code = fixture_codes("7318")[0]
+    fetch_hsn_rates_http(hsn_code, http_client, lambda code: fallbacks.append(code) or {})
+    http_client.close()
+    assert fallbacks == [hsn_code]
+
+
+def test_unreachable_server_falls_back():
+    http_client = IcegateHttpClient("http://127.0.0.1:9/Webappl/Trade-Guide-on-Imports", timeout=(1, 1), retries=0)
+    fallbacks = []
+    fetch_hsn_rates_http("73180000", http_client, lambda code: fallbacks.append(code) or {})
+    assert fallbacks == ["73180000"]
+
+
+def test_sessions_are_per_thread(client):
+    sessions = []
+    threads = [threading.Thread(target=lambda: sessions.append(client.session)) for _ in range(3)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len({id(session) for session in sessions}) == 3
+    assert client.session is client.session
+
+
+def test_search_post_is_not_retried():
+    http_client = IcegateHttpClient(retries=3)
+    retry = http_client.session.get_adapter("https://").max_retries
+    assert retry.total == 3
+    assert "GET" in retry.allowed_methods
+    assert "POST" not in retry.allowed_methods
+
+
+def test_retries_are_counted_on_the_trace(fixture_server):
+    server, url = fixture_server
+    server.RequestHandlerClass = type("Flaky", (FlakyDetailHandler,), {"rows": 20, "page_size": 10, "failures": {"left": 1}})
+    http_client = IcegateHttpClient(url, timeout=(2, 5), retries=2)
+    with trace("duty_rate_lookup") as current:
+        fetch_hsn_rates_http(fixture_codes("7318")[3], http_client, fail_fallback)
+    http_client.close()
+    assert current.counters["http_retries"] == 1
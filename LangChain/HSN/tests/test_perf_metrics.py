@@ -0,0 +1,22 @@
+import os
+import perf_metrics
+from perf_metrics import load_records, tail_lines, write_record
+
+
+def test_tail_lines_reads_only_the_end(tmp_path, monkeypatch):
+    monkeypatch.setattr(perf_metrics, "TAIL_BLOCK_SIZE", 16)
+    path = tmp_path / "lines.txt"
+    path.write_text("".join(f"line {index}\n" for index in range(100)))
+    assert tail_lines(str(path), 3) == ["line 97", "line 98", "line 99"]
+    assert len(tail_lines(str(path), 500)) == 100
+
+
+def test_sink_rotates_and_load_spans_both_files(metrics_path, monkeypatch):
+    monkeypatch.setattr(perf_metrics, "METRICS_MAX_BYTES", 200)
+    for index in range(20):
+        write_record({"index": index})
+    assert os.path.getsize(metrics_path) < 200 + len('{"index": 19}\n')
+    assert os.path.exists(metrics_path + ".1")
+
+    records = load_records(limit=12)
+    assert [record["index"] for record in records] == list(range(8, 20))
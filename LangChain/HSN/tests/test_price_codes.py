@@ -0,0 +1,45 @@
+import pytest
+import hsn_core
+
+RATES = {"Basic Customs Duty (BCD)": "10", "Social Welfare Surcharge (SWC)": "10", "IGST Levy": "18"}
+
+
+@pytest.fixture
+def fetched(monkeypatch):
+    calls = []
+
+    def fake_fetch_rates(hsn_code, force_refresh=False, backend=None):
+        calls.append(hsn_code)
+        return dict(RATES), "index"
+
+    monkeypatch.setattr(hsn_core, "fetch_rates", fake_fetch_rates)
+    return calls
+
+
+def test_price_codes_leaves_line_items_unchanged(fetched):
+    line_items = [{"hsn_code": "73182100", "fob_price": 350.0}, {"hsn_code": "73182100"}]
+    rows = list(hsn_core.price_codes(line_items, usd_inr_rate=85.0))
+    assert line_items == [{"hsn_code": "73182100", "fob_price": 350.0}, {"hsn_code": "73182100"}]
+    assert [row["status"] for row in rows] == ["OK", "OK"]
+    assert rows[0]["freight_percentage"] == hsn_core.DEFAULT_FREIGHT_INSURANCE_PERCENTAGE
+    assert fetched == ["73182100"]
+
+
+def test_fob_price_without_usd_inr_rate_fails_its_row(fetched):
+    line_items = [{"hsn_code": "73182100", "fob_price": 350.0}, {"hsn_code": "73182100"}, {"hsn_code": "84713010", "error": "bad row"}]
+    # Codes resolve in completion order; rows of one code keep their input order
+    rows = sorted(hsn_core.price_codes(line_items), key=lambda row: row["hsn_code"])
+    assert rows[0]["status"].startswith("Failed: a USD/INR rate is needed")
+    assert rows[1]["status"] == "OK"
+    assert rows[1]["source"] == "index"
+    assert rows[2]["status"] == "Failed: bad row"
+    assert sorted(fetched) == ["73182100", "84713010"]
+
+
+@pytest.mark.parametrize("fmt", ["xlsx", "parquet"])
+def test_binary_format_without_output_fails_before_lookups(fetched, monkeypatch, fmt):
+    monkeypatch.setattr("sys.argv", ["hsn_core.py", "73182100", "--format", fmt])
+    with pytest.raises(SystemExit) as exit_info:
+        hsn_core.main()
+    assert exit_info.value.code == 2
+    assert fetched == []
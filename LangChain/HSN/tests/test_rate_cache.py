@@ -0,0 +1,136 @@
+import json
+import threading
+import time
+from contextlib import contextmanager
+import pytest
+from rate_cache import RateCache
+
+RATES = {"Basic Customs Duty (BCD)": "10", "Social Welfare Surcharge (SWC)": "10", "IGST Levy": "18"}
+NEW_RATES = {"Basic Customs Duty (BCD)": "15", "Social Welfare Surcharge (SWC)": "10", "IGST Levy": "18"}
+
+
+class CountingFetch:
+    """fetch_fn returning fixed rates, optionally blocking until released"""
+
+    def __init__(self, rates, block=False):
+        self.rates = rates
+        self.calls = 0
+        self.release = threading.Event()
+        if not block:
+            self.release.set()
+
+    def __call__(self, hsn_code):
+        self.calls += 1
+        self.release.wait(5)
+        return dict(self.rates)
+
+
+def make_cache(tmp_path, **kwargs):
+    return RateCache(str(tmp_path / "cache.sqlite3"), ttl_seconds=60, **kwargs)
+
+
+def expire(cache, hsn_code):
+    with cache._connect() as conn:
+        conn.execute("UPDATE duty_rates SET fetched_at = ? WHERE hsn_code = ?", (time.time() - 120, hsn_code))
+
+
+def wait_for(condition):
+    deadline = time.time() + 5
+    while not condition() and time.time() < deadline:
+        time.sleep(0.01)
+    return condition()
+
+
+def test_miss_then_hit(tmp_path):
+    cache = make_cache(tmp_path)
+    fetch = CountingFetch(RATES)
+    assert cache.get_or_fetch("73182100", fetch) == (RATES, "live")
+    assert cache.get_or_fetch("73182100", fetch) == (RATES, "cache")
+    assert fetch.calls == 1
+
+
+def test_expired_entry_is_refetched_without_stale_while_revalidate(tmp_path):
+    cache = make_cache(tmp_path, stale_while_revalidate=False)
+    cache.put("73182100", RATES)
+    expire(cache, "73182100")
+    assert cache.get("73182100")[2] is True
+    assert cache.get_or_fetch("73182100", CountingFetch(NEW_RATES)) == (NEW_RATES, "live")
+
+
+def test_stale_entry_is_served_while_one_background_refresh_runs(tmp_path):
+    cache = make_cache(tmp_path)
+    cache.put("73182100", RATES)
+    expire(cache, "73182100")
+    fetch = CountingFetch(NEW_RATES, block=True)
+
+    assert cache.get_or_fetch("73182100", fetch) == (RATES, "stale")
+    assert cache.get_or_fetch("73182100", fetch) == (RATES, "stale")
+    assert wait_for(lambda: fetch.calls == 1)
+    fetch.release.set()
+
+    assert wait_for(lambda: cache.get("73182100")[0] == NEW_RATES)
+    assert wait_for(lambda: not cache._refreshing)
+    assert cache.get_or_fetch("73182100", fetch) == (NEW_RATES, "cache")
+    assert fetch.calls == 1
+
+
+def test_force_refresh_skips_a_fresh_entry(tmp_path):
+    cache = make_cache(tmp_path)
+    cache.put("73182100", RATES)
+    fetch = CountingFetch(NEW_RATES)
+    assert cache.get_or_fetch("73182100", fetch, force_refresh=True) == (NEW_RATES, "live")
+    assert cache.get("73182100")[0] == NEW_RATES
+
+
+def test_rates_fetched_by_another_worker_while_waiting_are_shared(tmp_path):
+    cache = make_cache(tmp_path)
+
+    @contextmanager
+    def key_lock(name, wait_timeout=None, lease_seconds=None):
+        # Another worker held the lock and stored the code before this one got it
+        cache.put("73182100", RATES)
+        yield
+
+    cache.key_lock = key_lock
+    fetch = CountingFetch(NEW_RATES)
+    assert cache.get_or_fetch("73182100", fetch) == (RATES, "shared")
+    assert fetch.calls == 0
+
+
+def test_scrape_without_rates_is_not_cached(tmp_path):
+    cache = make_cache(tmp_path)
+    cache.put("73182100", {"Basic Customs Duty (BCD)": "0", "Social Welfare Surcharge (SWC)": "0", "IGST Levy": "0"})
+    assert cache.get("73182100") is None
+
+
+def failing_fetch(hsn_code):
+    raise Exception("ICEGATE unavailable")
+
+
+def test_failed_live_fetch_raises(tmp_path):
+    with pytest.raises(Exception, match="ICEGATE unavailable"):
+        make_cache(tmp_path).get_or_fetch("73182100", failing_fetch)
+
+
+def test_failed_background_refresh_keeps_serving_stale(tmp_path):
+    cache = make_cache(tmp_path)
+    cache.put("73182100", RATES)
+    expire(cache, "73182100")
+    assert cache.get_or_fetch("73182100", failing_fetch) == (RATES, "stale")
+    assert wait_for(lambda: not cache._refreshing)
+    assert cache.get_or_fetch("73182100", failing_fetch) == (RATES, "stale")
+    # Finish the second refresh too, so its trace is not written during a later test
+    assert wait_for(lambda: not cache._refreshing)
+
+
+def test_background_refresh_is_traced(tmp_path, metrics_path):
+    cache = make_cache(tmp_path)
+    cache.put("73182100", RATES)
+    expire(cache, "73182100")
+    cache.get_or_fetch("73182100", CountingFetch(NEW_RATES))
+    assert wait_for(lambda: not cache._refreshing)
+    with open(metrics_path) as handle:
+        records = [json.loads(line) for line in handle]
+    assert [(record["name"], record["attributes"]) for record in records] == [
+        ("duty_rate_lookup", {"hsn_code": "73182100", "background": True, "source": "revalidate"})
+    ]
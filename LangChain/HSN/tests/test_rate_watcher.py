@@ -0,0 +1,41 @@
+from rate_watcher import RateWatcher, LOOKUP_TRACE_NAME
+from tariff_index import TariffIndex
+
+RATES = {"Basic Customs Duty (BCD)": "10", "Social Welfare Surcharge (SWC)": "10", "IGST Levy": "18"}
+MISSING = {"Basic Customs Duty (BCD)": "0", "Social Welfare Surcharge (SWC)": "0", "IGST Levy": "0"}
+
+
+def make_watcher(tmp_path):
+    return RateWatcher(str(tmp_path / "watch.sqlite3"), tariff_index=TariffIndex(str(tmp_path / "index.sqlite3")))
+
+
+def lookup_record(code, started_at, **attributes):
+    return {"name": LOOKUP_TRACE_NAME, "started_at": started_at, "attributes": {"hsn_code": code, **attributes}}
+
+
+def test_usage_import_skips_forced_refreshes(tmp_path):
+    watcher = make_watcher(tmp_path)
+    records = [
+        lookup_record("73182100", 1.0, force_refresh=False),
+        lookup_record("73182100", 2.0),
+        lookup_record("73182100", 3.0, force_refresh=True),
+        lookup_record("84713010", 4.0, force_refresh=True),
+        lookup_record("94032090", 5.0, background=True),
+    ]
+    assert watcher.import_usage_from_metrics(records) == 1
+    with watcher._connect() as conn:
+        rows = conn.execute("SELECT hsn_code, lookups, last_used FROM watchlist").fetchall()
+    assert rows == [("73182100", 2, 2.0)]
+
+
+def test_refresh_without_rates_fails_instead_of_recording_a_version(tmp_path):
+    watcher = make_watcher(tmp_path)
+    watcher.record_rates("73182100", ("10", "10", "18"), source="refresh")
+    summary = watcher.refresh(watcher.start_run(["73182100"]), fetch_fn=lambda code: dict(MISSING), requests_per_minute=0)
+    assert summary["changed"] == []
+    assert [code for code, _ in summary["failed"]] == ["73182100"]
+    assert len(watcher.history("73182100")) == 1
+
+    summary = watcher.refresh(watcher.start_run(["73182100"]), fetch_fn=lambda code: dict(RATES), requests_per_minute=0)
+    assert summary["failed"] == []
+    assert len(watcher.history("73182100")) == 1
@@ -0,0 +1,43 @@
+import io
+import pyarrow.parquet as pq
+import pytest
+from report_export import ReportSheet, column_types, export_report, records_to_rows, write_parquet
+
+
+def read_parquet(data):
+    return pq.read_table(io.BytesIO(data))
+
+
+def export_report_chunked(sheet, chunk_rows):
+    output = io.BytesIO()
+    write_parquet(sheet, output, chunk_rows=chunk_rows)
+    return output.getvalue()
+
+
+def test_column_types_widen_and_skip_missing():
+    columns = ["code", "price", "ok", "note", "empty"]
+    rows = [("7318", 1, True, None, None), ("7319", 2.5, False, "x", None), ("7320", float("nan"), True, 3, None)]
+    assert column_types(columns, rows) == {"code": str, "price": float, "ok": bool, "note": str, "empty": None}
+
+
+def test_parquet_column_empty_in_first_chunk_uses_declared_type():
+    records = [{"hsn_code": "7318", "landed_price": None}] * 3 + [{"hsn_code": "7319", "landed_price": 1250.5}]
+    columns = ["hsn_code", "landed_price"]
+    sheet = ReportSheet("Results", columns, records_to_rows(records, columns), column_types(columns, records_to_rows(records, columns)))
+    table = read_parquet(export_report_chunked(sheet, chunk_rows=2))
+    assert str(table.schema.field("landed_price").type) == "double"
+    assert table.column("landed_price").to_pylist() == [None, None, None, 1250.5]
+
+
+def test_parquet_later_chunk_is_coerced_to_inferred_schema():
+    rows = [("7318", None, 1), ("7319", None, 2), ("7320", 5.5, 2.5), ("7321", "n/a", 3)]
+    sheet = ReportSheet("Results", ["hsn_code", "note", "price"], rows)
+    table = read_parquet(export_report_chunked(sheet, chunk_rows=2))
+    assert table.column("note").to_pylist() == [None, None, "5.5", "n/a"]
+    assert table.column("price").to_pylist() == [1.0, 2.0, 2.5, 3.0]
+
+
+@pytest.mark.parametrize("fmt", ["CSV", "XLSX", "Parquet"])
+def test_export_formats_render(fmt):
+    sheet = ReportSheet("Results", ["hsn_code", "fob_price"], [("7318", 350.0), ("7319", None)])
+    assert export_report([sheet], fmt)
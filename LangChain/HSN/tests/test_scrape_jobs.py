@@ -0,0 +1,42 @@
+import threading
+import time
+from scrape_jobs import ScrapeJobQueue
+
+
+def blocking_queue():
+    release = threading.Event()
+    calls = []
+
+    def run_fn(hsn_code, backend, force_refresh):
+        calls.append(force_refresh)
+        release.wait(5)
+        return {"HSN Code": hsn_code}, "live" if force_refresh else "cache"
+
+    return ScrapeJobQueue(run_fn, max_workers=4), release, calls
+
+
+def wait_finished(queue, *job_ids):
+    deadline = time.time() + 5
+    while not all(queue.get(job_id).finished for job_id in job_ids) and time.time() < deadline:
+        time.sleep(0.01)
+
+
+def test_forced_refresh_does_not_join_plain_lookup():
+    queue, release, calls = blocking_queue()
+    plain = queue.submit("73182100", "Selenium")
+    forced = queue.submit("73182100", "Selenium", force_refresh=True)
+    release.set()
+    wait_finished(queue, plain, forced)
+    assert plain != forced
+    assert queue.get(forced).source == "live"
+    assert sorted(calls) == [False, True]
+
+
+def test_plain_lookup_joins_forced_refresh():
+    queue, release, calls = blocking_queue()
+    forced = queue.submit("73182100", "Selenium", force_refresh=True)
+    assert queue.submit("73182100", "Selenium") == forced
+    assert queue.submit("73182100", "Selenium", force_refresh=True) == forced
+    release.set()
+    wait_finished(queue, forced)
+    assert calls == [True]
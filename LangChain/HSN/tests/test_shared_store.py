@@ -0,0 +1,34 @@
+import multiprocessing
+import queue
+from collections import Counter
+from shared_store import SharedStore, _simulate_worker
+
+WORKERS = 4
+CODES = ["73180000", "73180001", "73180002"]
+
+
+def test_worker_processes_fetch_each_code_once(tmp_path):
+    store_path = str(tmp_path / "shared.sqlite3")
+    SharedStore(store_path)
+    results = multiprocessing.Queue()
+    workers = [
+        multiprocessing.Process(target=_simulate_worker, args=(store_path, CODES, 0.3, results))
+        for _ in range(WORKERS)
+    ]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join(30)
+    assert [worker.exitcode for worker in workers] == [0] * WORKERS
+
+    events = []
+    while True:
+        try:
+            events.append(results.get(timeout=1))
+        except queue.Empty:
+            break
+    fetches = Counter(code for kind, _, code in events if kind == "fetch")
+    sources = Counter(source for kind, _, source in events if kind == "lookup")
+    assert fetches == Counter(CODES)
+    assert sum(sources.values()) == WORKERS * len(CODES)
+    assert sources["live"] == len(CODES)
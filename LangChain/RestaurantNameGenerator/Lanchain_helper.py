@@ -1,44 +1,79 @@
 from LangChain.RestaurantNameGenerator.secret_key import openai_key
 from langchain.llms import OpenAI
-from langchain.prompts import PromptTemplate
-from langchain.chains import LLMChain
-from langchain.chains import SequentialChain
+from LangChain.RestaurantNameGenerator.llm_cache import LLMResponseCache, install_llm_cache, DEFAULT_CACHE_PATH
+from LangChain.RestaurantNameGenerator.menu_parser import MenuParseError, partial_menu_items, is_valid_menu_completion
+from LangChain.RestaurantNameGenerator import restaurant_chains
+from LangChain.RestaurantNameGenerator.restaurant_chains import build_chain, build_candidates_chain
 import os
 
-os.environ['OPENAI_API_KEY'] = openai_key
+# MenuParseError and partial_menu_items are re-exported for main.py
+__all__ = [
+    "llm_cache", "llms", "restaurant_chain", "name_candidates_chain", "MenuParseError", "partial_menu_items",
+    "structured_menu", "structure_response", "generate_restaurant_name_and_items", "generate_many",
+    "generate_concepts", "stream_restaurant_name_and_items", "agenerate_many",
+]
 
+os.environ['OPENAI_API_KEY'] = openai_key
 
+# Cached completions: revisiting a cuisine costs no API calls. With a pool size > 1
+# each prompt is sampled that many times, then served from the pool at random.
+llm_cache = install_llm_cache(LLMResponseCache(
+    path=os.environ.get("LLM_CACHE_PATH", DEFAULT_CACHE_PATH),
+    ttl_seconds=float(os.environ.get("LLM_CACHE_TTL_HOURS", 24 * 7)) * 3600,
+    pool_size=int(os.environ.get("LLM_CACHE_POOL_SIZE", 1)),
+    validators=[is_valid_menu_completion],
+))
 
-llms = OpenAI(temperature=0.7)
+# streaming=True makes the model report tokens as they arrive; callers that do
+# not listen for them still get the complete text back
+llms = OpenAI(temperature=0.7, streaming=True)
 # temperature param:- ratio of creative model
 # 1 is risky model but creative. Mostly used 0.6 or 0.9
 # 0 no risk
 
-def generate_restaurant_name_and_items(cuisine):
-    
-    # Chain 1 Resto Name
-    prompt_template_name = PromptTemplate(
-        input_variables= ['cuisine'],
-        template= "I want to open restaturant for {cuisine} food. Suggest a fancy name for this."
-        )
-    name_chain = LLMChain(llm=llms, prompt=prompt_template_name, output_key="restaurant_name")
-
-    # Chain 2
-    prompt_template_name = PromptTemplate(
-        input_variables= ['restaurant_name'],
-        template= """Suggest some menu items for {restaurant_name}. """
-        )
-    food_items_chain = LLMChain(llm=llms, prompt=prompt_template_name, output_key="menu_items")
-
-    chain = SequentialChain(
-        chains = [name_chain, food_items_chain],
-        input_variables = ['cuisine'],
-        output_variables = ['restaurant_name', 'menu_items']
+# Built once at import. The chain has no memory, so one instance is safe to share
+# across Streamlit sessions and threads; every call gets its own inputs dict.
+restaurant_chain = build_chain(llms)
+name_candidates_chain = build_candidates_chain(llms)
+
+
+def structured_menu(restaurant_name, menu_text, llm=None, max_retries=None):
+    """Validated MenuItems for a menu answer, as (items, attempts); see restaurant_chains.structured_menu"""
+    return restaurant_chains.structured_menu(restaurant_name, menu_text, llm or llms, max_retries)
+
+
+def structure_response(response, chain=None):
+    """Replace the menu text of a chain response with validated MenuItems"""
+    return restaurant_chains.structure_response(response, chain or restaurant_chain)
+
+
+def generate_restaurant_name_and_items(cuisine, chain=None):
+    response = (chain or restaurant_chain)({'cuisine': cuisine})
+
+    return structure_response(response, chain)
+
+
+def generate_many(cuisines, max_concurrency=4, chain=None):
+    """Run many cuisines through the chain concurrently; results keep the input order, failures carry an error"""
+    return restaurant_chains.generate_many(chain or restaurant_chain, cuisines, max_concurrency)
+
+
+def generate_concepts(cuisine, count=3, max_concurrency=4, chain=None, candidates_chain=None):
+    """count restaurant names from one LLM request, then a menu for each; see restaurant_chains.generate_concepts"""
+    return restaurant_chains.generate_concepts(
+        chain or restaurant_chain, candidates_chain or name_candidates_chain, cuisine, count, max_concurrency
     )
 
-    response = chain({'cuisine': cuisine})
 
-    return response
+def stream_restaurant_name_and_items(cuisine, chain=None):
+    """(kind, value) events as the name and menu arrive; see restaurant_chains.stream_restaurant_name_and_items"""
+    return restaurant_chains.stream_restaurant_name_and_items(chain or restaurant_chain, cuisine)
+
+
+async def agenerate_many(cuisines, max_concurrency=4, chain=None):
+    """Async variant of generate_many over the chain's acall, for use inside an event loop"""
+    return await restaurant_chains.agenerate_many(chain or restaurant_chain, cuisines, max_concurrency)
+
 
 if __name__ == "__main__":
-    print(generate_restaurant_name_and_items("Indian"))
\ No newline at end of file
+    print(generate_restaurant_name_and_items("Indian"))
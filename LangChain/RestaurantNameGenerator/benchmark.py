@@ -0,0 +1,152 @@
+import argparse
+import asyncio
+import json
+import time
+from langchain.llms.base import LLM
+from LangChain.RestaurantNameGenerator.llm_cache import install_llm_cache
+# restaurant_chains, not Lanchain_helper: importing it builds no OpenAI client and installs no cache
+from LangChain.RestaurantNameGenerator.restaurant_chains import (
+    build_chain, build_candidates_chain, generate_many, agenerate_many, stream_restaurant_name_and_items, generate_concepts,
+)
+
+# Constants
+CUISINES = ["Italian", "Indian", "Chinese", "Japanese", "French", "Mexican", "Thai", "Greek", "Korean", "Spanish",
+            "American", "Vietnamese", "Turkish", "Lebanese", "Brazilian", "Moroccan", "Ethiopian", "German", "Indonesian", "Caribbean"]
+
+
+class FakeRestaurantLLM(LLM):
+    """
+    Local stand-in for OpenAI that answers after a fixed delay, like a network round trip
+
+    With token_latency set, the answer is emitted word by word through the
+    callbacks, the way a streaming OpenAI model reports tokens.
+    """
+    latency: float = 0.0
+    token_latency: float = 0.0
+
+    @property
+    def _llm_type(self):
+        return "fake-restaurant"
+
+    def _call(self, prompt, stop=None, run_manager=None, **kwargs):
+        time.sleep(self.latency)
+        answer = self._answer(prompt)
+        if self.token_latency:
+            for token in self._tokens(answer):
+                time.sleep(self.token_latency)
+                if run_manager:
+                    run_manager.on_llm_new_token(token)
+        return answer
+
+    async def _acall(self, prompt, stop=None, run_manager=None, **kwargs):
+        await asyncio.sleep(self.latency)
+        answer = self._answer(prompt)
+        if self.token_latency:
+            for token in self._tokens(answer):
+                await asyncio.sleep(self.token_latency)
+                if run_manager:
+                    await run_manager.on_llm_new_token(token)
+        return answer
+
+    def _answer(self, prompt):
+        if "one per line" in prompt:
+            return "\n".join(f"{index}. The Golden Spoon {index}" for index in range(1, 11))
+        if "fancy name" in prompt:
+            return "The Golden Spoon"
+        return json.dumps({"menu_items": [
+            {"name": "Chef's Tasting Plate", "description": "Five small courses from the kitchen."},
+            {"name": "Seasonal Soup", "description": "Made with what the market brings."},
+            {"name": "Dessert of the Day", "description": "Ask your server."},
+        ]})
+
+    def _tokens(self, answer):
+        words = answer.split(" ")
+        return [word + " " for word in words[:-1]] + words[-1:]
+
+
+def timed(fn):
+    start = time.perf_counter()
+    fn()
+    return time.perf_counter() - start
+
+
+def benchmark_overhead(calls):
+    """Seconds per call with a zero-latency LLM: chain built per call vs built once"""
+    llm = FakeRestaurantLLM()
+    chain = build_chain(llm)
+    per_call = timed(lambda: [build_chain(llm)({'cuisine': CUISINES[i % len(CUISINES)]}) for i in range(calls)])
+    prebuilt = timed(lambda: [chain({'cuisine': CUISINES[i % len(CUISINES)]}) for i in range(calls)])
+    return per_call / calls, prebuilt / calls
+
+
+def benchmark_throughput(cuisines, latency, max_concurrency):
+    """Seconds to run every cuisine sequentially, through generate_many and through agenerate_many"""
+    chain = build_chain(FakeRestaurantLLM(latency=latency))
+    return {
+        "sequential": timed(lambda: [chain({'cuisine': cuisine}) for cuisine in cuisines]),
+        "batch": timed(lambda: generate_many(chain, cuisines, max_concurrency)),
+        "async": timed(lambda: asyncio.run(agenerate_many(chain, cuisines, max_concurrency))),
+    }
+
+
+def benchmark_time_to_first_content(latency, token_latency):
+    """Seconds until something can be shown: the full chain when blocking, the name and first menu token when streaming"""
+    chain = build_chain(FakeRestaurantLLM(latency=latency, token_latency=token_latency))
+    blocking = timed(lambda: chain({'cuisine': "Indian"}))
+
+    start = time.perf_counter()
+    marks = {}
+    for kind, _ in stream_restaurant_name_and_items(chain, "Indian"):
+        marks.setdefault(kind, time.perf_counter() - start)
+    return {
+        "blocking": blocking,
+        "stream_name": marks["restaurant_name"],
+        "stream_first_token": marks["menu_token"],
+        "stream_complete": marks["response"],
+    }
+
+
+def benchmark_fanout(count, latency, max_concurrency):
+    """Seconds for count concepts through count serial chain calls vs one generate_concepts fan-out"""
+    llm = FakeRestaurantLLM(latency=latency)
+    chain = build_chain(llm)
+    serial = timed(lambda: [chain({'cuisine': "Indian"}) for _ in range(count)])
+    result = generate_concepts(chain, build_candidates_chain(llm), "Indian", count, max_concurrency)
+    return serial, result
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Chain overhead and batch throughput against a local fake LLM")
+    parser.add_argument("--calls", type=int, default=200, help="Calls for the per-call overhead run")
+    parser.add_argument("--latency", type=float, default=0.2, help="Simulated seconds per LLM call")
+    parser.add_argument("--token-latency", type=float, default=0.03, help="Simulated seconds per streamed token")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--concepts", type=int, default=5, help="Name candidates for the fan-out run")
+    args = parser.parse_args()
+
+    # Cached responses would hide the chain cost being measured
+    install_llm_cache(None)
+
+    per_call, prebuilt = benchmark_overhead(args.calls)
+    print(f"Per-call overhead ({args.calls} calls, zero-latency LLM)")
+    print(f"  chain built per call: {per_call * 1000:.3f} ms")
+    print(f"  chain built once    : {prebuilt * 1000:.3f} ms ({per_call / prebuilt:.1f}x less)")
+
+    timings = benchmark_throughput(CUISINES, args.latency, args.concurrency)
+    print(f"Throughput ({len(CUISINES)} cuisines, {args.latency}s per LLM call, concurrency {args.concurrency})")
+    for mode, seconds in timings.items():
+        print(f"  {mode:10}: {seconds:.2f}s ({len(CUISINES) / seconds:.1f} cuisines/s, {timings['sequential'] / seconds:.1f}x)")
+
+    first_content = benchmark_time_to_first_content(args.latency, args.token_latency)
+    print(f"Time to first content ({args.latency}s per LLM call, {args.token_latency}s per token)")
+    print(f"  blocking call      : {first_content['blocking']:.2f}s")
+    print(f"  streamed name      : {first_content['stream_name']:.2f}s")
+    print(f"  first menu token   : {first_content['stream_first_token']:.2f}s")
+    print(f"  streamed menu done : {first_content['stream_complete']:.2f}s")
+
+    serial, fanout = benchmark_fanout(args.concepts, args.latency, args.concurrency)
+    timings = fanout["timings"]
+    print(f"Fan-out ({args.concepts} concepts, {args.latency}s per LLM call, concurrency {args.concurrency})")
+    print(f"  serial helper calls: {serial:.2f}s")
+    print(f"  generate_concepts  : {timings['total']:.2f}s ({serial / timings['total']:.1f}x measured, "
+          f"{timings['speedup']:.1f}x self-reported lower bound, menus {timings['menu_speedup']:.1f}x)")
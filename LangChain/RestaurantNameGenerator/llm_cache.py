@@ -0,0 +1,246 @@
+import hashlib
+import json
+import os
+import random
+import re
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from langchain.schema import BaseCache, Generation
+
+# Constants
+DEFAULT_CACHE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "llm_cache.sqlite3")
+DEFAULT_MEMORY_ENTRIES = 256
+DEFAULT_TTL_SECONDS = 7 * 24 * 60 * 60
+DEFAULT_MAX_DISK_ENTRIES = 10_000
+TEMPERATURE_PATTERN = re.compile(r"'temperature',\s*([0-9.]+)")
+
+
+def cache_key(prompt, llm_string):
+    """Stable key for a prompt under one LLM configuration (model, temperature and other params)"""
+    return hashlib.sha256(f"{llm_string}\0{prompt}".encode("utf-8")).hexdigest()
+
+
+def llm_temperature(llm_string):
+    """Temperature recorded in LangChain's llm_string, or None if it has none"""
+    match = TEMPERATURE_PATTERN.search(llm_string)
+    return float(match.group(1)) if match else None
+
+
+def dump_generations(generations):
+    return json.dumps([{"text": generation.text, "generation_info": generation.generation_info} for generation in generations])
+
+
+def load_generations(data):
+    return [Generation(text=item["text"], generation_info=item["generation_info"]) for item in json.loads(data)]
+
+
+class CacheStats:
+    """Hit/miss counters of an LLMResponseCache"""
+
+    def __init__(self):
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.updates = 0
+        self.evictions = 0
+        self.rejected = 0
+
+    @property
+    def hits(self):
+        return self.memory_hits + self.disk_hits
+
+    @property
+    def hit_rate(self):
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def to_dict(self):
+        return {
+            "memory_hits": self.memory_hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "updates": self.updates,
+            "evictions": self.evictions,
+            "rejected": self.rejected,
+            "hit_rate": round(self.hit_rate, 3),
+        }
+
+
+class LLMResponseCache(BaseCache):
+    """
+    Two-level LangChain LLM cache: an in-memory LRU in front of a SQLite file
+
+    Entries are keyed by prompt and llm_string, which LangChain builds from the
+    model name, temperature and other parameters, so changing any of them misses.
+    Entries older than ttl_seconds are ignored and pruned, memory holds at most
+    memory_entries keys and the file at most max_disk_entries.
+
+    With pool_size > 1, prompts sent at a non-zero temperature keep missing until
+    pool_size different completions are stored, and after that a random one of
+    them is served, so repeat calls still vary without calling the API again.
+
+    validators are callables (prompt, generations) -> bool; completions any of
+    them rejects are never stored, and cached ones they reject are evicted.
+    """
+
+    def __init__(self, path=DEFAULT_CACHE_PATH, memory_entries=DEFAULT_MEMORY_ENTRIES, ttl_seconds=DEFAULT_TTL_SECONDS,
+                 max_disk_entries=DEFAULT_MAX_DISK_ENTRIES, pool_size=1, validators=()):
+        self.path = path
+        self.memory_entries = memory_entries
+        self.ttl_seconds = ttl_seconds
+        self.max_disk_entries = max_disk_entries
+        self.pool_size = max(1, pool_size)
+        self.validators = list(validators)
+        self.stats = CacheStats()
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+
+        if path:
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+            with self._connect() as conn:
+                conn.execute(
+                    """
+                    CREATE TABLE IF NOT EXISTS llm_responses (
+                        key TEXT NOT NULL,
+                        variant INTEGER NOT NULL,
+                        generations TEXT NOT NULL,
+                        created_at REAL NOT NULL,
+                        PRIMARY KEY (key, variant)
+                    )
+                    """
+                )
+                conn.execute("CREATE INDEX IF NOT EXISTS llm_responses_created ON llm_responses (created_at)")
+
+    def _connect(self):
+        # A fresh connection per call keeps the cache safe to share across Streamlit threads
+        return sqlite3.connect(self.path, timeout=30)
+
+    def add_validator(self, validator):
+        """Only cache completions validator(prompt, generations) accepts"""
+        self.validators.append(validator)
+
+    def _is_valid(self, prompt, generations):
+        return all(validator(prompt, generations) for validator in self.validators)
+
+    def _evict(self, key):
+        with self._lock:
+            self._memory.pop(key, None)
+        if self.path:
+            with self._connect() as conn:
+                conn.execute("DELETE FROM llm_responses WHERE key = ?", (key,))
+        self.stats.evictions += 1
+
+    def _pool_size(self, llm_string):
+        temperature = llm_temperature(llm_string)
+        return self.pool_size if temperature is None or temperature > 0 else 1
+
+    def _remember(self, key, variants):
+        # Caller holds self._lock
+        self._memory[key] = variants
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_entries:
+            self._memory.popitem(last=False)
+            self.stats.evictions += 1
+
+    def _variants(self, key):
+        """(created_at, generations) pairs for a key, memory first, then disk; expired ones dropped"""
+        cutoff = time.time() - self.ttl_seconds if self.ttl_seconds else 0
+        with self._lock:
+            variants = self._memory.get(key)
+            if variants is not None:
+                variants = [variant for variant in variants if variant[0] >= cutoff]
+                if variants:
+                    self._memory.move_to_end(key)
+                    return variants, "memory"
+                del self._memory[key]
+
+        if not self.path:
+            return [], None
+        with self._connect() as conn:
+            rows = conn.execute(
+                "SELECT created_at, generations FROM llm_responses WHERE key = ? AND created_at >= ? ORDER BY variant",
+                (key, cutoff),
+            ).fetchall()
+        variants = [(created_at, load_generations(data)) for created_at, data in rows]
+        if variants:
+            with self._lock:
+                self._remember(key, variants)
+        return variants, "disk" if variants else None
+
+    def lookup(self, prompt, llm_string):
+        """Cached generations for a prompt, or None so LangChain calls the model"""
+        key = cache_key(prompt, llm_string)
+        variants, level = self._variants(key)
+        if variants and not all(self._is_valid(prompt, generations) for _, generations in variants):
+            # Stored before the validator existed or with different rules: drop and refetch
+            self._evict(key)
+            variants = []
+        if len(variants) < self._pool_size(llm_string):
+            self.stats.misses += 1
+            return None
+
+        if level == "memory":
+            self.stats.memory_hits += 1
+        else:
+            self.stats.disk_hits += 1
+        return random.choice(variants)[1]
+
+    def update(self, prompt, llm_string, return_val):
+        """Store a fresh completion, as a new pool variant or in place of the oldest one"""
+        if not self._is_valid(prompt, return_val):
+            self.stats.rejected += 1
+            return
+        key = cache_key(prompt, llm_string)
+        variants, _ = self._variants(key)
+        variants = (variants + [(time.time(), list(return_val))])[-self._pool_size(llm_string):]
+        self.stats.updates += 1
+
+        with self._lock:
+            self._remember(key, variants)
+        if not self.path:
+            return
+        with self._connect() as conn:
+            conn.execute("DELETE FROM llm_responses WHERE key = ?", (key,))
+            conn.executemany(
+                "INSERT INTO llm_responses VALUES (?, ?, ?, ?)",
+                [(key, index, dump_generations(generations), created_at) for index, (created_at, generations) in enumerate(variants)],
+            )
+        self.prune()
+
+    def prune(self):
+        """Delete expired entries and the oldest ones beyond max_disk_entries from the file"""
+        if not self.path:
+            return
+        with self._connect() as conn:
+            if self.ttl_seconds:
+                conn.execute("DELETE FROM llm_responses WHERE created_at < ?", (time.time() - self.ttl_seconds,))
+            if self.max_disk_entries:
+                conn.execute(
+                    """
+                    DELETE FROM llm_responses WHERE rowid IN (
+                        SELECT rowid FROM llm_responses ORDER BY created_at DESC LIMIT -1 OFFSET ?
+                    )
+                    """,
+                    (self.max_disk_entries,),
+                )
+
+    def clear(self, **kwargs):
+        """Drop every cached response from memory and disk"""
+        with self._lock:
+            self._memory.clear()
+        if self.path:
+            with self._connect() as conn:
+                conn.execute("DELETE FROM llm_responses")
+
+
+def install_llm_cache(cache):
+    """Make cache the global LangChain LLM cache, on both old and new LangChain versions"""
+    try:
+        from langchain.globals import set_llm_cache
+        set_llm_cache(cache)
+    except ImportError:
+        import langchain
+        langchain.llm_cache = cache
+    return cache
@@ -6,11 +6,33 @@ cuisine = st.sidebar.selectbox("Pick a cuisine", ("Italian","Indian","Chinese","
 
 
 if cuisine:
-    response = helper.generate_restaurant_name_and_items(cuisine)
+    events = helper.stream_restaurant_name_and_items(cuisine)
 
-    st.header(response['restaurant_name'])
-    menu_items = response['menu_items'].split(",")
+    # The name renders as soon as the first chain step is done
+    _, restaurant_name = next(events)
+    st.header(restaurant_name)
     st.write("**MENU ITEMS**")
-    for item in menu_items:
-        st.write("*", item)
+
+    # Dishes appear in a placeholder as the streamed answer completes each one
+    menu_placeholder = st.empty()
+    menu_text = ""
+    response = None
+    try:
+        for kind, value in events:
+            if kind == "menu_token":
+                menu_text += value
+                menu_placeholder.markdown("\n".join(f"* {name}" for name in helper.partial_menu_items(menu_text)))
+            else:
+                response = value
+    except helper.MenuParseError as e:
+        menu_placeholder.error(f"{e}. Pick the cuisine again to retry.")
+
+    # The final list is the validated structure, never the raw text
+    if response:
+        with menu_placeholder.container():
+            for item in response['menu_items']:
+                st.write(f"* **{item.name}**" + (f" - {item.description}" if item.description else ""))
+
+stats = helper.llm_cache.stats
+st.sidebar.caption(f"LLM cache: {stats.hits} hits / {stats.misses} misses ({stats.hit_rate:.0%} hit rate)")
     
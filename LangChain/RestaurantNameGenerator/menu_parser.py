@@ -0,0 +1,120 @@
+import json
+import re
+from dataclasses import dataclass
+
+# Constants
+FORMAT_INSTRUCTIONS = (
+    'Answer with JSON only, in this format: '
+    '{{"menu_items": [{{"name": "dish name", "description": "one short sentence"}}]}}'
+)
+MAX_MENU_ITEMS = 30
+MAX_NAME_LENGTH = 80
+NAME_KEYS = ("name", "item", "dish", "title")
+LIST_KEYS = ("menu_items", "items", "menu", "dishes")
+PARTIAL_NAME_PATTERN = re.compile(r'"(?:name|item|dish|title)"\s*:\s*"((?:[^"\\]|\\.)*)"')
+BULLET_PATTERN = re.compile(r"^\s*(?:\d+[.)]|[-*•])\s*")
+MIN_LIST_ITEMS = 2
+
+
+class MenuParseError(Exception):
+    """Raised when an LLM answer cannot be turned into a valid menu"""
+
+
+@dataclass
+class MenuItem:
+    """One validated dish of a generated menu"""
+    name: str
+    description: str = ""
+
+
+def extract_json(text):
+    """The JSON value in an LLM answer, tolerating code fences, surrounding prose and trailing commas"""
+    text = text.replace("“", '"').replace("”", '"')
+    starts = [index for index in (text.find("{"), text.find("[")) if index >= 0]
+    if not starts:
+        raise MenuParseError("no JSON object in the answer")
+    start = min(starts)
+    end = max(text.rfind("}"), text.rfind("]")) + 1
+    candidate = text[start:end]
+    try:
+        return json.loads(candidate)
+    except ValueError:
+        pass
+    try:
+        return json.loads(re.sub(r",\s*([}\]])", r"\1", candidate))
+    except ValueError as e:
+        raise MenuParseError(f"invalid JSON: {e}")
+
+
+def free_text_items(text):
+    """
+    Dish names from a bulleted or numbered plain-text answer, one dish per line
+
+    Only list entries count, so prose such as a refusal or preamble is not read
+    as dishes; fewer than MIN_LIST_ITEMS entries raises MenuParseError.
+    """
+    lines = [BULLET_PATTERN.sub("", line).strip() for line in text.splitlines() if BULLET_PATTERN.match(line)]
+    lines = [line for line in lines if line and not line.endswith(":")]
+    if len(lines) < MIN_LIST_ITEMS:
+        raise MenuParseError("the answer is neither JSON nor a bulleted or numbered list")
+    items = []
+    for line in lines:
+        name, _, description = line.partition(" - ")
+        items.append({"name": name.strip(" *"), "description": description.strip()})
+    return items
+
+
+def validate_items(raw_items):
+    """MenuItems from parsed JSON or free-text items; raises MenuParseError if none are usable"""
+    if isinstance(raw_items, dict):
+        raw_items = next((raw_items[key] for key in LIST_KEYS if isinstance(raw_items.get(key), list)), None)
+    if not isinstance(raw_items, list):
+        raise MenuParseError("expected a list of menu items")
+
+    items, seen = [], set()
+    for raw in raw_items:
+        if isinstance(raw, str):
+            raw = {"name": raw}
+        if not isinstance(raw, dict):
+            continue
+        name = next((str(raw[key]).strip() for key in NAME_KEYS if raw.get(key)), "")
+        if not name or len(name) > MAX_NAME_LENGTH or name.lower() in seen:
+            continue
+        seen.add(name.lower())
+        items.append(MenuItem(name=name, description=str(raw.get("description") or "").strip()))
+    if not items:
+        raise MenuParseError("the answer contains no usable menu items")
+    return items[:MAX_MENU_ITEMS]
+
+
+def parse_menu(text):
+    """
+    Validated MenuItems from an LLM menu answer
+
+    JSON is preferred; small defects (code fences, prose around it, trailing
+    commas, curly quotes) are repaired, and a multi-line bulleted or numbered
+    list is accepted when the answer has no JSON at all. Anything else, such as
+    a refusal or other plain prose, raises MenuParseError so the caller can re-ask.
+    """
+    try:
+        return validate_items(extract_json(text))
+    except MenuParseError:
+        if "{" in text or "[" in text:
+            raise
+    return validate_items(free_text_items(text))
+
+
+def partial_menu_items(text):
+    """Names of the dishes completed so far in a menu answer that is still streaming"""
+    return [json.loads(f'"{name}"') for name in PARTIAL_NAME_PATTERN.findall(text)]
+
+
+def is_valid_menu_completion(prompt, generations):
+    """LLM cache validator: menu completions are cached only if they parse"""
+    if FORMAT_INSTRUCTIONS.format() not in prompt:
+        return True
+    try:
+        parse_menu(generations[0].text)
+    except (MenuParseError, IndexError):
+        return False
+    return True
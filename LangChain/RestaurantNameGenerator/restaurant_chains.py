@@ -0,0 +1,270 @@
+from langchain.prompts import PromptTemplate
+from langchain.chains import LLMChain
+from langchain.chains import SequentialChain
+from langchain.callbacks.base import BaseCallbackHandler
+from LangChain.RestaurantNameGenerator.menu_parser import FORMAT_INSTRUCTIONS, MenuParseError, parse_menu
+import os
+import queue
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+# Chains and batch helpers for any LLM. Importing this module creates no client,
+# reads no API key and installs no cache; Lanchain_helper wires them to OpenAI.
+
+# Re-asks allowed when a menu answer cannot be parsed even after repair
+MENU_MAX_RETRIES = int(os.environ.get("LLM_MENU_MAX_RETRIES", 2))
+LIST_MARKER_PATTERN = re.compile(r"^\s*(?:\d+[.)]|[-*\u2022])\s*")
+# Openers and sign-offs of chatty answers ("Sure! Here are five names.", "I hope these help!")
+PREAMBLE_PATTERN = re.compile(r"^(?:sure|certainly|of course|absolutely|okay|ok|here (?:are|is)|i hope|let me know|hope)\b", re.IGNORECASE)
+MAX_NAME_WORDS = 6
+
+# Prompts are immutable, so they are built once and shared by every chain
+name_prompt = PromptTemplate(
+    input_variables= ['cuisine'],
+    template= "I want to open restaturant for {cuisine} food. Suggest a fancy name for this."
+    )
+menu_prompt = PromptTemplate(
+    input_variables= ['restaurant_name'],
+    template= """Suggest some menu items for {restaurant_name}. """ + FORMAT_INSTRUCTIONS
+    )
+menu_retry_prompt = PromptTemplate(
+    input_variables= ['restaurant_name', 'previous_answer', 'error'],
+    template= """Your menu for {restaurant_name} could not be read ({error}):
+{previous_answer}
+
+Suggest some menu items for {restaurant_name} again. """ + FORMAT_INSTRUCTIONS
+    )
+name_candidates_prompt = PromptTemplate(
+    input_variables= ['cuisine', 'count'],
+    template= "I want to open restaturant for {cuisine} food. Suggest {count} different fancy names for this, one per line."
+    )
+
+
+def build_chain(llm):
+    """Cuisine -> restaurant name -> menu items chain for an LLM"""
+    # Chain 1 Resto Name
+    name_chain = LLMChain(llm=llm, prompt=name_prompt, output_key="restaurant_name")
+
+    # Chain 2
+    food_items_chain = LLMChain(llm=llm, prompt=menu_prompt, output_key="menu_items")
+
+    return SequentialChain(
+        chains = [name_chain, food_items_chain],
+        input_variables = ['cuisine'],
+        output_variables = ['restaurant_name', 'menu_items']
+    )
+
+
+def build_candidates_chain(llm):
+    """Cuisine and count -> several restaurant names, one per line"""
+    return LLMChain(llm=llm, prompt=name_candidates_prompt, output_key="restaurant_names")
+
+
+def structured_menu(restaurant_name, menu_text, llm, max_retries=None):
+    """
+    Validated MenuItems for a menu answer, as (items, attempts)
+
+    Defects parse_menu can repair cost nothing; otherwise llm is re-asked
+    with its previous answer and the error, up to max_retries times, before
+    MenuParseError is raised.
+    """
+    max_retries = MENU_MAX_RETRIES if max_retries is None else max_retries
+    retry_chain = None
+
+    attempts = 1
+    while True:
+        try:
+            return parse_menu(menu_text), attempts
+        except MenuParseError as e:
+            if attempts > max_retries:
+                raise MenuParseError(f"No valid menu for {restaurant_name} after {attempts} attempts: {e}")
+            retry_chain = retry_chain or LLMChain(llm=llm, prompt=menu_retry_prompt, output_key="menu_items")
+            menu_text = retry_chain({'restaurant_name': restaurant_name, 'previous_answer': menu_text, 'error': str(e)})['menu_items']
+            attempts += 1
+
+
+def structure_response(response, chain):
+    """Replace the menu text of a chain response with validated MenuItems"""
+    llm = chain.chains[1].llm
+    response['menu_items'], response['menu_attempts'] = structured_menu(response['restaurant_name'], response['menu_items'], llm)
+    return response
+
+
+def structure_result(cuisine, response, chain):
+    """
+    structure_response for one batch item, with its failure recorded instead of raised
+
+    Every result has an 'error' key: None on success, otherwise the message, with
+    menu_items None, so one bad answer does not discard the rest of a batch.
+    """
+    try:
+        if isinstance(response, Exception):
+            raise response
+        response = structure_response(response, chain)
+        response['error'] = None
+        return response
+    except Exception as e:
+        restaurant_name = response.get('restaurant_name') if isinstance(response, dict) else None
+        return {'cuisine': cuisine, 'restaurant_name': restaurant_name, 'menu_items': None, 'error': str(e)}
+
+
+def generate_many(chain, cuisines, max_concurrency=4):
+    """Run many cuisines through the chain concurrently; results keep the input order, failures carry an error"""
+    inputs = [{'cuisine': cuisine} for cuisine in cuisines]
+    if hasattr(chain, "batch"):
+        responses = chain.batch(inputs, config={"max_concurrency": max_concurrency}, return_exceptions=True)
+    else:
+        # LangChain releases before the Runnable interface have no batch()
+        def call(chain_inputs):
+            try:
+                return chain(chain_inputs)
+            except Exception as e:
+                return e
+
+        with ThreadPoolExecutor(max_workers=max_concurrency) as executor:
+            responses = list(executor.map(call, inputs))
+    return [structure_result(cuisine, response, chain) for cuisine, response in zip(cuisines, responses)]
+
+
+def is_preamble(line):
+    """True for prose around a list of names: an intro ending in ':', a chatty opener or a long sentence"""
+    return (
+        line.endswith(":")
+        or PREAMBLE_PATTERN.match(line) is not None
+        or (line[-1] in ".!?" and len(line.split()) > MAX_NAME_WORDS)
+    )
+
+
+def parse_name_candidates(text, count):
+    """Up to count distinct names from a one-per-line LLM answer, without numbering, bullets, quotes or preamble"""
+    lines = [line for line in text.splitlines() if line.strip()]
+    # In a numbered or bulleted answer only the list entries are names
+    listed = [line for line in lines if LIST_MARKER_PATTERN.match(line)]
+    names = []
+    for line in listed or lines:
+        name = LIST_MARKER_PATTERN.sub("", line).strip().strip('"\'').strip()
+        if name and not is_preamble(name) and name not in names:
+            names.append(name)
+    return names[:count]
+
+
+def generate_concepts(chain, candidates_chain, cuisine, count=3, max_concurrency=4):
+    """
+    count restaurant names from one LLM request, then a menu for each, generated concurrently
+
+    Returns {'cuisine', 'concepts': [{'restaurant_name', 'menu_items', 'error'}], 'timings'}.
+    timings compares the wall clock with the serial path of calling
+    generate_restaurant_name_and_items count times. That path is estimated as
+    the measured menu calls plus one name request; its other name requests are
+    not counted, so serial_estimate and speedup are lower bounds. menu_speedup
+    is the measured gain of the concurrent menu calls alone.
+    """
+    _, food_items_chain = chain.chains
+    start = time.perf_counter()
+
+    # Step 1: All names in one request
+    response = candidates_chain({'cuisine': cuisine, 'count': count})
+    names = parse_name_candidates(response['restaurant_names'], count)
+    names_seconds = time.perf_counter() - start
+
+    # Step 2: One menu per name, at most max_concurrency in flight
+    def generate_menu(restaurant_name):
+        menu_start = time.perf_counter()
+        try:
+            menu_text = food_items_chain({'restaurant_name': restaurant_name})['menu_items']
+            menu_items, _ = structured_menu(restaurant_name, menu_text, food_items_chain.llm)
+            error = None
+        except Exception as e:
+            menu_items, error = None, str(e)
+        concept = {'restaurant_name': restaurant_name, 'menu_items': menu_items, 'error': error}
+        return concept, time.perf_counter() - menu_start
+
+    with ThreadPoolExecutor(max_workers=max(1, min(max_concurrency, len(names)))) as executor:
+        results = list(executor.map(generate_menu, names))
+    total_seconds = time.perf_counter() - start
+
+    # A single-name request is not timed here, so the serial path is charged for one name request only
+    menus_serial_seconds = sum(seconds for _, seconds in results)
+    menus_seconds = total_seconds - names_seconds
+    serial_seconds = names_seconds + menus_serial_seconds
+    return {
+        'cuisine': cuisine,
+        'concepts': [concept for concept, _ in results],
+        'timings': {
+            'names': names_seconds,
+            'menus': menus_seconds,
+            'total': total_seconds,
+            'serial_estimate': serial_seconds,
+            'speedup': serial_seconds / total_seconds if total_seconds else 1.0,
+            'menu_speedup': menus_serial_seconds / menus_seconds if menus_seconds else 1.0,
+        },
+    }
+
+
+class TokenQueueHandler(BaseCallbackHandler):
+    """Forwards streamed LLM tokens into a queue for another thread to consume"""
+
+    def __init__(self, tokens):
+        self.tokens = tokens
+
+    def on_llm_new_token(self, token, **kwargs):
+        self.tokens.put(token)
+
+
+def stream_restaurant_name_and_items(chain, cuisine):
+    """
+    Run the chain step by step, yielding (kind, value) events as content arrives
+
+    Yields ("restaurant_name", name) as soon as the first step finishes, then
+    ("menu_token", text) pieces while the menu is generated, then ("response", dict)
+    with the same keys generate_restaurant_name_and_items returns. A cached or
+    non-streaming menu arrives as a single menu_token; partial_menu_items() gives
+    the dishes completed so far from the concatenated tokens.
+    """
+    name_chain, food_items_chain = chain.chains
+    restaurant_name = name_chain({'cuisine': cuisine})['restaurant_name']
+    yield "restaurant_name", restaurant_name
+
+    # The menu step runs on a worker thread so tokens can be yielded while it generates
+    tokens = queue.Queue()
+    result = {}
+
+    def run_menu_chain():
+        try:
+            result.update(food_items_chain({'restaurant_name': restaurant_name}, callbacks=[TokenQueueHandler(tokens)]))
+        except Exception as e:
+            result['error'] = e
+        finally:
+            tokens.put(None)
+
+    threading.Thread(target=run_menu_chain, daemon=True).start()
+    streamed = False
+    for token in iter(tokens.get, None):
+        streamed = True
+        yield "menu_token", token
+
+    if 'error' in result:
+        raise result['error']
+    if not streamed:
+        yield "menu_token", result['menu_items']
+    response = {'cuisine': cuisine, 'restaurant_name': restaurant_name, 'menu_items': result['menu_items']}
+    yield "response", structure_response(response, chain)
+
+
+async def agenerate_many(chain, cuisines, max_concurrency=4):
+    """Async variant of generate_many over the chain's acall, for use inside an event loop"""
+    import asyncio
+    semaphore = asyncio.Semaphore(max_concurrency)
+
+    async def run(cuisine):
+        async with semaphore:
+            try:
+                response = await chain.acall({'cuisine': cuisine})
+            except Exception as e:
+                response = e
+            # Parsing is instant; only a re-ask blocks, so it runs off the event loop
+            return await asyncio.to_thread(structure_result, cuisine, response, chain)
+
+    return await asyncio.gather(*(run(cuisine) for cuisine in cuisines))
@@ -0,0 +1,43 @@
+import asyncio
+import pytest
+
+pytest.importorskip("langchain")
+
+from LangChain.RestaurantNameGenerator.benchmark import FakeRestaurantLLM
+from LangChain.RestaurantNameGenerator.llm_cache import install_llm_cache
+from LangChain.RestaurantNameGenerator.restaurant_chains import agenerate_many, build_chain, generate_many
+
+
+class RefusingLLM(FakeRestaurantLLM):
+    """Refuses the Greek menu and fails outright on Thai; answers everything else"""
+
+    def _answer(self, prompt):
+        if "Thai" in prompt:
+            raise RuntimeError("rate limited")
+        if "menu items" in prompt and "Greek" in prompt:
+            return "I'm sorry, I can't help with that."
+        if "fancy name" in prompt:
+            return prompt.split(" for ")[1].split()[0] + " Garden"
+        return super()._answer(prompt)
+
+
+@pytest.fixture
+def chain():
+    install_llm_cache(None)
+    return build_chain(RefusingLLM())
+
+
+def check_results(results):
+    assert [result["cuisine"] for result in results] == ["Indian", "Greek", "Thai"]
+    indian, greek, thai = results
+    assert indian["error"] is None and indian["menu_items"]
+    assert greek["menu_items"] is None and "No valid menu for Greek Garden" in greek["error"]
+    assert thai["menu_items"] is None and "rate limited" in thai["error"]
+
+
+def test_generate_many_reports_per_item_errors(chain):
+    check_results(generate_many(chain, ["Indian", "Greek", "Thai"]))
+
+
+def test_agenerate_many_reports_per_item_errors(chain):
+    check_results(asyncio.run(agenerate_many(chain, ["Indian", "Greek", "Thai"])))
@@ -0,0 +1,33 @@
+import pytest
+
+pytest.importorskip("langchain")
+
+from LangChain.RestaurantNameGenerator.benchmark import FakeRestaurantLLM
+from LangChain.RestaurantNameGenerator.llm_cache import install_llm_cache
+from LangChain.RestaurantNameGenerator.restaurant_chains import (
+    build_chain, build_candidates_chain, generate_concepts, parse_name_candidates,
+)
+
+
+@pytest.mark.parametrize("text", [
+    "Sure! Here are five names.\n1. Saffron House\n2. \"Spice Route\"\n3. Saffron House\nI hope these help!",
+    "Here are some names:\nSaffron House\nSpice Route\nLet me know if you would like a few more options.",
+    "Certainly, here you go\n- Saffron House\n- Spice Route",
+])
+def test_name_candidates_drop_preamble(text):
+    assert parse_name_candidates(text, 5) == ["Saffron House", "Spice Route"]
+
+
+def test_name_candidates_keep_short_names_with_periods():
+    assert parse_name_candidates("Spice Co.\nThe Curry Leaf", 5) == ["Spice Co.", "The Curry Leaf"]
+
+
+def test_concept_timings_do_not_charge_the_name_request_per_concept():
+    install_llm_cache(None)
+    llm = FakeRestaurantLLM(latency=0.05)
+    result = generate_concepts(build_chain(llm), build_candidates_chain(llm), "Indian", count=4, max_concurrency=4)
+    timings = result["timings"]
+    assert [concept["error"] for concept in result["concepts"]] == [None] * 4
+    assert timings["serial_estimate"] == pytest.approx(timings["names"] + 4 * 0.05, abs=0.05)
+    assert timings["speedup"] < 4
+    assert timings["menu_speedup"] > 2
@@ -0,0 +1,135 @@
+import sqlite3
+from types import SimpleNamespace
+import pytest
+
+pytest.importorskip("langchain")
+
+from langchain.schema import Generation
+from LangChain.RestaurantNameGenerator import llm_cache
+from LangChain.RestaurantNameGenerator.llm_cache import LLMResponseCache
+
+GREEDY = "[('model_name', 'gpt-3.5-turbo-instruct'), ('temperature', 0.0)]"
+CREATIVE = "[('model_name', 'gpt-3.5-turbo-instruct'), ('temperature', 0.7)]"
+
+
+def generations(text):
+    return [Generation(text=text)]
+
+
+def texts(result):
+    return None if result is None else [generation.text for generation in result]
+
+
+def disk_rows(cache):
+    with sqlite3.connect(cache.path) as conn:
+        return conn.execute("SELECT COUNT(*) FROM llm_responses").fetchone()[0]
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Replaces the cache module's clock with one the test advances"""
+    now = SimpleNamespace(value=1_000_000.0)
+    monkeypatch.setattr(llm_cache, "time", SimpleNamespace(time=lambda: now.value))
+    return now
+
+
+@pytest.fixture
+def path(tmp_path):
+    return str(tmp_path / "llm_cache.sqlite3")
+
+
+def test_memory_evicts_least_recently_used():
+    cache = LLMResponseCache(path=None, memory_entries=2)
+    cache.update("Indian", GREEDY, generations("Spice Route"))
+    cache.update("Italian", GREEDY, generations("Trattoria"))
+    assert texts(cache.lookup("Indian", GREEDY)) == ["Spice Route"]
+    cache.update("Mexican", GREEDY, generations("Casa Verde"))
+
+    assert cache.lookup("Italian", GREEDY) is None
+    assert texts(cache.lookup("Indian", GREEDY)) == ["Spice Route"]
+    assert texts(cache.lookup("Mexican", GREEDY)) == ["Casa Verde"]
+    assert cache.stats.evictions == 1
+
+
+def test_entries_expire_after_ttl(path, clock):
+    cache = LLMResponseCache(path=path, ttl_seconds=60)
+    cache.update("Indian", GREEDY, generations("Spice Route"))
+    clock.value += 59
+    assert texts(cache.lookup("Indian", GREEDY)) == ["Spice Route"]
+
+    clock.value += 2
+    assert cache.lookup("Indian", GREEDY) is None
+    assert LLMResponseCache(path=path, ttl_seconds=60).lookup("Indian", GREEDY) is None
+    cache.prune()
+    assert disk_rows(cache) == 0
+
+
+def test_prune_keeps_newest_entries_within_disk_cap(path, clock):
+    cache = LLMResponseCache(path=path, max_disk_entries=2)
+    for cuisine in ["Indian", "Italian", "Mexican"]:
+        clock.value += 1
+        cache.update(cuisine, GREEDY, generations(f"{cuisine} House"))
+    assert disk_rows(cache) == 2
+
+    # A fresh cache has nothing in memory, so it only sees what the file kept
+    reopened = LLMResponseCache(path=path)
+    assert reopened.lookup("Indian", GREEDY) is None
+    assert texts(reopened.lookup("Mexican", GREEDY)) == ["Mexican House"]
+
+
+def test_pool_fills_before_serving_at_non_zero_temperature(path):
+    cache = LLMResponseCache(path=path, pool_size=3)
+    for index in range(3):
+        assert cache.lookup("Indian", CREATIVE) is None
+        cache.update("Indian", CREATIVE, generations(f"Name {index}"))
+    served = {texts(cache.lookup("Indian", CREATIVE))[0] for _ in range(50)}
+    assert served <= {"Name 0", "Name 1", "Name 2"}
+    assert len(served) > 1
+
+    # Past pool_size, a new completion replaces the oldest
+    cache.update("Indian", CREATIVE, generations("Name 3"))
+    served = {texts(cache.lookup("Indian", CREATIVE))[0] for _ in range(50)}
+    assert served <= {"Name 1", "Name 2", "Name 3"}
+    assert disk_rows(cache) == 3
+
+
+def test_pool_is_a_single_entry_at_zero_temperature(path):
+    cache = LLMResponseCache(path=path, pool_size=3)
+    cache.update("Indian", GREEDY, generations("Spice Route"))
+    assert texts(cache.lookup("Indian", GREEDY)) == ["Spice Route"]
+    cache.update("Indian", GREEDY, generations("Curry Leaf"))
+    assert texts(cache.lookup("Indian", GREEDY)) == ["Curry Leaf"]
+    assert disk_rows(cache) == 1
+
+
+def test_stats_count_hits_by_level_and_misses(path):
+    cache = LLMResponseCache(path=path)
+    assert cache.lookup("Indian", GREEDY) is None
+    cache.update("Indian", GREEDY, generations("Spice Route"))
+    cache.lookup("Indian", GREEDY)
+    # A different temperature is a different entry
+    assert cache.lookup("Indian", CREATIVE) is None
+    assert cache.stats.to_dict() == {
+        "memory_hits": 1, "disk_hits": 0, "misses": 2, "updates": 1, "evictions": 0, "rejected": 0, "hit_rate": 0.333,
+    }
+
+    reopened = LLMResponseCache(path=path)
+    reopened.lookup("Indian", GREEDY)
+    reopened.lookup("Indian", GREEDY)
+    assert (reopened.stats.disk_hits, reopened.stats.memory_hits, reopened.stats.hit_rate) == (1, 1, 1.0)
+
+
+def test_validators_reject_and_evict_completions(path):
+    def not_a_refusal(prompt, result):
+        return not result[0].text.startswith("I'm sorry")
+
+    cache = LLMResponseCache(path=path, validators=[not_a_refusal])
+    cache.update("Indian", GREEDY, generations("I'm sorry, I can't help with that."))
+    assert cache.lookup("Indian", GREEDY) is None
+    assert cache.stats.rejected == 1
+
+    # Stored before the validator existed: evicted on lookup
+    LLMResponseCache(path=path).update("Greek", GREEDY, generations("I'm sorry, no."))
+    assert cache.lookup("Greek", GREEDY) is None
+    assert cache.stats.evictions == 1
+    assert disk_rows(cache) == 0
@@ -0,0 +1,27 @@
+import pytest
+from LangChain.RestaurantNameGenerator.menu_parser import MenuParseError, parse_menu
+
+
+def names(text):
+    return [item.name for item in parse_menu(text)]
+
+
+def test_json_with_fences_and_trailing_comma():
+    text = 'Here you go:\n```json\n{"menu_items": [{"name": "Dal Makhani", "description": "Slow-cooked lentils."},]}\n```'
+    assert names(text) == ["Dal Makhani"]
+
+
+def test_bulleted_list():
+    assert names("Menu:\n- Dal Makhani - Slow-cooked lentils\n- Butter Naan\n2. Masala Chai") == ["Dal Makhani", "Butter Naan", "Masala Chai"]
+
+
+@pytest.mark.parametrize("text", [
+    "I'm sorry, I can't help with that.",
+    "Dal Makhani, Butter Naan, Masala Chai",
+    "Sure! Here is a menu.\nIt has great dishes.",
+    "- Dal Makhani",
+    '{"menu_items": [',
+])
+def test_prose_and_single_items_are_rejected(text):
+    with pytest.raises(MenuParseError):
+        parse_menu(text)
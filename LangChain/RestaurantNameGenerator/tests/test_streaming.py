@@ -0,0 +1,65 @@
+import time
+import pytest
+
+pytest.importorskip("langchain")
+
+from LangChain.RestaurantNameGenerator.benchmark import FakeRestaurantLLM
+from LangChain.RestaurantNameGenerator.llm_cache import LLMResponseCache, install_llm_cache
+from LangChain.RestaurantNameGenerator.restaurant_chains import build_chain, stream_restaurant_name_and_items
+
+TOKEN_LATENCY = 0.01
+
+
+class FailingMenuLLM(FakeRestaurantLLM):
+    """Answers the name prompt and fails on the menu prompt"""
+
+    def _answer(self, prompt):
+        if "menu items" in prompt:
+            raise RuntimeError("menu model unavailable")
+        return super()._answer(prompt)
+
+
+@pytest.fixture
+def no_llm_cache():
+    install_llm_cache(None)
+    yield
+    install_llm_cache(None)
+
+
+def timed_events(chain):
+    start = time.perf_counter()
+    return [(kind, value, time.perf_counter() - start) for kind, value in stream_restaurant_name_and_items(chain, "Indian")]
+
+
+def test_name_then_incremental_tokens_then_response(no_llm_cache):
+    events = timed_events(build_chain(FakeRestaurantLLM(token_latency=TOKEN_LATENCY)))
+    kinds = [kind for kind, _, _ in events]
+    assert kinds[0] == "restaurant_name"
+    assert kinds[-1] == "response"
+    assert set(kinds[1:-1]) == {"menu_token"}
+
+    tokens = [(value, at) for kind, value, at in events if kind == "menu_token"]
+    assert len(tokens) > 10
+    # Tokens are yielded while the menu is generated, not all at once at the end
+    assert tokens[-1][1] - tokens[0][1] >= TOKEN_LATENCY * (len(tokens) - 2) * 0.5
+
+    response = events[-1][1]
+    assert response["restaurant_name"] == events[0][1] == "The Golden Spoon"
+    assert [item.name for item in response["menu_items"]][0] == "Chef's Tasting Plate"
+
+
+def test_cached_menu_arrives_as_one_token(no_llm_cache):
+    chain = build_chain(FakeRestaurantLLM(token_latency=TOKEN_LATENCY))
+    install_llm_cache(LLMResponseCache(path=None))
+    streamed = [value for kind, value, _ in timed_events(chain) if kind == "menu_token"]
+
+    cached = [value for kind, value, _ in timed_events(chain) if kind == "menu_token"]
+    assert len(streamed) > 1
+    assert cached == ["".join(streamed)]
+
+
+def test_worker_error_is_reraised(no_llm_cache):
+    events = stream_restaurant_name_and_items(build_chain(FailingMenuLLM()), "Indian")
+    assert next(events) == ("restaurant_name", "The Golden Spoon")
+    with pytest.raises(RuntimeError, match="menu model unavailable"):
+        list(events)